@@ -4,9 +4,24 @@
 
 from .camera_manager import CameraManager
 from .camera_thread import CameraThread
+from .video_recorder import VideoRecorder
+from .frame_history import FrameHistory
+from .change_detector import ChangeDetector
+from .multi_camera import (
+    MultiCameraManager, FrameSynchronizer,
+    CameraSource, FileSource, SyntheticSource
+)
 
 __all__ = [
     'CameraManager',
-    'CameraThread'
+    'CameraThread',
+    'VideoRecorder',
+    'FrameHistory',
+    'ChangeDetector',
+    'MultiCameraManager',
+    'FrameSynchronizer',
+    'CameraSource',
+    'FileSource',
+    'SyntheticSource'
 ]
 
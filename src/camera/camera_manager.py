@@ -6,9 +6,17 @@
 """
 
 import cv2
+import time
 import logging
+from collections import deque
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer
 
+from processing.buffer_pool import get_buffer_pool
+from utils.profiler import get_profiler
+from .video_recorder import VideoRecorder
+from .frame_history import FrameHistory
+from .change_detector import ChangeDetector
+
 
 class CameraManager(QObject):
     """Класс для управления веб-камерой"""
@@ -18,20 +26,48 @@ class CameraManager(QObject):
     error_occurred = pyqtSignal(str)  # Произошла ошибка
     camera_started = pyqtSignal()    # Камера запущена
     camera_stopped = pyqtSignal()    # Камера остановлена
+    recording_failed = pyqtSignal(str)  # Запись не запущена (захват продолжается)
+    
+    # Режимы опроса устройства
+    MODE_ACTIVE = 'active'            # полная частота кадров
+    MODE_KEEP_ALIVE = 'keep_alive'    # редкий опрос, поток камеры не простаивает
+    MODE_PAUSED = 'paused'            # опрос остановлен, устройство остается открытым
+    MODES = (MODE_ACTIVE, MODE_KEEP_ALIVE, MODE_PAUSED)
     
-    def __init__(self, camera_index=0):
+    # Число последних отправленных кадров, буферы которых не возвращаются
+    # в пул: кадр frame_ready действителен, пока не прочитано столько
+    # новых кадров (для хранения кадр нужно копировать)
+    FRAME_BUFFERS = 3
+    
+    def __init__(self, camera_index=0, history_size=30):
         super().__init__()
         
         self.camera_index = camera_index
         self.capture = None
         self.timer = None
         self.is_capturing = False
+        self.recorder = None
+        
+        # История последних показанных кадров (захват без обращения к устройству)
+        self.history = FrameHistory(history_size)
+        
+        # Кадры читаются в буферы пула (без выделения памяти на каждый кадр)
+        self.buffer_pool = get_buffer_pool()
+        self._frame_buffers = deque()
+        
+        # Кадры статичной сцены не отправляются на обработку и отображение
+        self.change_detector = ChangeDetector()
         
         self.logger = logging.getLogger(__name__)
+        self.profiler = get_profiler()
         
         # Параметры захвата
         self.fps = 30  # Кадров в секунду
         self.frame_interval = int(1000 / self.fps)  # Интервал в миллисекундах
+        
+        # Режим опроса и частота опроса в режиме keep_alive
+        self.mode = self.MODE_ACTIVE
+        self.keep_alive_fps = 2
     
     def start_capture(self):
         """Запуск захвата видео с камеры"""
@@ -51,9 +87,17 @@ class CameraManager(QObject):
             self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
             
+            # Минимальный буфер драйвера: после паузы меньше устаревших кадров
+            self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
+            self.history.clear()
+            if self.change_detector is not None:
+                self.change_detector.reset()
+            
             # Создание и запуск таймера
             self.timer = QTimer()
             self.timer.timeout.connect(self._capture_frame)
+            self.mode = self.MODE_ACTIVE
             self.timer.start(self.frame_interval)
             
             self.is_capturing = True
@@ -78,11 +122,15 @@ class CameraManager(QObject):
                 self.timer.stop()
                 self.timer = None
             
+            self.stop_recording()
+            
             # Закрытие камеры
             if self.capture:
                 self.capture.release()
                 self.capture = None
             
+            self._release_frame_buffers()
+            
             self.is_capturing = False
             self.logger.info("Захват с камеры остановлен")
             self.camera_stopped.emit()  # Испускание сигнала об остановке
@@ -92,10 +140,16 @@ class CameraManager(QObject):
             self.logger.error(error_msg)
             self.error_occurred.emit(error_msg)
     
-    def capture_single_frame(self):
+    def capture_single_frame(self, timestamp=None):
         """
         Захват одного кадра с камеры
         
+        Кадр берется из истории: возвращается кадр, показанный на экране
+        в момент timestamp, без дополнительного чтения с устройства.
+        
+        Args:
+            timestamp: Момент захвата по time.monotonic() (по умолчанию - сейчас)
+        
         Returns:
             Захваченный кадр или None в случае ошибки
         """
@@ -105,15 +159,17 @@ class CameraManager(QObject):
             if not self.is_capturing or not self.capture:
                 raise RuntimeError("Камера не активна")
             
-            if not self.capture.isOpened():
-                raise RuntimeError("Камера недоступна")
+            if timestamp is None:
+                timestamp = time.monotonic()
             
-            ret, frame = self.capture.read()
+            entry = self.history.frame_at(timestamp)
+            if entry is None:
+                raise RuntimeError("Нет полученных кадров")
             
-            if ret:
-                return frame.copy()
-            else:
-                raise RuntimeError("Не удалось захватить кадр")
+            frame, frame_time = entry
+            self.logger.debug("Захвачен кадр из истории (задержка %.1f мс)",
+                              (timestamp - frame_time) * 1000)
+            return frame
                 
         except Exception as e:
             error_msg = f"Ошибка захвата кадра: {str(e)}"
@@ -121,6 +177,35 @@ class CameraManager(QObject):
             self.error_occurred.emit(error_msg)
             return None
     
+    def capture_burst(self, window=1.0, timestamp=None):
+        """
+        Серийный захват: самый резкий кадр за последний интервал
+        
+        Args:
+            window: Длительность интервала в секундах
+            timestamp: Конец интервала по time.monotonic() (по умолчанию - сейчас)
+            
+        Returns:
+            Кортеж (кадр, оценка резкости) или None в случае ошибки
+        """
+        
+        try:
+            if not self.is_capturing:
+                raise RuntimeError("Камера не активна")
+            
+            entry = self.history.sharpest(window, timestamp)
+            if entry is None:
+                raise RuntimeError("Нет полученных кадров")
+            
+            frame, _, score = entry
+            return frame, score
+            
+        except Exception as e:
+            error_msg = f"Ошибка серийного захвата: {str(e)}"
+            self.logger.error(error_msg)
+            self.error_occurred.emit(error_msg)
+            return None
+    
     def _capture_frame(self):
         """Внутренний метод для захвата и отправки кадра"""
         
@@ -128,11 +213,25 @@ class CameraManager(QObject):
             if not self.capture or not self.capture.isOpened():
                 raise RuntimeError("Камера не доступна")
             
-            ret, frame = self.capture.read()
+            # Граница кадра для разбивки в профилировщике
+            self.profiler.mark_frame()
+            
+            with self.profiler.measure('CameraManager.read', 'camera') as info:
+                ret, frame = self._read_frame()
+                timestamp = time.monotonic()
+                if ret:
+                    info['bytes'] = frame.nbytes
             
             if ret:
-                # Отправка кадра через сигнал
-                self.frame_ready.emit(frame)
+                self.history.push(frame, timestamp)
+                
+                # Запись не блокирует: кадр только ставится в очередь
+                if self.recorder is not None:
+                    self.recorder.submit(frame, timestamp)
+                
+                # Отправка кадра через сигнал (только если сцена изменилась)
+                if self.change_detector is None or self.change_detector.is_changed(frame):
+                    self.frame_ready.emit(frame)
             else:
                 raise RuntimeError("Не удалось прочитать кадр")
                 
@@ -142,6 +241,199 @@ class CameraManager(QObject):
             self.error_occurred.emit(error_msg)
             self.stop_capture()
     
+    def _read_frame(self):
+        """
+        Чтение кадра с устройства в буфер из пула
+        
+        Буфер берется по форме предыдущего кадра. Если устройство
+        вернуло собственный массив (первый кадр, смена разрешения),
+        кадр копируется в буфер пула его формы. Самый старый из
+        FRAME_BUFFERS отправленных буферов возвращается в пул.
+        
+        Returns:
+            Кортеж (успех чтения, кадр)
+        """
+        
+        buffer = None
+        if self._frame_buffers:
+            buffer = self.buffer_pool.acquire_like(self._frame_buffers[-1])
+        
+        try:
+            ret, frame = self.capture.read(buffer) if buffer is not None else self.capture.read()
+        except Exception:
+            if buffer is not None:
+                self.buffer_pool.release(buffer)
+            raise
+        
+        if not ret or frame is not buffer:
+            if buffer is not None:
+                self.buffer_pool.release(buffer)
+            
+            if not ret:
+                return ret, frame
+            
+            buffer = self.buffer_pool.acquire_like(frame)
+            buffer[...] = frame
+            frame = buffer
+        
+        self._frame_buffers.append(frame)
+        while len(self._frame_buffers) > self.FRAME_BUFFERS:
+            self.buffer_pool.release(self._frame_buffers.popleft())
+        
+        return ret, frame
+    
+    def _release_frame_buffers(self):
+        """Возврат буферов отправленных кадров в пул"""
+        
+        while self._frame_buffers:
+            self.buffer_pool.release(self._frame_buffers.popleft())
+    
+    def start_recording(self, file_path, transform=None, queue_size=64,
+                        drop_policy=VideoRecorder.DROP_OLDEST):
+        """
+        Запуск записи видео с камеры
+        
+        Args:
+            file_path: Путь к видеофайлу (.mp4, .avi, .mkv)
+            transform: Преобразование кадра перед записью (например,
+                       отображение выбранного канала) или None
+            queue_size: Размер очереди кадров
+            drop_policy: Политика при переполнении очереди
+            
+        Returns:
+            Экземпляр VideoRecorder или None, если файл не удалось открыть
+            (причина передается сигналом recording_failed)
+        """
+        
+        try:
+            if not self.is_capturing:
+                raise RuntimeError("Камера не активна")
+            
+            self.stop_recording()
+            
+            recorder = VideoRecorder(
+                file_path, fps=self.fps, queue_size=queue_size,
+                drop_policy=drop_policy, transform=transform,
+                frame_size=self._recording_frame_size(transform)
+            )
+            
+            # Видеофайл открывается здесь: ошибка кодека сообщается сразу
+            recorder.start()
+            
+            self.recorder = recorder
+            self.set_mode(self.MODE_ACTIVE)
+            
+            self.logger.info("Запись видео запущена: %s", file_path)
+            return self.recorder
+            
+        except Exception as e:
+            error_msg = f"Ошибка запуска записи: {str(e)}"
+            self.logger.error(error_msg)
+            self.recording_failed.emit(error_msg)
+            self.recorder = None
+            return None
+    
+    def _recording_frame_size(self, transform=None):
+        """
+        Размер кадра видео: последний кадр после преобразования
+        или разрешение устройства, если кадров еще нет
+        
+        Returns:
+            Кортеж (ширина, высота)
+        """
+        
+        entry = self.history.latest()
+        if entry is not None:
+            frame = entry[0]
+            if transform is not None:
+                frame = transform(frame)
+            height, width = frame.shape[:2]
+            return width, height
+        
+        width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width <= 0 or height <= 0:
+            raise RuntimeError("Неизвестен размер кадра камеры")
+        return width, height
+    
+    def stop_recording(self):
+        """
+        Остановка записи видео
+        
+        Returns:
+            Статистика записи или None, если запись не велась
+        """
+        
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        
+        recorder.stop()
+        stats = recorder.get_stats()
+        
+        self.logger.info("Запись видео остановлена: записано %s, отброшено %s",
+                         stats['written'], stats['dropped'])
+        return stats
+    
+    def set_mode(self, mode):
+        """
+        Установка режима опроса камеры
+        
+        В режиме паузы останавливается только таймер: VideoCapture
+        остается открытым, поэтому возобновление не требует повторного
+        открытия устройства. Во время записи видео опрос всегда
+        выполняется с полной частотой.
+        
+        Args:
+            mode: MODE_ACTIVE, MODE_KEEP_ALIVE или MODE_PAUSED
+        """
+        
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим опроса: {mode}")
+        
+        if self.recorder is not None:
+            mode = self.MODE_ACTIVE
+        
+        if mode == self.mode or not self.is_capturing or self.timer is None:
+            self.mode = mode
+            return
+        
+        previous, self.mode = self.mode, mode
+        
+        if mode == self.MODE_PAUSED:
+            self.timer.stop()
+        else:
+            if previous == self.MODE_PAUSED and self.capture:
+                # Отбрасываем кадр, накопленный в буфере драйвера за время паузы
+                self.capture.grab()
+            
+            interval = self.frame_interval
+            if mode == self.MODE_KEEP_ALIVE:
+                interval = int(1000 / max(0.1, self.keep_alive_fps))
+            self.timer.start(interval)
+        
+        self.logger.info("Режим опроса камеры: %s -> %s", previous, mode)
+    
+    def set_skip_unchanged(self, enabled):
+        """
+        Включение/выключение пропуска неизменных кадров
+        
+        Args:
+            enabled: True - отправлять только изменившиеся кадры
+        """
+        
+        self.change_detector = ChangeDetector() if enabled else None
+    
+    @property
+    def skipped_fraction(self):
+        """Доля кадров, пропущенных детектором изменений"""
+        
+        return self.change_detector.skipped_fraction if self.change_detector else 0.0
+    
+    @property
+    def is_recording(self):
+        return self.recorder is not None
+    
     def _cleanup(self):
         """Очистка ресурсов"""
         
@@ -150,14 +442,18 @@ class CameraManager(QObject):
                 self.timer.stop()
                 self.timer = None
             
+            self.stop_recording()
+            
             if self.capture:
                 self.capture.release()
                 self.capture = None
             
+            self._release_frame_buffers()
+            
             self.is_capturing = False
             
         except Exception as e:
-            self.logger.error(f"Ошибка очистки ресурсов: {str(e)}")
+            self.logger.error("Ошибка очистки ресурсов: %s", e)
     
     def get_available_cameras(self):
         """
@@ -190,7 +486,7 @@ class CameraManager(QObject):
             self.stop_capture()
         
         self.camera_index = index
-        self.logger.info(f"Установлен индекс камеры: {index}")
+        self.logger.info("Установлен индекс камеры: %s", index)
     
     def __del__(self):
         """Деструктор для освобождения ресурсов"""
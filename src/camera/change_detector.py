@@ -0,0 +1,99 @@
+"""
+Детектор изменений кадров камеры
+
+Сравнивает уменьшенные сигнатуры кадров (усреднение по блокам
+в оттенках серого), чтобы не обрабатывать и не перерисовывать
+кадры статичной сцены. Усреднение по блоку подавляет шум
+матрицы, а сравнение по блокам замечает и небольшие локальные
+изменения, которые потерялись бы в среднем по всему кадру.
+"""
+
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """Определение изменившихся кадров по сигнатурам низкого разрешения"""
+
+    def __init__(self, signature_size=(64, 48), threshold=8, min_blocks=2):
+        """
+        Args:
+            signature_size: Размер сигнатуры (ширина, высота) в блоках
+            threshold: Минимальная разница яркости блока (0-255),
+                       при которой блок считается изменившимся
+            min_blocks: Минимальное число изменившихся блоков
+        """
+
+        self.signature_size = signature_size
+        self.threshold = threshold
+        self.min_blocks = min_blocks
+
+        self._reference = None
+        self.last_changed_blocks = 0
+
+        self.frames_total = 0
+        self.frames_skipped = 0
+
+    def signature(self, frame):
+        """
+        Сигнатура кадра
+
+        Args:
+            frame: Кадр BGR или в оттенках серого
+
+        Returns:
+            Массив int16 размера signature_size со средней яркостью блоков
+        """
+
+        small = cv2.resize(frame, self.signature_size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        return small.astype(np.int16)
+
+    def is_changed(self, frame):
+        """
+        Проверка, изменился ли кадр относительно последнего измененного
+
+        Сигнатура сравнивается с опорной - сигнатурой последнего
+        кадра, признанного изменившимся, поэтому медленный дрейф
+        сцены накапливается и со временем тоже будет замечен.
+
+        Args:
+            frame: Кадр камеры
+
+        Returns:
+            True, если кадр нужно обработать и показать
+        """
+
+        signature = self.signature(frame)
+        self.frames_total += 1
+
+        if self._reference is None or self._reference.shape != signature.shape:
+            self._reference = signature
+            self.last_changed_blocks = signature.size
+            return True
+
+        difference = np.abs(signature - self._reference)
+        self.last_changed_blocks = int(np.count_nonzero(difference > self.threshold))
+
+        if self.last_changed_blocks >= self.min_blocks:
+            self._reference = signature
+            return True
+
+        self.frames_skipped += 1
+        return False
+
+    def reset(self):
+        """Сброс опорной сигнатуры и счетчиков"""
+
+        self._reference = None
+        self.last_changed_blocks = 0
+        self.frames_total = 0
+        self.frames_skipped = 0
+
+    @property
+    def skipped_fraction(self):
+        """Доля пропущенных кадров (0-1)"""
+
+        return self.frames_skipped / self.frames_total if self.frames_total else 0.0
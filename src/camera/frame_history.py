@@ -0,0 +1,182 @@
+"""
+История последних кадров камеры
+
+Кольцевой буфер фиксированной емкости, выделяемый один раз под
+размер кадра. Позволяет получить кадр, показанный в заданный
+момент времени, без повторного чтения с устройства, и выбрать
+самый резкий кадр за интервал (серийная съемка).
+"""
+
+import time
+import logging
+import threading
+
+import numpy as np
+
+
+class FrameHistory:
+    """Предвыделенный кольцевой буфер кадров с временными метками"""
+
+    # Сторона уменьшенного изображения для оценки резкости
+    SHARPNESS_SIZE = 160
+
+    def __init__(self, capacity=30):
+        if capacity < 1:
+            raise ValueError("Емкость истории должна быть положительной")
+
+        self.capacity = capacity
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._frames = None                             # (capacity, H, W[, C])
+        self._timestamps = np.full(capacity, np.nan)    # time.monotonic() кадров
+        self._count = 0                                 # Всего добавлено кадров
+
+    def __len__(self):
+        with self._lock:
+            return min(self._count, self.capacity)
+
+    def clear(self):
+        """Очистка истории (буфер сохраняется)"""
+
+        with self._lock:
+            self._timestamps.fill(np.nan)
+            self._count = 0
+
+    def push(self, frame, timestamp=None):
+        """
+        Добавление кадра в историю
+
+        Кадр копируется в очередную ячейку буфера; при изменении
+        формы кадра буфер выделяется заново и история сбрасывается.
+
+        Args:
+            frame: Кадр камеры
+            timestamp: Время захвата по time.monotonic()
+        """
+
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._lock:
+            if (self._frames is None or self._frames.shape[1:] != frame.shape
+                    or self._frames.dtype != frame.dtype):
+                self._frames = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+                self._timestamps.fill(np.nan)
+                self._count = 0
+                self.logger.debug("Выделен буфер истории: %s x %s (%.1f МБ)",
+                                  self.capacity, frame.shape, self._frames.nbytes / 1e6)
+
+            slot = self._count % self.capacity
+            np.copyto(self._frames[slot], frame)
+            self._timestamps[slot] = timestamp
+            self._count += 1
+
+    def latest(self):
+        """
+        Последний добавленный кадр
+
+        Returns:
+            Кортеж (копия кадра, время) или None, если история пуста
+        """
+
+        with self._lock:
+            if self._count == 0:
+                return None
+
+            slot = (self._count - 1) % self.capacity
+            return self._frames[slot].copy(), float(self._timestamps[slot])
+
+    def frame_at(self, timestamp):
+        """
+        Кадр, актуальный на заданный момент
+
+        Возвращается последний кадр, полученный не позже timestamp
+        (то есть кадр, который был на экране в этот момент). Если
+        все кадры истории новее, возвращается самый старый.
+
+        Args:
+            timestamp: Момент времени по time.monotonic()
+
+        Returns:
+            Кортеж (копия кадра, время) или None, если история пуста
+        """
+
+        with self._lock:
+            if self._count == 0:
+                return None
+
+            timestamps = self._timestamps
+            valid = ~np.isnan(timestamps)
+            candidates = np.where(valid & (timestamps <= timestamp))[0]
+
+            if len(candidates):
+                slot = candidates[np.argmax(timestamps[candidates])]
+            else:
+                slot = np.where(valid)[0][np.nanargmin(timestamps[valid])]
+
+            return self._frames[slot].copy(), float(timestamps[slot])
+
+    def sharpest(self, window=1.0, until=None):
+        """
+        Самый резкий кадр за интервал (серийная съемка)
+
+        Args:
+            window: Длительность интервала в секундах
+            until: Конец интервала по time.monotonic() (по умолчанию - сейчас)
+
+        Returns:
+            Кортеж (копия кадра, время, оценка резкости) или None
+        """
+
+        if until is None:
+            until = time.monotonic()
+
+        with self._lock:
+            if self._count == 0:
+                return None
+
+            timestamps = self._timestamps
+            with np.errstate(invalid='ignore'):
+                slots = np.where((timestamps >= until - window) & (timestamps <= until))[0]
+
+            if len(slots) == 0:
+                slots = np.array([(self._count - 1) % self.capacity])
+
+            scores = self.sharpness(self._frames[slots])
+            best = int(np.argmax(scores))
+            slot = slots[best]
+
+            return self._frames[slot].copy(), float(timestamps[slot]), float(scores[best])
+
+    @classmethod
+    def sharpness(cls, frames):
+        """
+        Оценка резкости пачки кадров дисперсией лапласиана
+
+        Все кадры обрабатываются одной операцией numpy над стеком:
+        перевод в оттенки серого, прореживание до SHARPNESS_SIZE,
+        лапласиан 4-связности через срезы и дисперсия по кадру.
+
+        Args:
+            frames: Массив кадров (N, H, W[, C])
+
+        Returns:
+            Массив оценок длины N (больше - резче)
+        """
+
+        height, width = frames.shape[1:3]
+        step = max(1, max(height, width) // cls.SHARPNESS_SIZE)
+        frames = frames[:, ::step, ::step]
+
+        if frames.ndim == 4:
+            gray = frames[..., :3].astype(np.float32) @ np.array([0.114, 0.587, 0.299],
+                                                                 dtype=np.float32)
+        else:
+            gray = frames.astype(np.float32)
+
+        laplacian = (gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] +
+                     gray[:, 1:-1, :-2] + gray[:, 1:-1, 2:] -
+                     4.0 * gray[:, 1:-1, 1:-1])
+
+        return laplacian.reshape(len(laplacian), -1).var(axis=1)
@@ -0,0 +1,473 @@
+"""
+Синхронный захват с нескольких камер
+
+Каждый источник (камера, видеофайл или синтетический генератор)
+читается в собственном потоке, и каждый кадр получает метку
+общих монотонных часов. Синхронизатор подбирает для каждого
+источника кадр, ближайший по времени к общему моменту, а
+менеджер собирает подобранные кадры в мозаику для отображения.
+"""
+
+import math
+import time
+import logging
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+
+from processing.canvas import CanvasComposer
+
+
+class CameraSource:
+    """Источник кадров - веб-камера"""
+
+    def __init__(self, camera_index=0, width=640, height=480):
+        self.camera_index = camera_index
+        self.width = width
+        self.height = height
+        self.name = f"Камера {camera_index}"
+        self.capture = None
+
+    def open(self):
+        """Открытие устройства"""
+
+        self.capture = cv2.VideoCapture(self.camera_index)
+        if not self.capture.isOpened():
+            raise RuntimeError(f"Не удалось открыть камеру {self.camera_index}")
+
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+
+    def read(self):
+        """Чтение кадра (блокирует до поступления кадра с устройства)"""
+
+        ret, frame = self.capture.read()
+        return frame if ret else None
+
+    def close(self):
+        """Освобождение устройства"""
+
+        if self.capture:
+            self.capture.release()
+            self.capture = None
+
+
+class FileSource:
+    """Источник кадров - видеофайл, воспроизводимый в реальном времени"""
+
+    def __init__(self, file_path, fps=None, loop=True):
+        self.file_path = file_path
+        self.fps = fps
+        self.loop = loop
+        self.name = file_path
+        self.capture = None
+        self._next_time = None
+
+    def open(self):
+        """Открытие файла"""
+
+        self.capture = cv2.VideoCapture(self.file_path)
+        if not self.capture.isOpened():
+            raise RuntimeError(f"Не удалось открыть видео {self.file_path}")
+
+        if not self.fps:
+            self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+
+        self._next_time = time.monotonic()
+
+    def read(self):
+        """Чтение очередного кадра с соблюдением частоты файла"""
+
+        _wait_until(self._next_time)
+        self._next_time = max(self._next_time + 1.0 / self.fps, time.monotonic())
+
+        ret, frame = self.capture.read()
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+
+        return frame if ret else None
+
+    def close(self):
+        """Закрытие файла"""
+
+        if self.capture:
+            self.capture.release()
+            self.capture = None
+
+
+class SyntheticSource:
+    """Источник кадров - генератор тестовых кадров заданной частоты"""
+
+    def __init__(self, width=640, height=480, fps=30.0, seed=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.seed = seed
+        self.name = f"Синтетический {seed}"
+        self.frame_index = 0
+        self._background = None
+        self._next_time = None
+
+    def open(self):
+        """Подготовка фона генератора"""
+
+        x = np.linspace(0, 255, self.width, dtype=np.float32)
+        y = np.linspace(0, 255, self.height, dtype=np.float32)[:, None]
+        hue = (self.seed * 47) % 256
+
+        self._background = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self._background[..., 0] = (x + hue) % 256
+        self._background[..., 1] = y
+        self._background[..., 2] = 255 - (x * 0.5 + y * 0.5)
+
+        self.frame_index = 0
+        self._next_time = time.monotonic()
+
+    def read(self):
+        """Генерация кадра: фон с движущимся прямоугольником и номером кадра"""
+
+        _wait_until(self._next_time)
+        self._next_time = max(self._next_time + 1.0 / self.fps, time.monotonic())
+
+        frame = self._background.copy()
+        size = self.height // 4
+        x = (self.frame_index * 8) % max(1, self.width - size)
+        cv2.rectangle(frame, (x, size), (x + size, 2 * size), (255, 255, 255), -1)
+        cv2.putText(frame, f"{self.seed}:{self.frame_index}", (10, self.height - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+
+        self.frame_index += 1
+        return frame
+
+    def close(self):
+        """Освобождение фона"""
+
+        self._background = None
+
+
+def create_source(spec):
+    """
+    Создание источника по текстовому описанию
+
+    Args:
+        spec: Индекс камеры ('0'), 'synthetic[:номер]' или путь к видеофайлу
+
+    Returns:
+        Экземпляр источника
+    """
+
+    spec = spec.strip()
+
+    if spec.isdigit():
+        return CameraSource(int(spec))
+
+    if spec.lower().startswith('synthetic'):
+        _, _, seed = spec.partition(':')
+        return SyntheticSource(seed=int(seed) if seed.isdigit() else 0)
+
+    return FileSource(spec)
+
+
+def _wait_until(deadline):
+    """Ожидание момента deadline по time.monotonic()"""
+
+    delay = deadline - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+class SourceThread(threading.Thread):
+    """Поток чтения одного источника с метками общих часов"""
+
+    def __init__(self, source, clock=time.monotonic, history_size=8):
+        super().__init__(name=f"SourceThread[{source.name}]", daemon=True)
+
+        self.source = source
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._frames = deque(maxlen=history_size)   # (время, кадр)
+        self._running = threading.Event()
+        self._running.set()
+
+        self.frames_read = 0
+        self.error = None
+
+    def run(self):
+        """Основной цикл чтения"""
+
+        try:
+            self.source.open()
+
+            while self._running.is_set():
+                frame = self.source.read()
+                timestamp = self.clock()
+
+                if frame is None:
+                    raise RuntimeError(f"Источник {self.source.name} не вернул кадр")
+
+                with self._lock:
+                    self._frames.append((timestamp, frame))
+                    self.frames_read += 1
+
+        except Exception as e:
+            self.error = str(e)
+            self.logger.error("Ошибка источника %s: %s", self.source.name, e)
+
+        finally:
+            self.source.close()
+
+    def snapshot(self):
+        """
+        Последние кадры источника
+
+        Returns:
+            Список кортежей (время, кадр) от старых к новым
+        """
+
+        with self._lock:
+            return list(self._frames)
+
+    def stop(self, timeout=1.0):
+        """Остановка потока"""
+
+        self._running.clear()
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+
+class FrameSynchronizer:
+    """Подбор кадров разных источников по ближайшему времени"""
+
+    def __init__(self, tolerance=0.020):
+        self.tolerance = tolerance
+
+        self.matched = 0
+        self.out_of_tolerance = 0
+        self.last_skew = 0.0
+
+    def match(self, histories):
+        """
+        Подбор набора кадров
+
+        Опорный момент - самый поздний момент, до которого дошли все
+        источники (минимум из времен их последних кадров). Для каждого
+        источника берется кадр, ближайший к опорному моменту.
+
+        Args:
+            histories: Для каждого источника список (время, кадр)
+
+        Returns:
+            Словарь с ключами 'reference', 'timestamps', 'frames' и
+            'skew' (разброс времен набора) или None, если у какого-либо
+            источника еще нет кадров
+        """
+
+        if not histories or any(not history for history in histories):
+            return None
+
+        reference = min(history[-1][0] for history in histories)
+
+        timestamps = []
+        frames = []
+        for history in histories:
+            times = np.fromiter((entry[0] for entry in history), dtype=np.float64,
+                                count=len(history))
+            index = int(np.abs(times - reference).argmin())
+            timestamps.append(float(times[index]))
+            frames.append(history[index][1])
+
+        skew = max(timestamps) - min(timestamps)
+
+        self.matched += 1
+        self.last_skew = skew
+        if skew > self.tolerance:
+            self.out_of_tolerance += 1
+
+        return {
+            'reference': reference,
+            'timestamps': timestamps,
+            'frames': frames,
+            'skew': skew
+        }
+
+
+class MultiCameraManager(QObject):
+    """Менеджер синхронного захвата с нескольких источников"""
+
+    # Сигналы
+    frames_ready = pyqtSignal(object)     # Синхронный набор кадров (словарь match)
+    composite_ready = pyqtSignal(object)  # Мозаика из кадров набора
+    error_occurred = pyqtSignal(str)      # Произошла ошибка
+    capture_started = pyqtSignal()        # Захват запущен
+    capture_stopped = pyqtSignal()        # Захват остановлен
+
+    def __init__(self, sources=None, fps=30, tile_size=(640, 480), tolerance=0.020,
+                 clock=time.monotonic):
+        super().__init__()
+
+        self.sources = list(sources or [])
+        self.fps = fps
+        self.tile_width, self.tile_height = tile_size
+        self.clock = clock
+
+        self.synchronizer = FrameSynchronizer(tolerance)
+        self.threads = []
+        self.timer = None
+        self.is_capturing = False
+
+        self.logger = logging.getLogger(__name__)
+
+        self._composite = None
+        self._composers = []
+        self._last_reference = None
+
+    def add_source(self, source):
+        """
+        Добавление источника (до запуска захвата)
+
+        Args:
+            source: CameraSource, FileSource, SyntheticSource или
+                    объект с методами open/read/close и атрибутом name
+        """
+
+        if self.is_capturing:
+            raise RuntimeError("Нельзя добавить источник во время захвата")
+
+        self.sources.append(source)
+
+    def start_capture(self):
+        """Запуск потоков чтения и таймера синхронизации"""
+
+        try:
+            if self.is_capturing:
+                self.logger.warning("Захват уже запущен")
+                return
+
+            if not self.sources:
+                raise RuntimeError("Не задано ни одного источника")
+
+            self.threads = [SourceThread(source, self.clock) for source in self.sources]
+            for thread in self.threads:
+                thread.start()
+
+            self._last_reference = None
+
+            self.timer = QTimer()
+            self.timer.timeout.connect(self.poll)
+            self.timer.start(int(1000 / self.fps))
+
+            self.is_capturing = True
+            self.logger.info("Запущен захват с %d источников", len(self.sources))
+            self.capture_started.emit()
+
+        except Exception as e:
+            error_msg = f"Ошибка запуска захвата: {str(e)}"
+            self.logger.error(error_msg)
+            self.error_occurred.emit(error_msg)
+            self.stop_capture()
+
+    def stop_capture(self):
+        """Остановка таймера и всех потоков чтения"""
+
+        if self.timer:
+            self.timer.stop()
+            self.timer = None
+
+        for thread in self.threads:
+            thread.stop()
+        self.threads = []
+
+        if self.is_capturing:
+            self.is_capturing = False
+            self.logger.info("Захват с нескольких источников остановлен")
+            self.capture_stopped.emit()
+
+    def poll(self):
+        """
+        Подбор и отправка нового синхронного набора кадров
+
+        Returns:
+            Набор кадров (словарь FrameSynchronizer.match) или None,
+            если новых кадров нет
+        """
+
+        for thread in self.threads:
+            if thread.error:
+                error_msg = f"Ошибка чтения кадра: {thread.error}"
+                self.error_occurred.emit(error_msg)
+                self.stop_capture()
+                return None
+
+        frame_set = self.synchronizer.match([thread.snapshot() for thread in self.threads])
+        if frame_set is None or frame_set['reference'] == self._last_reference:
+            return None
+
+        self._last_reference = frame_set['reference']
+
+        self.frames_ready.emit(frame_set)
+        self.composite_ready.emit(self.compose(frame_set['frames']))
+
+        return frame_set
+
+    def compose(self, frames):
+        """
+        Сборка мозаики из кадров
+
+        Буфер мозаики выделяется один раз; каждый кадр вписывается
+        прямо в свою ячейку через CanvasComposer.
+
+        Args:
+            frames: Список кадров
+
+        Returns:
+            Изображение мозаики (перезаписывается следующим вызовом)
+        """
+
+        count = len(frames)
+        columns = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / columns)
+        shape = (rows * self.tile_height, columns * self.tile_width, 3)
+
+        if self._composite is None or self._composite.shape != shape:
+            self._composite = np.zeros(shape, dtype=np.uint8)
+
+        if len(self._composers) != count:
+            self._composers = [CanvasComposer(self.tile_width, self.tile_height)
+                               for _ in range(count)]
+
+        for index, frame in enumerate(frames):
+            if frame.ndim == 2:
+                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+            row, column = divmod(index, columns)
+            y = row * self.tile_height
+            x = column * self.tile_width
+            self._composers[index].compose(
+                frame, out=self._composite[y:y + self.tile_height, x:x + self.tile_width]
+            )
+
+        return self._composite
+
+    def get_stats(self):
+        """
+        Статистика захвата
+
+        Returns:
+            Словарь с количеством прочитанных кадров по источникам,
+            числом наборов, последним разбросом времен и числом
+            наборов с разбросом больше допуска
+        """
+
+        return {
+            'sources': [source.name for source in self.sources],
+            'frames_read': [thread.frames_read for thread in self.threads],
+            'sets': self.synchronizer.matched,
+            'skew_ms': self.synchronizer.last_skew * 1000,
+            'out_of_tolerance': self.synchronizer.out_of_tolerance
+        }
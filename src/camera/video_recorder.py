@@ -0,0 +1,279 @@
+"""
+Запись видео с камеры
+
+Кодирование кадров выполняется в отдельном потоке, который
+получает кадры через ограниченную очередь. При переполнении
+очереди кадры отбрасываются согласно политике, поэтому запись
+никогда не снижает частоту кадров предпросмотра. Время каждого
+записанного кадра сохраняется в CSV файл рядом с видео.
+
+Кадр копируется в буфер из пула при постановке в очередь, поэтому
+вызывающий код может сразу переиспользовать свой буфер; после
+записи буфер возвращается в пул.
+"""
+
+import os
+import csv
+import time
+import logging
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+from processing.buffer_pool import get_buffer_pool
+
+
+class VideoRecorder(threading.Thread):
+    """Фоновая запись кадров в видеофайл через cv2.VideoWriter"""
+
+    # Политики переполнения очереди
+    DROP_OLDEST = 'drop_oldest'   # вытеснить самый старый кадр очереди
+    DROP_NEWEST = 'drop_newest'   # отбросить поступивший кадр
+
+    # Кодеки по расширению файла
+    FOURCC_BY_EXTENSION = {
+        '.mp4': 'mp4v',
+        '.avi': 'MJPG',
+        '.mkv': 'XVID'
+    }
+
+    def __init__(self, file_path, fps=30.0, queue_size=64, drop_policy=DROP_OLDEST,
+                 transform=None, fourcc=None, frame_size=None):
+        super().__init__(name="VideoRecorder", daemon=True)
+
+        if drop_policy not in (self.DROP_OLDEST, self.DROP_NEWEST):
+            raise ValueError(f"Неизвестная политика очереди: {drop_policy}")
+
+        self.file_path = file_path
+        self.timestamps_path = os.path.splitext(file_path)[0] + '.timestamps.csv'
+        self.fps = fps
+        self.queue_size = max(1, queue_size)
+        self.drop_policy = drop_policy
+
+        # Преобразование кадра перед записью (выполняется в потоке записи)
+        self.transform = transform
+
+        extension = os.path.splitext(file_path)[1].lower()
+        self.fourcc = fourcc or self.FOURCC_BY_EXTENSION.get(extension, 'mp4v')
+
+        self.logger = logging.getLogger(__name__)
+
+        self._queue = deque()
+        self.buffer_pool = get_buffer_pool()
+        self._condition = threading.Condition()
+        self._stopping = False
+
+        # Размер видео (ширина, высота); кадры другого размера масштабируются
+        self.frame_size = tuple(frame_size) if frame_size is not None else None
+
+        self._writer = None
+        self._timestamps_file = None
+        self._first_timestamp = None
+
+        # Статистика очереди
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.max_depth = 0
+        self.error = None
+
+    def submit(self, frame, timestamp=None):
+        """
+        Постановка кадра в очередь записи (не блокирует)
+
+        Args:
+            frame: Кадр BGR
+            timestamp: Время захвата по time.monotonic() (по умолчанию - текущее)
+
+        Returns:
+            True, если кадр принят в очередь
+        """
+
+        if frame is None:
+            return False
+
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._condition:
+            if self._stopping:
+                return False
+
+            self.frames_submitted += 1
+
+            if len(self._queue) >= self.queue_size:
+                self.frames_dropped += 1
+
+                if self.drop_policy == self.DROP_NEWEST:
+                    return False
+
+                self.buffer_pool.release(self._queue.popleft()[0])
+
+            buffer = self.buffer_pool.acquire_like(frame)
+            np.copyto(buffer, frame)
+
+            self._queue.append((buffer, timestamp, time.time()))
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._condition.notify()
+
+        return True
+
+    @property
+    def depth(self):
+        """Текущее количество кадров в очереди"""
+
+        with self._condition:
+            return len(self._queue)
+
+    def get_stats(self):
+        """
+        Статистика записи
+
+        Returns:
+            Словарь с глубиной очереди, ее размером, политикой
+            и счетчиками принятых, записанных и отброшенных кадров
+        """
+
+        with self._condition:
+            return {
+                'depth': len(self._queue),
+                'max_depth': self.max_depth,
+                'queue_size': self.queue_size,
+                'drop_policy': self.drop_policy,
+                'submitted': self.frames_submitted,
+                'written': self.frames_written,
+                'dropped': self.frames_dropped
+            }
+
+    def start(self):
+        """
+        Открытие видеофайла и запуск потока записи
+
+        VideoWriter и файл временных меток открываются в вызывающем
+        потоке, поэтому неподдерживаемый кодек или недоступный путь
+        сообщаются сразу, а не после первого кадра.
+
+        Raises:
+            ValueError: Если не задан размер кадра
+            RuntimeError: Если VideoWriter не удалось открыть
+            OSError: Если не удалось создать файл временных меток
+        """
+
+        if self.frame_size is None:
+            raise ValueError("Не задан размер кадра видео")
+
+        writer = cv2.VideoWriter(
+            self.file_path, cv2.VideoWriter_fourcc(*self.fourcc),
+            self.fps, self.frame_size
+        )
+
+        try:
+            if not writer.isOpened():
+                raise RuntimeError(
+                    f"Не удалось открыть VideoWriter ({self.fourcc}) для {self.file_path}"
+                )
+
+            self._timestamps_file = open(self.timestamps_path, 'w', newline='', encoding='utf-8')
+
+        except Exception:
+            writer.release()
+            raise
+
+        self._writer = writer
+        super().start()
+
+    def run(self):
+        """Основной цикл потока записи"""
+
+        try:
+            timestamps = csv.writer(self._timestamps_file)
+            timestamps.writerow(['frame', 'pts_seconds', 'monotonic_seconds', 'unix_time'])
+
+            while True:
+                with self._condition:
+                    while not self._queue and not self._stopping:
+                        self._condition.wait()
+
+                    if not self._queue:
+                        break
+
+                    frame, timestamp, wall_time = self._queue.popleft()
+
+                try:
+                    self._write_frame(frame)
+                finally:
+                    self.buffer_pool.release(frame)
+
+                if self._first_timestamp is None:
+                    self._first_timestamp = timestamp
+
+                timestamps.writerow([
+                    self.frames_written,
+                    f"{timestamp - self._first_timestamp:.6f}",
+                    f"{timestamp:.6f}",
+                    f"{wall_time:.6f}"
+                ])
+                self.frames_written += 1
+
+        except Exception as e:
+            self.error = str(e)
+            self.logger.error("Ошибка записи видео: %s", e)
+
+        finally:
+            # Поток завершается: новые кадры больше не принимаются
+            with self._condition:
+                self._stopping = True
+                self._release_queue()
+
+            self._writer.release()
+            self._writer = None
+            self._timestamps_file.close()
+
+            self.logger.info("Запись завершена: %s (записано %d, отброшено %d)",
+                             self.file_path, self.frames_written, self.frames_dropped)
+
+    def _write_frame(self, frame):
+        """Преобразование и кодирование одного кадра"""
+
+        if self.transform is not None:
+            frame = self.transform(frame)
+
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+        height, width = frame.shape[:2]
+
+        # Размер видео задается при открытии файла
+        if (width, height) != self.frame_size:
+            frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+
+        self._writer.write(frame)
+
+    def stop(self, timeout=5.0):
+        """
+        Остановка записи
+
+        Кадры, уже стоящие в очереди, дописываются перед закрытием файла.
+
+        Args:
+            timeout: Максимальное время ожидания потока записи
+        """
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+
+            # Поток не запускался: кадры очереди записаны не будут
+            if self.ident is None:
+                self._release_queue()
+
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+    def _release_queue(self):
+        """Возврат буферов кадров очереди в пул (под блокировкой очереди)"""
+
+        while self._queue:
+            self.buffer_pool.release(self._queue.popleft()[0])
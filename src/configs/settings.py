@@ -28,7 +28,12 @@ class AppSettings:
                 'default_index': 0,
                 'width': 640,
                 'height': 480,
-                'fps': 30
+                'fps': 30,
+                # Опрос камеры, когда окно не в фокусе / свернуто:
+                # 'active', 'keep_alive' (редкий опрос) или 'paused'
+                'unfocused_mode': 'keep_alive',
+                'hidden_mode': 'paused',
+                'keep_alive_fps': 2
             },
             # Настройки обработки
             'processing': {
@@ -42,14 +47,25 @@ class AppSettings:
                 'theme': 'default',
                 'language': 'ru',
                 'show_tooltips': True,
-                'auto_save': False
+                'auto_save': False,
+                # Отображение: 'raster', 'opengl' или 'auto' (OpenGL, если доступен)
+                'viewer_backend': 'raster'
             },
             # Настройки файлов
             'files': {
                 'last_directory': '',
+                'recent_files': [],
+                'max_recent_files': 10,
                 'default_save_format': 'png',
                 'jpeg_quality': 95,
                 'png_compression': 9
+            },
+            # Дисковый кэш превью (пустой каталог - ~/.cache/image_processor/thumbnails)
+            'cache': {
+                'directory': '',
+                'max_size_mb': 256,
+                'preview_size': 512,
+                'memory_cache_mb': 512
             }
         }
         
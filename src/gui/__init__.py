@@ -5,10 +5,16 @@ GUI модули приложения обработки изображений
 from .main_window import ImageProcessorWindow
 from .image_viewer import ImageViewer
 from .control_panel import ControlPanel
+from .histogram_widget import HistogramWidget
+from .folder_browser import FolderBrowser
+from .gl_canvas import GLImageCanvas
 
 __all__ = [
     'ImageProcessorWindow',
     'ImageViewer', 
-    'ControlPanel'
+    'ControlPanel',
+    'HistogramWidget',
+    'FolderBrowser',
+    'GLImageCanvas'
 ]
 
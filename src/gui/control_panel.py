@@ -4,8 +4,8 @@
 Содержит элементы управления для загрузки изображений,
 работы с камерой, выбора RGB каналов и функций обработки.
 """
-import torch
 import cv2
+from importlib import metadata
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, 
     QPushButton, QComboBox, QLabel, QSlider, QSpinBox,
@@ -14,6 +14,9 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont
 
+from processing.image_store import get_image_store
+from .histogram_widget import HistogramWidget
+
 class ControlPanel(QWidget):
     """Панель управления приложением"""
     
@@ -24,11 +27,12 @@ class ControlPanel(QWidget):
     channel_changed = pyqtSignal(str)
     processing_requested = pyqtSignal(str, dict)  # function_name, parameters
     save_image_requested = pyqtSignal()
+    exact_statistics_requested = pyqtSignal()
     
     def __init__(self):
         super().__init__()
         
-        self.current_image = None
+        self.current_image = None      # ImageHandle из общего хранилища
         self.camera_active = False
         
         self.init_ui()
@@ -62,6 +66,7 @@ class ControlPanel(QWidget):
         main_layout.addWidget(self.create_camera_group())
         main_layout.addWidget(self.create_channel_group())
         main_layout.addWidget(self.create_variant_functions_group())
+        main_layout.addWidget(self.create_statistics_group())
         main_layout.addWidget(self.create_info_group())
         
         # Растягивающий элемент
@@ -202,6 +207,30 @@ class ControlPanel(QWidget):
         group.setLayout(layout)
         return group
     
+    def create_statistics_group(self):
+        """Создание группы статистики каналов"""
+        
+        group = QGroupBox("📊 Статистика каналов")
+        layout = QVBoxLayout()
+        
+        # Гистограммы каналов
+        self.histogram_widget = HistogramWidget()
+        layout.addWidget(self.histogram_widget)
+        
+        # Среднее, СКО и диапазон по каналам
+        self.statistics_label = QLabel("Нет данных")
+        self.statistics_label.setStyleSheet("color: #444; font-size: 11px; font-family: monospace;")
+        self.statistics_label.setWordWrap(True)
+        layout.addWidget(self.statistics_label)
+        
+        # Кнопка точного расчета
+        exact_btn = QPushButton("🎯 Точная статистика")
+        exact_btn.clicked.connect(self.exact_statistics_requested.emit)
+        layout.addWidget(exact_btn)
+        
+        group.setLayout(layout)
+        return group
+    
     def create_info_group(self):
         """Создание группы информации"""
         
@@ -214,9 +243,10 @@ class ControlPanel(QWidget):
         except ImportError:
             opencv_version = "не установлен"
         
+        # Версия PyTorch берется из метаданных пакета без его импорта
         try:
-            pytorch_version = torch.__version__
-        except ImportError:
+            pytorch_version = metadata.version('torch')
+        except metadata.PackageNotFoundError:
             pytorch_version = "не установлен"
         
         versions_text = f"""
@@ -293,10 +323,28 @@ class ControlPanel(QWidget):
         if not ok2:
             return
         
+        # Выбор пресета качества
+        presets = {
+            "Авто (по коэффициенту масштабирования)": 'auto',
+            "Быстро (ближайший сосед)": 'fast',
+            "Сбалансировано (билинейная)": 'balanced',
+            "Качество (area / Lanczos)": 'quality',
+            "Пирамида (pyrDown + area)": 'pyramid'
+        }
+        preset_name, ok3 = QInputDialog.getItem(
+            self, "Изменение размера",
+            "Выберите пресет:",
+            list(presets), 0, False
+        )
+        
+        if not ok3:
+            return
+        
         # Запрос обработки
         parameters = {
             'new_width': new_width,
-            'new_height': new_height
+            'new_height': new_height,
+            'preset': presets[preset_name]
         }
         self.processing_requested.emit('resize_image', parameters)
     
@@ -400,9 +448,20 @@ class ControlPanel(QWidget):
         if not ok:
             return
         
+        # Для непрямых углов можно расширить холст, чтобы не обрезать углы
+        expand = False
+        if angle % 90 != 0:
+            answer = QMessageBox.question(
+                self, "Поворот изображения",
+                "Расширить холст, чтобы углы изображения не обрезались?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            expand = answer == QMessageBox.Yes
+        
         # Запрос обработки
         parameters = {
-            'angle': angle
+            'angle': angle,
+            'expand': expand
         }
         self.processing_requested.emit('rotate_image', parameters)
     
@@ -418,7 +477,7 @@ class ControlPanel(QWidget):
         kernel_size, ok = QInputDialog.getInt(
             self, "Размытие изображения", 
             "Введите размер ядра (нечетное число):",
-            5, 3, 31, 2  
+            5, 3, 201, 2
         )
         
         if not ok:
@@ -555,7 +614,11 @@ class ControlPanel(QWidget):
     def on_image_loaded(self, image):
         """Слот для обработки загрузки нового изображения"""
         
-        self.current_image = image
+        # Панель разделяет изображение окна через хранилище, без копии
+        previous = self.current_image
+        self.current_image = get_image_store().put(image) if image is not None else None
+        if previous is not None:
+            previous.release()
     
         if image is not None:
             # Включение кнопок обработки
@@ -583,6 +646,32 @@ class ControlPanel(QWidget):
             
             self.file_info_label.setText("Файл не выбран")
     
+    def on_statistics_ready(self, statistics):
+        """Слот для отображения рассчитанной статистики каналов"""
+        
+        # Порядок отображения: R, G, B
+        display_names = {'red': 'R', 'green': 'G', 'blue': 'B', 'gray': 'Y'}
+        channels = statistics['channels']
+        ordered = [name for name in display_names if name in channels]
+        
+        lines = []
+        for name in ordered:
+            info = channels[name]
+            lines.append(
+                f"{display_names[name]}: μ={info['mean']:.1f} σ={info['std']:.1f} "
+                f"[{info['min']}..{info['max']}]"
+            )
+        
+        if statistics['exact']:
+            lines.append(f"Точно, пикселей: {statistics['pixel_count']}")
+        else:
+            lines.append(f"Выборка 1/{statistics['step']}, пикселей: {statistics['pixel_count']}")
+        
+        self.statistics_label.setText("\n".join(lines))
+        self.histogram_widget.set_histograms(
+            {name: channels[name]['histogram'] for name in ordered}
+        )
+    
     def on_camera_started(self):
         """Слот для обработки запуска камеры"""
         
@@ -592,6 +681,33 @@ class ControlPanel(QWidget):
         self.camera_status_label.setText("Камера активна")
         self.camera_status_label.setStyleSheet("color: green; font-size: 11px;")
     
+    def update_camera_status(self, skipped_fraction, render_stats=None, pool_stats=None):
+        """
+        Обновление строки состояния камеры
+        
+        Args:
+            skipped_fraction: Доля пропущенных неизменных кадров (0-1)
+            render_stats: Статистика отрисовки ImageViewer.get_render_stats()
+            pool_stats: Статистика пула буферов BufferPool.get_stats()
+        """
+        
+        if not self.camera_active:
+            return
+        
+        text = f"Камера активна · пропущено {skipped_fraction:.0%} кадров"
+        
+        if render_stats:
+            text += (f"\nОтрисовано {render_stats['rendered']}, "
+                     f"объединено {render_stats['skipped']} "
+                     f"(скрыто {render_stats['skipped_hidden']})")
+        
+        if pool_stats:
+            text += (f"\nБуферы: выделено {pool_stats['allocations']}, "
+                     f"повторно {pool_stats['reuses']}, "
+                     f"пик {pool_stats['high_water_bytes'] / (1024 * 1024):.1f} МБ")
+        
+        self.camera_status_label.setText(text)
+    
     def on_camera_stopped(self):
         """Слот для обработки остановки камеры"""
         
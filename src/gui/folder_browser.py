@@ -0,0 +1,423 @@
+"""
+Панель просмотра папки
+
+Отображает изображения каталога сеткой миниатюр. Миниатюры
+декодируются лениво - только для видимых ячеек - пулом потоков
+с декодированием в уменьшенном разрешении, хранятся в
+ограниченном LRU кэше и отменяются при прокрутке за пределы
+видимой области.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+import cv2
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListView,
+    QPushButton, QFileDialog, QAbstractItemView
+)
+from PyQt5.QtCore import (
+    Qt, QObject, QRunnable, QThreadPool, QAbstractListModel,
+    QModelIndex, QSize, QTimer, pyqtSignal
+)
+from PyQt5.QtGui import QImage, QImageReader, QPixmap, QIcon, QColor
+
+
+class ThumbnailSignals(QObject):
+    """Сигналы задач декодирования (QRunnable не является QObject)"""
+
+    # путь, поколение каталога, миниатюра
+    loaded = pyqtSignal(str, int, QImage)
+
+    # задача завершена (с результатом или без)
+    finished = pyqtSignal(object)
+
+
+class ThumbnailTask(QRunnable):
+    """Задача декодирования одной миниатюры"""
+
+    # Коэффициенты уменьшения при декодировании (JPEG декодируется сразу в малом размере)
+    REDUCED_MODES = (
+        (8, cv2.IMREAD_REDUCED_COLOR_8),
+        (4, cv2.IMREAD_REDUCED_COLOR_4),
+        (2, cv2.IMREAD_REDUCED_COLOR_2)
+    )
+
+    def __init__(self, file_path, generation, size, signals):
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.file_path = file_path
+        self.generation = generation
+        self.size = size
+        self.signals = signals
+        self.cancelled = threading.Event()
+
+    def read_mode(self):
+        """
+        Выбор режима cv2.imread по размеру из заголовка файла
+
+        Returns:
+            Флаг IMREAD_REDUCED_COLOR_* или IMREAD_COLOR
+        """
+
+        # QImageReader читает только заголовок
+        header_size = QImageReader(self.file_path).size()
+        shortest = min(header_size.width(), header_size.height())
+
+        if shortest <= 0:
+            return cv2.IMREAD_REDUCED_COLOR_2
+
+        for factor, mode in self.REDUCED_MODES:
+            if shortest // factor >= self.size:
+                return mode
+
+        return cv2.IMREAD_COLOR
+
+    def run(self):
+        """Декодирование и уменьшение изображения"""
+
+        try:
+            if self.cancelled.is_set():
+                return
+
+            image = cv2.imread(self.file_path, self.read_mode())
+            if image is None or self.cancelled.is_set():
+                return
+
+            height, width = image.shape[:2]
+            scale = self.size / max(height, width)
+            if scale < 1.0:
+                image = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+
+            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            height, width = rgb_image.shape[:2]
+
+            # Копия отвязывает QImage от буфера numpy
+            thumbnail = QImage(rgb_image.data, width, height, 3 * width,
+                               QImage.Format_RGB888).copy()
+
+            if not self.cancelled.is_set():
+                self.signals.loaded.emit(self.file_path, self.generation, thumbnail)
+
+        except Exception as e:
+            logging.getLogger(__name__).warning("Ошибка миниатюры %s: %s", self.file_path, e)
+
+        finally:
+            self.signals.finished.emit(self)
+
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    Модель списка файлов каталога с ленивыми миниатюрами
+
+    Представление запрашивает данные только для видимых ячеек,
+    поэтому задача декодирования ставится в очередь при первом
+    запросе иконки. Для 10k+ файлов модель хранит только пути.
+    """
+
+    def __init__(self, thumbnail_size=128, cache_size=500, max_threads=None):
+        super().__init__()
+
+        self.thumbnail_size = thumbnail_size
+        self.cache_size = cache_size
+
+        self.files = []
+        self.generation = 0
+
+        self._cache = OrderedDict()     # путь -> QIcon
+        self._tasks = {}                # путь -> ожидаемая задача
+        self._rows = {}                 # путь -> строка
+        self._failed = set()            # файлы, которые не удалось декодировать
+
+        # Ссылки на все запущенные задачи до их завершения
+        # (пул не владеет задачами, setAutoDelete(False))
+        self._live = set()
+
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads or max(2, min(4, os.cpu_count() or 2)))
+
+        self.signals = ThumbnailSignals()
+        self.signals.loaded.connect(self.on_thumbnail_loaded)
+        self.signals.finished.connect(self.on_task_finished)
+
+        placeholder = QPixmap(thumbnail_size, thumbnail_size)
+        placeholder.fill(QColor('#e8e8e8'))
+        self.placeholder = QIcon(placeholder)
+
+    def set_files(self, files):
+        """
+        Замена списка файлов
+
+        Args:
+            files: Список путей к изображениям
+        """
+
+        self.cancel_all()
+
+        self.beginResetModel()
+        self.generation += 1
+        self.files = list(files)
+        self._rows = {path: row for row, path in enumerate(self.files)}
+        self._failed.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        file_path = self.files[index.row()]
+
+        if role == Qt.DisplayRole:
+            return os.path.basename(file_path)
+
+        if role == Qt.ToolTipRole:
+            return file_path
+
+        if role == Qt.DecorationRole:
+            icon = self._cache.get(file_path)
+            if icon is not None:
+                self._cache.move_to_end(file_path)
+                return icon
+
+            self.request_thumbnail(file_path)
+            return self.placeholder
+
+        return None
+
+    def request_thumbnail(self, file_path):
+        """Постановка задачи декодирования (если она еще не в очереди)"""
+
+        if file_path in self._tasks or file_path in self._failed:
+            return
+
+        task = ThumbnailTask(file_path, self.generation, self.thumbnail_size, self.signals)
+        self._tasks[file_path] = task
+        self._live.add(task)
+        self.pool.start(task)
+
+    def on_thumbnail_loaded(self, file_path, generation, thumbnail):
+        """Сохранение готовой миниатюры (в GUI потоке)"""
+
+        if generation != self.generation:
+            return
+
+        self._tasks.pop(file_path, None)
+
+        self._cache[file_path] = QIcon(QPixmap.fromImage(thumbnail))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        row = self._rows.get(file_path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def on_task_finished(self, task):
+        """Освобождение завершенной задачи (в GUI потоке)"""
+
+        self._live.discard(task)
+
+        # Задача без результата и без отмены - файл не декодируется
+        if self._tasks.get(task.file_path) is task:
+            del self._tasks[task.file_path]
+            if not task.cancelled.is_set():
+                self._failed.add(task.file_path)
+
+    def cancel_outside(self, first_row, last_row):
+        """
+        Отмена задач для ячеек вне видимого диапазона строк
+
+        Еще не начатые задачи удаляются из очереди пула,
+        выполняющиеся - помечаются и не отправляют результат.
+        """
+
+        for file_path, task in list(self._tasks.items()):
+            row = self._rows.get(file_path, -1)
+            if first_row <= row <= last_row:
+                continue
+
+            self._cancel(task)
+            del self._tasks[file_path]
+
+    def cancel_all(self):
+        """Отмена всех задач декодирования"""
+
+        for task in self._tasks.values():
+            self._cancel(task)
+        self._tasks.clear()
+
+    def _cancel(self, task):
+        """Отмена задачи: удаление из очереди или пометка выполняющейся"""
+
+        task.cancelled.set()
+        if self.pool.tryTake(task):
+            self._live.discard(task)
+
+    def row_of(self, file_path):
+        """Строка модели для файла (None, если файла нет в каталоге)"""
+
+        return self._rows.get(file_path)
+
+    def pending_count(self):
+        """Количество задач в очереди или в работе"""
+
+        return len(self._tasks)
+
+
+class FolderBrowser(QWidget):
+    """Панель с сеткой миниатюр изображений каталога"""
+
+    # Сигналы
+    file_activated = pyqtSignal(str)
+
+    def __init__(self, file_handler, thumbnail_size=128):
+        super().__init__()
+
+        self.file_handler = file_handler
+        self.thumbnail_size = thumbnail_size
+        self.directory = None
+        self.logger = logging.getLogger(__name__)
+
+        self.model = ThumbnailModel(thumbnail_size)
+
+        # Отмена выполняется после окончания прокрутки, а не на каждый шаг
+        self.cancel_timer = QTimer(self)
+        self.cancel_timer.setSingleShot(True)
+        self.cancel_timer.setInterval(100)
+        self.cancel_timer.timeout.connect(self.cancel_invisible)
+
+        self.init_ui()
+
+    def init_ui(self):
+        """Инициализация пользовательского интерфейса"""
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(4, 4, 4, 4)
+        self.setLayout(layout)
+
+        header = QHBoxLayout()
+        self.directory_label = QLabel("Папка не выбрана")
+        self.directory_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        header.addWidget(self.directory_label, 1)
+
+        open_btn = QPushButton("📂 Папка...")
+        open_btn.clicked.connect(self.choose_directory)
+        header.addWidget(open_btn)
+        layout.addLayout(header)
+
+        self.list_view = QListView()
+        self.list_view.setViewMode(QListView.IconMode)
+        self.list_view.setResizeMode(QListView.Adjust)
+        self.list_view.setMovement(QListView.Static)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.list_view.setBatchSize(200)
+        self.list_view.setIconSize(QSize(self.thumbnail_size, self.thumbnail_size))
+        self.list_view.setGridSize(QSize(self.thumbnail_size + 24, self.thumbnail_size + 36))
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.setModel(self.model)
+
+        self.list_view.activated.connect(self.on_activated)
+        self.list_view.verticalScrollBar().valueChanged.connect(self.schedule_cancel)
+        layout.addWidget(self.list_view)
+
+    def choose_directory(self):
+        """Диалог выбора каталога"""
+
+        directory = QFileDialog.getExistingDirectory(self, "Выберите папку",
+                                                     self.directory or "")
+        if directory:
+            self.set_directory(directory)
+
+    def set_directory(self, directory):
+        """
+        Отображение каталога
+
+        Args:
+            directory: Путь к каталогу
+        """
+
+        directory = os.path.abspath(directory)
+        if directory == self.directory:
+            return
+
+        files = self.file_handler.list_directory_images(directory)
+
+        self.directory = directory
+        self.model.set_files(files)
+        self.directory_label.setText(f"{directory} ({len(files)})")
+
+        self.logger.info("Открыта папка %s: %d изображений", directory, len(files))
+
+    def select_file(self, file_path):
+        """Выделение файла в сетке (без повторного открытия)"""
+
+        row = self.model.row_of(os.path.abspath(file_path))
+        if row is not None:
+            index = self.model.index(row)
+            self.list_view.setCurrentIndex(index)
+            self.list_view.scrollTo(index)
+
+    def visible_rows(self):
+        """
+        Диапазон видимых строк модели
+
+        Ячейки сетки имеют одинаковый размер gridSize, поэтому
+        диапазон вычисляется по положению полосы прокрутки.
+
+        Returns:
+            Кортеж (первая строка, последняя строка)
+        """
+
+        grid = self.list_view.gridSize()
+        viewport = self.list_view.viewport().rect()
+
+        per_line = max(1, viewport.width() // max(1, grid.width()))
+        first_line = self.list_view.verticalScrollBar().value() // max(1, grid.height())
+        line_count = viewport.height() // max(1, grid.height()) + 2
+
+        first_row = first_line * per_line
+        last_row = min(self.model.rowCount(), (first_line + line_count) * per_line) - 1
+
+        return first_row, last_row
+
+    def schedule_cancel(self):
+        """Отложенная отмена невидимых задач (перезапуск таймера)"""
+
+        self.cancel_timer.start()
+
+    def cancel_invisible(self):
+        """Отмена задач для ячеек, ушедших из видимой области"""
+
+        self.model.cancel_outside(*self.visible_rows())
+
+    def on_activated(self, index):
+        """Открытие выбранного изображения"""
+
+        if index.isValid():
+            self.file_activated.emit(self.model.files[index.row()])
+
+    def shutdown(self):
+        """Отмена задач и ожидание выполняющихся перед закрытием"""
+
+        self.cancel_timer.stop()
+        self.model.cancel_all()
+        self.model.pool.waitForDone(2000)
+
+    def hideEvent(self, event):
+        """Скрытая панель не декодирует миниатюры"""
+
+        self.model.cancel_all()
+        super().hideEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_cancel()
@@ -0,0 +1,269 @@
+"""
+Холст просмотра изображений на OpenGL
+
+Кадр передается в виде тайлов QImage, которые движок QPainter для
+OpenGL один раз загружает в текстуры (кэш текстур привязан к
+cacheKey изображения). Масштабирование и панорамирование меняют
+только матрицу преобразования: пиксели на CPU не пересчитываются.
+Перед созданием холста нужно проверить opengl_available(), иначе
+используется обычный растровый путь ImageViewer.
+"""
+
+import logging
+
+from PyQt5 import sip
+from PyQt5.QtWidgets import QOpenGLWidget
+from PyQt5.QtCore import Qt, pyqtSignal, QPointF, QRectF
+from PyQt5.QtGui import (
+    QImage, QPainter, QColor, QOpenGLContext, QOffscreenSurface
+)
+
+
+_opengl_status = None
+
+
+def opengl_available():
+    """
+    Проверка возможности создать контекст OpenGL
+
+    Результат кэшируется. Требует созданного QApplication.
+
+    Returns:
+        Кортеж (доступен ли OpenGL, описание контекста или причина отказа)
+    """
+
+    global _opengl_status
+
+    if _opengl_status is None:
+        context = QOpenGLContext()
+
+        if not context.create():
+            _opengl_status = (False, "не удалось создать контекст OpenGL")
+        else:
+            surface = QOffscreenSurface()
+            surface.setFormat(context.format())
+            surface.create()
+
+            if not context.makeCurrent(surface):
+                _opengl_status = (False, "контекст OpenGL не активируется")
+            else:
+                version = context.format().version()
+                kind = "OpenGL ES" if context.isOpenGLES() else "OpenGL"
+                _opengl_status = (True, f"{kind} {version[0]}.{version[1]}")
+                context.doneCurrent()
+
+    return _opengl_status
+
+
+class GLImageCanvas(QOpenGLWidget):
+    """Холст просмотра: тайлы-текстуры, масштаб и сдвиг через преобразование"""
+
+    # Сигналы
+    clicked = pyqtSignal(int, int)    # Клик в координатах изображения
+    gl_failed = pyqtSignal(str)       # Контекст OpenGL не работает
+
+    # Размер тайла не превышает минимальный гарантированный размер текстуры
+    TILE_SIZE = 2048
+
+    BACKGROUND = QColor(0xfa, 0xfa, 0xfa)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.logger = logging.getLogger(__name__)
+
+        self.image_width = 0
+        self.image_height = 0
+        self.zoom = 1.0
+        self.smooth = True
+
+        # Сдвиг видимой области в координатах экрана (для изображений больше окна)
+        self.offset = QPointF(0, 0)
+
+        # Функция рисования поверх изображения (в координатах изображения)
+        self.overlay_painter = None
+
+        self._buffer = None     # numpy RGB/Gray, на который ссылаются тайлы
+        self._format = None
+        self._tiles = []        # [(x, y, QImage)]
+
+        self._press_position = None
+        self._press_offset = None
+
+        self.setMinimumSize(600, 400)
+
+    def initializeGL(self):
+        """Проверка контекста после создания виджета"""
+
+        if not self.context() or not self.context().isValid():
+            self.gl_failed.emit("контекст OpenGL недействителен")
+
+    def set_image(self, buffer):
+        """
+        Замена изображения
+
+        Тайлы ссылаются на buffer без копирования, поэтому buffer не
+        должен изменяться извне до следующего set_image.
+
+        Args:
+            buffer: C-непрерывный массив RGB (H, W, 3) или оттенков серого (H, W)
+        """
+
+        self._buffer = buffer
+        self._format = QImage.Format_RGB888 if buffer.ndim == 3 else QImage.Format_Grayscale8
+        self.image_height, self.image_width = buffer.shape[:2]
+
+        self._tiles = [
+            (x, y, self._tile_image(x, y))
+            for y in range(0, self.image_height, self.TILE_SIZE)
+            for x in range(0, self.image_width, self.TILE_SIZE)
+        ]
+
+        self.clamp_offset()
+        self.update()
+
+    def update_region(self, patch, x, y):
+        """
+        Замена области изображения
+
+        Пиксели копируются в буфер, а заново создаются (и, значит,
+        загружаются в текстуры) только тайлы, пересекающие область.
+
+        Args:
+            patch: Новые пиксели области в формате буфера
+            x, y: Левый верхний угол области
+        """
+
+        height, width = patch.shape[:2]
+        self._buffer[y:y + height, x:x + width] = patch
+
+        for index, (tile_x, tile_y, _) in enumerate(self._tiles):
+            if (tile_x < x + width and x < tile_x + self.TILE_SIZE and
+                    tile_y < y + height and y < tile_y + self.TILE_SIZE):
+                self._tiles[index] = (tile_x, tile_y, self._tile_image(tile_x, tile_y))
+
+        self.update()
+
+    def clear(self):
+        """Удаление изображения"""
+
+        self._buffer = None
+        self._tiles = []
+        self.image_width = self.image_height = 0
+        self.update()
+
+    def set_view(self, zoom, smooth=True):
+        """
+        Установка масштаба
+
+        Args:
+            zoom: Масштаб
+            smooth: Линейная (True) или ближайшая (False) фильтрация текстур
+        """
+
+        self.zoom = zoom
+        self.smooth = smooth
+        self.clamp_offset()
+        self.update()
+
+    def origin(self):
+        """Положение левого верхнего угла изображения на экране"""
+
+        x = (self.width() - self.image_width * self.zoom) / 2
+        y = (self.height() - self.image_height * self.zoom) / 2
+
+        # Изображение меньше окна центрируется, больше - сдвигается
+        return QPointF(x if x > 0 else -self.offset.x(),
+                       y if y > 0 else -self.offset.y())
+
+    def clamp_offset(self):
+        """Ограничение сдвига границами изображения"""
+
+        max_x = max(0.0, self.image_width * self.zoom - self.width())
+        max_y = max(0.0, self.image_height * self.zoom - self.height())
+
+        self.offset = QPointF(min(max(self.offset.x(), 0.0), max_x),
+                              min(max(self.offset.y(), 0.0), max_y))
+
+    def paintGL(self):
+        """Отрисовка кадра в контексте OpenGL"""
+
+        painter = QPainter(self)
+        self.render_view(painter)
+        painter.end()
+
+    def render_view(self, painter):
+        """
+        Отрисовка видимых тайлов с текущим преобразованием
+
+        Args:
+            painter: QPainter на устройстве размера холста
+        """
+
+        painter.fillRect(self.rect(), self.BACKGROUND)
+
+        if self._tiles:
+            origin = self.origin()
+            painter.translate(origin)
+            painter.scale(self.zoom, self.zoom)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, self.smooth)
+
+            # Видимая область в координатах изображения
+            visible = QRectF(-origin.x() / self.zoom, -origin.y() / self.zoom,
+                             self.width() / self.zoom, self.height() / self.zoom)
+
+            for x, y, image in self._tiles:
+                if visible.intersects(QRectF(x, y, image.width(), image.height())):
+                    painter.drawImage(QPointF(x, y), image)
+
+            if self.overlay_painter is not None:
+                self.overlay_painter(painter)
+
+    def resizeGL(self, width, height):
+        """Изменение размера холста"""
+
+        self.clamp_offset()
+
+    def mousePressEvent(self, event):
+        """Начало панорамирования или клика"""
+
+        if event.button() == Qt.LeftButton:
+            self._press_position = event.pos()
+            self._press_offset = QPointF(self.offset)
+
+    def mouseMoveEvent(self, event):
+        """Панорамирование перетаскиванием"""
+
+        if self._press_position is None:
+            return
+
+        delta = event.pos() - self._press_position
+        self.offset = self._press_offset - QPointF(delta)
+        self.clamp_offset()
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        """Клик без перетаскивания передается в координатах изображения"""
+
+        if self._press_position is None:
+            return
+
+        moved = (event.pos() - self._press_position).manhattanLength()
+        self._press_position = None
+
+        if moved <= 3 and self._tiles:
+            origin = self.origin()
+            x = int((event.pos().x() - origin.x()) / self.zoom)
+            y = int((event.pos().y() - origin.y()) / self.zoom)
+            self.clicked.emit(x, y)
+
+    def _tile_image(self, x, y):
+        """QImage тайла, ссылающийся на область буфера без копирования"""
+
+        width = min(self.TILE_SIZE, self.image_width - x)
+        height = min(self.TILE_SIZE, self.image_height - y)
+
+        row_stride = self._buffer.strides[0]
+        address = self._buffer.ctypes.data + y * row_stride + x * self._buffer.strides[1]
+
+        return QImage(sip.voidptr(address), width, height, row_stride, self._format)
@@ -0,0 +1,78 @@
+"""
+Виджет гистограммы каналов
+
+Отрисовывает гистограммы цветовых каналов,
+рассчитанные модулем статистики.
+"""
+
+import numpy as np
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import QPainter, QColor, QPen, QPolygonF
+
+
+class HistogramWidget(QWidget):
+    """Виджет для отображения гистограмм каналов"""
+
+    # Цвета линий каналов
+    CHANNEL_COLORS = {
+        'red': QColor(220, 50, 50),
+        'green': QColor(40, 160, 40),
+        'blue': QColor(50, 90, 220),
+        'gray': QColor(90, 90, 90)
+    }
+
+    def __init__(self):
+        super().__init__()
+
+        self.histograms = {}
+        self.setMinimumHeight(90)
+
+    def set_histograms(self, histograms):
+        """
+        Установка гистограмм для отображения
+
+        Args:
+            histograms: Словарь {канал: массив из 256 значений}
+        """
+
+        self.histograms = histograms
+        self.update()
+
+    def clear(self):
+        """Очистка гистограмм"""
+
+        self.histograms = {}
+        self.update()
+
+    def paintEvent(self, event):
+        """Отрисовка гистограмм"""
+
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor('#fafafa'))
+        painter.setPen(QColor('#ccc'))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+
+        if not self.histograms:
+            painter.end()
+            return
+
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        width = self.width() - 2
+        height = self.height() - 2
+
+        # Общая нормировка по максимуму всех каналов
+        peak = max(float(np.max(h)) for h in self.histograms.values()) or 1.0
+        xs = np.linspace(1, width, 256)
+
+        for name, histogram in self.histograms.items():
+            ys = height - (np.asarray(histogram, dtype=np.float64) / peak) * (height - 2)
+            polygon = QPolygonF([QPointF(x, y) for x, y in zip(xs, ys)])
+
+            pen = QPen(self.CHANNEL_COLORS.get(name, QColor(Qt.black)))
+            pen.setWidthF(1.2)
+            painter.setPen(pen)
+            painter.drawPolyline(polygon)
+
+        painter.end()
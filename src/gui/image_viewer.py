@@ -5,14 +5,24 @@
 масштабирования и прокрутки.
 """
 
+import logging
+
 import cv2
 import numpy as np
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QScrollArea, 
-    QHBoxLayout, QPushButton, QSlider, QFrame
+    QHBoxLayout, QPushButton, QSlider, QFrame, QApplication
 )
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QPixmap, QImage, QFont
+from PyQt5.QtCore import Qt, pyqtSignal, QRect, QRectF, QTimer
+from PyQt5.QtGui import QPixmap, QImage, QFont, QPainter, QPen, QColor
+from PyQt5 import sip
+
+from processing.buffer_pool import get_buffer_pool, output_buffer
+from processing.roi import as_array
+from processing.annotations import AnnotationLayer
+from processing.image_store import image_generation
+from utils.profiler import profiled
+from .gl_canvas import GLImageCanvas, opengl_available
 
 class ImageViewer(QWidget):
     """Виджет для отображения изображений"""
@@ -22,11 +32,26 @@ class ImageViewer(QWidget):
     zoom_changed = pyqtSignal(float)
     crop_applied = pyqtSignal(object)
     
-    def __init__(self):
+    # Интервал проверки видимости, пока виджет скрыт (мс)
+    HIDDEN_POLL_INTERVAL = 250
+    
+    # Задержка сглаженной перерисовки после последнего изменения масштаба (мс)
+    SMOOTH_ZOOM_DELAY = 150
+    
+    # Способы отображения
+    BACKEND_RASTER = 'raster'    # QPixmap в QLabel, масштабирование на CPU
+    BACKEND_OPENGL = 'opengl'    # Текстуры в QOpenGLWidget
+    BACKEND_AUTO = 'auto'        # OpenGL, если доступен
+    
+    def __init__(self, backend=BACKEND_RASTER):
         super().__init__()
         
+        self.logger = logging.getLogger(__name__)
+        
         self.current_image = None
         self.current_pixmap = None
+        self.display_pixmap = None   # Масштабированный pixmap, показанный в метке
+        self.source_generation = None  # Поколение изображения хранилища (ImageHandle)
         self.zoom_factor = 1.0
         self.min_zoom = 0.1
         self.max_zoom = 5.0
@@ -35,7 +60,45 @@ class ImageViewer(QWidget):
         self.crop_end = None
         self.crop_rect = None
         self.dragging = False
+        
+        # Слой аннотаций, накладываемый при отрисовке
+        self.overlay = AnnotationLayer()
+        
+        # Потоковые кадры отрисовываются не чаще частоты обновления экрана;
+        # хранится только последний неотрисованный кадр
+        self.pending_frame = None
+        self.frames_submitted = 0
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        self.frames_skipped_hidden = 0
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.render_pending_frame)
+        
+        # Прогрессивное масштабирование: пока масштаб меняется, изображение
+        # быстро масштабируется без сглаживания (события колеса, пришедшие
+        # до перерисовки, объединяются), а после паузы - перерисовывается
+        # со сглаживанием
+        self.zoom_render_timer = QTimer(self)
+        self.zoom_render_timer.setSingleShot(True)
+        self.zoom_render_timer.timeout.connect(lambda: self.update_display(smooth=False))
+        
+        self.smooth_timer = QTimer(self)
+        self.smooth_timer.setSingleShot(True)
+        self.smooth_timer.timeout.connect(lambda: self.update_display(smooth=True))
+        
+        self.gl_canvas = None
+        self.backend = self.BACKEND_RASTER
+        
+        # Буфер RGB из пула, на который ссылаются тайлы холста OpenGL;
+        # возвращается в пул при замене изображения
+        self.buffer_pool = get_buffer_pool()
+        self.display_buffer = None
+        
         self.init_ui()
+        
+        if backend in (self.BACKEND_OPENGL, self.BACKEND_AUTO):
+            self.use_opengl_backend()
     
     def init_ui(self):
         """Инициализация пользовательского интерфейса"""
@@ -83,6 +146,64 @@ class ImageViewer(QWidget):
         info_panel = self.create_info_panel()
         layout.addWidget(info_panel)
     
+    def use_opengl_backend(self):
+        """
+        Переключение на отображение через OpenGL
+        
+        Если контекст OpenGL создать не удается, остается растровый путь.
+        
+        Returns:
+            True, если используется OpenGL
+        """
+        
+        available, description = opengl_available()
+        if not available:
+            self.logger.warning("OpenGL недоступен (%s), используется растровое отображение",
+                                description)
+            return False
+        
+        self.gl_canvas = GLImageCanvas()
+        self.gl_canvas.overlay_painter = self.draw_overlay
+        self.gl_canvas.clicked.connect(self.report_position)
+        self.gl_canvas.gl_failed.connect(self.use_raster_backend)
+        
+        layout = self.layout()
+        layout.insertWidget(layout.indexOf(self.scroll_area), self.gl_canvas)
+        self.scroll_area.hide()
+        
+        self.backend = self.BACKEND_OPENGL
+        self.logger.info("Отображение через OpenGL: %s", description)
+        
+        if self.current_image is not None:
+            self.set_image(self.current_image)
+        
+        return True
+    
+    def use_raster_backend(self, reason=None):
+        """
+        Возврат к растровому отображению (QPixmap в QLabel)
+        
+        Args:
+            reason: Причина переключения для журнала
+        """
+        
+        if self.gl_canvas is None:
+            return
+        
+        if reason:
+            self.logger.warning("Отказ OpenGL (%s), используется растровое отображение", reason)
+        
+        self.gl_canvas.hide()
+        self.gl_canvas.deleteLater()
+        self.gl_canvas = None
+        self.release_display_buffer()
+        
+        self.scroll_area.show()
+        self.backend = self.BACKEND_RASTER
+        
+        if self.current_image is not None:
+            self.set_image(self.current_image)
+    
     def create_zoom_panel(self):
         """Создание панели управления масштабом"""
         
@@ -153,18 +274,29 @@ class ImageViewer(QWidget):
         
         return panel
     
+    @profiled(category='render')
     def set_image(self, image):
         """Установка изображения для отображения"""
         
         try:
+            # Явно установленное изображение заменяет неотрисованный кадр потока
+            self.pending_frame = None
+            
             if image is None:
                 self.clear_image()
                 return
             
-            self.current_image = image.copy()
+            # Представление только для чтения вместо копии: области
+            # интереса (ImageROI) отображаются без копирования родителя
+            self.current_image = as_array(image)
+            self.source_generation = image_generation(image)
             
-            # Конвертация в QPixmap
-            self.current_pixmap = self.opencv_to_qpixmap(image)
+            if self.gl_canvas is not None:
+                # Кадр загружается в текстуры один раз, масштаб - преобразование
+                self.upload_to_canvas(self.current_image)
+            else:
+                # Конвертация в QPixmap
+                self.current_pixmap = self.opencv_to_qpixmap(self.current_image)
             
             # Обновление отображения
             self.update_display()
@@ -176,11 +308,246 @@ class ImageViewer(QWidget):
             self.clear_image()
             self.size_label.setText(f"Ошибка: {str(e)}")
     
+    def submit_frame(self, frame):
+        """
+        Постановка потокового кадра (камеры) на отрисовку
+        
+        Кадр не отрисовывается сразу: отрисовка выполняется по таймеру
+        с частотой обновления экрана, а кадр, не успевший отрисоваться,
+        заменяется новым. Пока виджет не виден, отрисовка не выполняется.
+        
+        Args:
+            frame: Кадр для отображения
+        """
+        
+        if frame is None:
+            return
+        
+        self.frames_submitted += 1
+        
+        if self.pending_frame is not None:
+            self.frames_skipped += 1
+            if not self.is_displayed():
+                self.frames_skipped_hidden += 1
+        
+        self.pending_frame = frame
+        
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start(self.refresh_interval())
+    
+    def render_pending_frame(self):
+        """Отрисовка последнего поставленного кадра (по таймеру)"""
+        
+        if self.pending_frame is None:
+            self.refresh_timer.stop()
+            return
+        
+        # Скрытый виджет только периодически проверяет, не показан ли он снова
+        if not self.is_displayed():
+            self.refresh_timer.setInterval(self.HIDDEN_POLL_INTERVAL)
+            return
+        
+        frame, self.pending_frame = self.pending_frame, None
+        self.refresh_timer.setInterval(self.refresh_interval())
+        
+        self.set_image(frame)
+        self.frames_rendered += 1
+    
+    def is_displayed(self):
+        """Виден ли виджет на экране (окно показано и не свернуто)"""
+        
+        return self.isVisible() and not self.window().isMinimized()
+    
+    def refresh_interval(self):
+        """Интервал обновления экрана, на котором показан виджет (мс)"""
+        
+        handle = self.window().windowHandle()
+        screen = handle.screen() if handle is not None else QApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 60.0
+        
+        return max(1, int(1000 / (rate if rate > 1 else 60.0)))
+    
+    def get_render_stats(self):
+        """
+        Статистика отрисовки потоковых кадров
+        
+        Returns:
+            Словарь с числом поставленных, отрисованных и пропущенных
+            кадров (в том числе пропущенных, пока виджет был скрыт)
+        """
+        
+        return {
+            'submitted': self.frames_submitted,
+            'rendered': self.frames_rendered,
+            'skipped': self.frames_skipped,
+            'skipped_hidden': self.frames_skipped_hidden
+        }
+    
+    def reset_render_stats(self):
+        """Сброс статистики отрисовки"""
+        
+        self.frames_submitted = 0
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        self.frames_skipped_hidden = 0
+    
+    @profiled(category='render')
+    def update_region(self, image, region, base_image=None):
+        """
+        Частичное обновление отображения после локального изменения
+        
+        Конвертируется, масштабируется и перерисовывается только
+        измененная область закэшированных pixmap. Если частичное
+        обновление невозможно (нет отображаемого изображения, изменился
+        размер, показано другое изображение или виден слой аннотаций),
+        выполняется полное обновление через set_image.
+        
+        Args:
+            image: Новое изображение
+            region: Измененная область (x, y, ширина, высота) или None
+            base_image: Изображение, из которого получено новое (если
+                        показано другое, выполняется полное обновление)
+        """
+        
+        try:
+            array = as_array(image)
+            
+            if self.gl_canvas is not None:
+                self.update_gl_region(image, array, region, base_image)
+                return
+            
+            if (region is None or self.current_pixmap is None or self.display_pixmap is None
+                    or self.current_image is None or array.shape != self.current_image.shape
+                    or not self.is_source(base_image)
+                    or (self.overlay.visible and len(self.overlay))):
+                self.set_image(image)
+                return
+            
+            self.pending_frame = None
+            self.current_image = array
+            self.source_generation = image_generation(image)
+            
+            height, width = array.shape[:2]
+            scaled = self.display_pixmap.cacheKey() != self.current_pixmap.cacheKey()
+            
+            # Запас на ядро сглаживания при масштабировании
+            pad = 2 if scaled else 0
+            x, y, w, h = region
+            x0, y0 = max(0, x - pad), max(0, y - pad)
+            x1, y1 = min(width, x + w + pad), min(height, y + h + pad)
+            if x1 <= x0 or y1 <= y0:
+                return
+            
+            patch_image, patch = self.to_qimage(array[y0:y1, x0:x1])
+            
+            # Метка не должна держать ссылку на pixmap: иначе рисование
+            # в него приведет к полному копированию данных (detach)
+            self.image_label.setPixmap(QPixmap())
+            if not scaled:
+                self.display_pixmap = None
+            
+            painter = QPainter(self.current_pixmap)
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.drawImage(x0, y0, patch_image)
+            painter.end()
+            
+            if scaled:
+                scale_x = self.display_pixmap.width() / self.current_pixmap.width()
+                scale_y = self.display_pixmap.height() / self.current_pixmap.height()
+                
+                painter = QPainter(self.display_pixmap)
+                painter.setCompositionMode(QPainter.CompositionMode_Source)
+                painter.setRenderHint(QPainter.SmoothPixmapTransform)
+                painter.drawImage(
+                    QRectF(x0 * scale_x, y0 * scale_y, (x1 - x0) * scale_x, (y1 - y0) * scale_y),
+                    patch_image
+                )
+                painter.end()
+            else:
+                self.display_pixmap = self.current_pixmap
+            
+            self.image_label.setPixmap(self.display_pixmap)
+            
+        except Exception:
+            # Частичное обновление не удалось - полная перерисовка
+            self.set_image(image)
+    
+    def is_source(self, base_image):
+        """
+        Показано ли сейчас изображение base_image
+        
+        Сравниваются номера поколений хранилища, поэтому просмотр
+        не удерживает ссылку на показанный объект. Для изображений
+        вне хранилища (без поколения) ответ отрицательный.
+        """
+        
+        if base_image is None:
+            return True
+        
+        generation = image_generation(base_image)
+        return generation is not None and generation == self.source_generation
+    
+    def update_gl_region(self, image, array, region, base_image):
+        """Частичное обновление текстур холста OpenGL"""
+        
+        if (region is None or self.current_image is None
+                or array.shape != self.current_image.shape
+                or not self.is_source(base_image)):
+            self.set_image(image)
+            return
+        
+        self.pending_frame = None
+        self.current_image = array
+        self.source_generation = image_generation(image)
+        
+        x, y, w, h = region
+        patch = array[y:y + h, x:x + w]
+        
+        # Пиксели области копируются в буфер холста, временный буфер - из пула
+        with self.buffer_pool.borrowed(patch.shape, patch.dtype) as buffer:
+            self.gl_canvas.update_region(self.to_display_buffer(patch, out=buffer), x, y)
+    
+    def upload_to_canvas(self, image):
+        """
+        Передача изображения холсту OpenGL через буфер из пула
+        
+        Холст ссылается на буфер до следующего изображения, поэтому
+        предыдущий буфер возвращается в пул только после замены.
+        Для потока кадров одного размера память не выделяется.
+        
+        Args:
+            image: Изображение BGR или в оттенках серого
+        """
+        
+        buffer = self.buffer_pool.acquire_like(image)
+        try:
+            self.gl_canvas.set_image(self.to_display_buffer(image, out=buffer))
+        except Exception:
+            self.buffer_pool.release(buffer)
+            raise
+        
+        self.release_display_buffer()
+        self.display_buffer = buffer
+    
+    def release_display_buffer(self):
+        """Возврат буфера холста OpenGL в пул"""
+        
+        buffer, self.display_buffer = self.display_buffer, None
+        if buffer is not None:
+            self.buffer_pool.release(buffer)
+    
     def clear_image(self):
         """Очистка отображения"""
         
+        self.pending_frame = None
         self.current_image = None
         self.current_pixmap = None
+        self.display_pixmap = None
+        self.source_generation = None
+        
+        if self.gl_canvas is not None:
+            self.gl_canvas.clear()
+        self.release_display_buffer()
         
         self.image_label.clear()
         self.image_label.setText("📁 Загрузите изображение\nили включите камеру")
@@ -189,8 +556,23 @@ class ImageViewer(QWidget):
         self.format_label.setText("Формат: —")
         self.coords_label.setText("Координаты: —")
     
-    def update_display(self):
-        """Обновление отображения с текущим масштабом"""
+    @profiled(category='render')
+    def update_display(self, smooth=None):
+        """
+        Обновление отображения с текущим масштабом
+        
+        Args:
+            smooth: Сглаживающее масштабирование; по умолчанию - если
+                    масштаб сейчас не изменяется пользователем
+        """
+        
+        if smooth is None:
+            smooth = not self.smooth_timer.isActive()
+        
+        # В OpenGL масштаб - только матрица преобразования
+        if self.gl_canvas is not None:
+            self.gl_canvas.set_view(self.zoom_factor, smooth)
+            return
         
         if self.current_pixmap is None:
             return
@@ -199,13 +581,90 @@ class ImageViewer(QWidget):
         scaled_pixmap = self.current_pixmap.scaled(
             self.current_pixmap.size() * self.zoom_factor,
             Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
+            Qt.SmoothTransformation if smooth else Qt.FastTransformation
         )
         
+        # Аннотации рисуются на масштабированной копии, исходные пиксели не меняются
+        if self.overlay.visible and len(self.overlay):
+            self.paint_overlay(scaled_pixmap)
+        
         # Установка изображения
+        self.display_pixmap = scaled_pixmap
         self.image_label.setPixmap(scaled_pixmap)
         self.image_label.resize(scaled_pixmap.size())
     
+    def paint_overlay(self, pixmap):
+        """
+        Наложение слоя аннотаций на масштабированный pixmap
+        
+        Прямоугольники группируются по цвету и толщине, чтобы
+        каждая группа рисовалась одним вызовом drawRects.
+        """
+        
+        scale = pixmap.width() / max(1, self.current_pixmap.width())
+        
+        painter = QPainter(pixmap)
+        painter.scale(scale, scale)
+        self.draw_overlay(painter)
+        painter.end()
+    
+    def draw_overlay(self, painter):
+        """
+        Рисование слоя аннотаций в координатах изображения
+        
+        Args:
+            painter: QPainter с преобразованием в координаты изображения
+        """
+        
+        if not (self.overlay.visible and len(self.overlay)):
+            return
+        
+        groups = {}
+        for rect, color, thickness in zip(self.overlay.rectangles.tolist(),
+                                          self.overlay.colors.tolist(),
+                                          self.overlay.thicknesses.tolist()):
+            groups.setdefault((tuple(color), thickness), []).append(QRect(*rect))
+        
+        for ((blue, green, red), thickness), rects in groups.items():
+            color = QColor(red, green, blue)
+            
+            if thickness < 0:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(color)
+            else:
+                pen = QPen(color)
+                pen.setWidth(thickness)
+                pen.setJoinStyle(Qt.MiterJoin)
+                painter.setPen(pen)
+                painter.setBrush(Qt.NoBrush)
+            
+            painter.drawRects(rects)
+    
+    def set_overlay_rectangles(self, rectangles, colors=None, thicknesses=None):
+        """
+        Замена прямоугольников слоя аннотаций
+        
+        Args:
+            rectangles: Массив Nx4 (x, y, ширина, высота)
+            colors: Один цвет BGR или массив Nx3
+            thicknesses: Одна толщина или массив из N значений
+        """
+        
+        self.overlay.set_rectangles(rectangles, colors, thicknesses)
+        self.update_display()
+    
+    def set_overlay_visible(self, visible):
+        """Показ или скрытие слоя аннотаций"""
+        
+        self.overlay.visible = visible
+        self.update_display()
+    
+    def clear_overlay(self):
+        """Удаление всех аннотаций слоя"""
+        
+        self.overlay.clear()
+        self.update_display()
+    
     def update_image_info(self):
         """Обновление информации об изображении"""
         
@@ -228,29 +687,66 @@ class ImageViewer(QWidget):
         
         self.format_label.setText(f"Формат: {format_text}")
     
-    def opencv_to_qpixmap(self, cv_image):
-        """Конвертация OpenCV изображения в QPixmap"""
-        
-        if len(cv_image.shape) == 3:
-            # Цветное изображение
-            height, width, channels = cv_image.shape
-            bytes_per_line = channels * width
+    @staticmethod
+    def to_display_buffer(cv_image, out=None):
+        """
+        Непрерывный буфер RGB или оттенков серого для загрузки в текстуру
+        
+        Args:
+            cv_image: Изображение BGR или в оттенках серого
+            out: C-непрерывный буфер той же формы и типа (например, из пула)
+            
+        Returns:
+            out или новый C-непрерывный массив
             
-            # OpenCV использует BGR, Qt использует RGB
-            rgb_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
-            qt_image = QImage(
-                rgb_image.data, width, height, 
-                bytes_per_line, QImage.Format_RGB888
-            )
+        Raises:
+            ValueError: Если форма или тип out не совпадают с изображением
+        """
+        
+        result = output_buffer(out, cv_image.shape, cv_image.dtype)
+        
+        if cv_image.ndim == 3:
+            cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB, dst=result)
         else:
-            # Оттенки серого
-            height, width = cv_image.shape
-            bytes_per_line = width
-            qt_image = QImage(
-                cv_image.data, width, height, 
-                bytes_per_line, QImage.Format_Grayscale8
-            )
+            np.copyto(result, cv_image)
+        
+        return result
+    
+    @staticmethod
+    def to_qimage(cv_image):
+        """
+        QImage, читающий пиксели прямо из массива
+        
+        OpenCV хранит цвет в порядке BGR, как Format_BGR888, поэтому
+        преобразование каналов не нужно. Строки могут идти с шагом
+        родительского буфера (область интереса); копия делается только
+        для массивов с разреженными пикселями. QImage действителен, пока
+        жив массив.
+        
+        Args:
+            cv_image: Изображение BGR или в оттенках серого
+            
+        Returns:
+            Кортеж (QImage, массив, на который он ссылается)
+        """
+        
+        pixel_size = cv_image.shape[2] if cv_image.ndim == 3 else 1
+        if cv_image.strides[1] != pixel_size or cv_image.strides[-1] != 1:
+            cv_image = np.ascontiguousarray(cv_image)
+        
+        height, width = cv_image.shape[:2]
+        image_format = QImage.Format_BGR888 if cv_image.ndim == 3 else QImage.Format_Grayscale8
         
+        qt_image = QImage(sip.voidptr(cv_image.ctypes.data), width, height,
+                          cv_image.strides[0], image_format)
+        return qt_image, cv_image
+    
+    @profiled(category='render')
+    def opencv_to_qpixmap(self, cv_image):
+        """Конвертация OpenCV изображения в QPixmap"""
+        
+        # Единственная копия пикселей - внутренний буфер QPixmap
+        qt_image, _ = self.to_qimage(cv_image)
         return QPixmap.fromImage(qt_image)
     
     def zoom_in(self):
@@ -280,8 +776,11 @@ class ImageViewer(QWidget):
         
         self.zoom_factor = zoom_factor
         
-        # Обновление отображения
-        self.update_display()
+        # Быстрая перерисовка в ближайшем цикле событий (изменения масштаба,
+        # пришедшие до нее, объединяются) и сглаженная - после паузы
+        if not self.zoom_render_timer.isActive():
+            self.zoom_render_timer.start(0)
+        self.smooth_timer.start(self.SMOOTH_ZOOM_DELAY)
         
         # Обновление элементов управления
         self.zoom_slider.setValue(int(zoom_factor * 100))
@@ -308,21 +807,26 @@ class ImageViewer(QWidget):
         
         # Преобразование координат с учетом масштаба
         if self.zoom_factor != 0:
-            original_x = int(x / self.zoom_factor)
-            original_y = int(y / self.zoom_factor)
-            
-            # Проверка границ
-            height, width = self.current_image.shape[:2]
-            if 0 <= original_x < width and 0 <= original_y < height:
-                self.coords_label.setText(f"Координаты: ({original_x}, {original_y})")
-                self.image_clicked.emit(original_x, original_y)
-            else:
-                self.coords_label.setText("Координаты: —")
+            self.report_position(int(x / self.zoom_factor), int(y / self.zoom_factor))
+    
+    def report_position(self, original_x, original_y):
+        """Отображение и отправка координат клика в пикселях изображения"""
+        
+        if self.current_image is None:
+            return
+        
+        # Проверка границ
+        height, width = self.current_image.shape[:2]
+        if 0 <= original_x < width and 0 <= original_y < height:
+            self.coords_label.setText(f"Координаты: ({original_x}, {original_y})")
+            self.image_clicked.emit(original_x, original_y)
+        else:
+            self.coords_label.setText("Координаты: —")
     
     def wheelEvent(self, event):
         """Обработка прокрутки колеса мыши для масштабирования"""
         
-        if self.current_pixmap is None:
+        if self.current_image is None:
             return
         
         # Получение направления прокрутки
@@ -336,6 +840,11 @@ class ImageViewer(QWidget):
     def update_image(self, image):
         """Слот для обновления изображения (для подключения к сигналам)"""
         
+        # Уже показанное изображение (то же поколение хранилища) не перерисовывается
+        generation = image_generation(image)
+        if generation is not None and generation == self.source_generation:
+            return
+        
         self.set_image(image)
     
     def get_current_image(self):
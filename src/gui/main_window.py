@@ -6,23 +6,35 @@
 """
 
 import os
+import time
 import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np 
 from pathlib import Path
 
 from PyQt5.QtWidgets import (
     QMainWindow, QHBoxLayout, QWidget, QMenuBar,
-    QAction, QStatusBar, QMessageBox, QSplitter
+    QAction, QStatusBar, QMessageBox, QSplitter,
+    QLabel, QFileDialog, QDockWidget, QInputDialog
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QEvent
 from PyQt5.QtGui import QFont, QIcon
 
 from .image_viewer import ImageViewer
 from .control_panel import ControlPanel
+from .folder_browser import FolderBrowser
 from processing.image_processor import ImageProcessor
+from processing.statistics import StatisticsWorker
+from processing.buffer_pool import get_buffer_pool
+from processing.image_store import get_image_store
 from camera.camera_manager import CameraManager
+from camera.multi_camera import MultiCameraManager, create_source
 from utils.file_handler import FileHandler
+from utils.thumbnail_cache import ThumbnailCache
+from utils.image_cache import DecodedImageCache, ImagePrefetcher
 from utils.error_handler import ErrorHandler
+from utils.profiler import get_profiler
 from configs.settings import AppSettings
 
 class ImageProcessorWindow(QMainWindow):
@@ -31,30 +43,69 @@ class ImageProcessorWindow(QMainWindow):
     # Сигналы
     image_loaded = pyqtSignal(object)
     processing_finished = pyqtSignal(object)
+    statistics_ready = pyqtSignal(object)
+    image_decoded = pyqtSignal(int, str, object)
     
-    def __init__(self):
+    def __init__(self, viewer_backend=None):
         super().__init__()
         
-        # Инициализация компонентов
+        # Способ отображения (None - из настройки ui.viewer_backend)
+        self.viewer_backend = viewer_backend
+        
+        # Инициализация компонентов: изображения хранятся в общем
+        # хранилище, окно держит только дескрипторы ImageHandle
+        self.image_store = get_image_store()
         self.current_image = None
         self.processed_image = None
         self.camera_manager = None
+        self.multi_camera_manager = None
         
         # Инициализация сервисов
         self.image_processor = ImageProcessor()
-        self.file_handler = FileHandler()
         self.error_handler = ErrorHandler()
         self.settings = AppSettings()
+        self.thumbnail_cache = ThumbnailCache(
+            self.settings.get('cache.directory'),
+            max_bytes=self.settings.get('cache.max_size_mb', 256) * 1024 * 1024,
+            preview_size=self.settings.get('cache.preview_size', 512)
+        )
+        self.image_cache = DecodedImageCache(
+            self.settings.get('cache.memory_cache_mb', 512) * 1024 * 1024
+        )
+        self.file_handler = FileHandler(self.thumbnail_cache, self.image_cache)
+        
+        # Соседние файлы каталога декодируются заранее
+        self.prefetcher = ImagePrefetcher(self.file_handler.load_image, self.image_cache)
+        self.profiler = get_profiler()
+        
+        # Статистика каналов считается в фоновом потоке
+        self.statistics_worker = StatisticsWorker(self.statistics_ready.emit)
         
         # Настройки
         self.camera_active = False
         
+        # Файл, полное декодирование которого выполняется в фоне, и номер
+        # запроса: результаты устаревших запросов отбрасываются
+        self.pending_file = None
+        self.pending_request = None
+        self._decode_requests = itertools.count(1)
+        
+        # Файлы декодируются по одному: при быстром листании очередь
+        # не порождает новых потоков, а устаревшие запросы пропускаются
+        self.decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ImageDecoder")
+        self.current_file = None
+        
+        # Выбранный канал отображения (используется и при записи видео)
+        self.current_channel = 'original'
+        
         # Настройка логирования
         self.logger = logging.getLogger(__name__)
         
         # Инициализация интерфейса
         self.init_ui()
         self.setup_connections()
+        self.statistics_worker.start()
+        self.prefetcher.start()
         
         self.logger.info("Главное окно инициализировано")
     
@@ -80,7 +131,9 @@ class ImageProcessorWindow(QMainWindow):
         central_widget.setLayout(central_widget_layout)
         
         # Создание компонентов интерфейса
-        self.image_viewer = ImageViewer()
+        self.image_viewer = ImageViewer(
+            self.viewer_backend or self.settings.get('ui.viewer_backend', ImageViewer.BACKEND_RASTER)
+        )
         self.control_panel = ControlPanel()
         
         # Добавление в splitter
@@ -88,6 +141,9 @@ class ImageProcessorWindow(QMainWindow):
         splitter.addWidget(self.control_panel)
         splitter.setSizes([1000, 400])  # Пропорции 70/30
         
+        # Панель обзора папки (скрыта, пока не выбрана папка)
+        self.create_folder_dock()
+        
         # Строка состояния
         self.create_status_bar()
         
@@ -107,11 +163,32 @@ class ImageProcessorWindow(QMainWindow):
         open_action.triggered.connect(self.load_image)
         file_menu.addAction(open_action)
         
+        open_folder_action = QAction('Открыть папку...', self)
+        open_folder_action.setShortcut('Ctrl+Shift+O')
+        open_folder_action.triggered.connect(self.open_folder)
+        file_menu.addAction(open_folder_action)
+        
         save_action = QAction('Сохранить результат', self)
         save_action.setShortcut('Ctrl+S')
         save_action.triggered.connect(self.save_image)
         file_menu.addAction(save_action)
         
+        # Недавние файлы (пункты пересобираются при каждом открытии)
+        self.recent_menu = file_menu.addMenu('Недавние файлы')
+        self.update_recent_menu()
+        
+        file_menu.addSeparator()
+        
+        previous_action = QAction('Предыдущее изображение в папке', self)
+        previous_action.setShortcut('PgUp')
+        previous_action.triggered.connect(self.show_previous_image)
+        file_menu.addAction(previous_action)
+        
+        next_action = QAction('Следующее изображение в папке', self)
+        next_action.setShortcut('PgDown')
+        next_action.triggered.connect(self.show_next_image)
+        file_menu.addAction(next_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction('Выход', self)
@@ -135,6 +212,32 @@ class ImageProcessorWindow(QMainWindow):
         capture_action.triggered.connect(self.capture_frame)
         camera_menu.addAction(capture_action)
         
+        burst_action = QAction('Серийный захват (самый резкий кадр)', self)
+        burst_action.setShortcut('Shift+Space')
+        burst_action.triggered.connect(self.capture_burst)
+        camera_menu.addAction(burst_action)
+        
+        camera_menu.addSeparator()
+        
+        self.skip_unchanged_action = QAction('Пропускать неизменные кадры', self)
+        self.skip_unchanged_action.setCheckable(True)
+        self.skip_unchanged_action.setChecked(True)
+        self.skip_unchanged_action.toggled.connect(self.set_skip_unchanged)
+        camera_menu.addAction(self.skip_unchanged_action)
+        
+        self.record_action = QAction('Запись видео', self)
+        self.record_action.setCheckable(True)
+        self.record_action.setShortcut('Ctrl+Shift+R')
+        self.record_action.triggered.connect(self.toggle_recording)
+        camera_menu.addAction(self.record_action)
+        
+        camera_menu.addSeparator()
+        
+        self.multi_camera_action = QAction('Несколько камер...', self)
+        self.multi_camera_action.setCheckable(True)
+        self.multi_camera_action.triggered.connect(self.toggle_multi_camera)
+        camera_menu.addAction(self.multi_camera_action)
+        
         # Меню "Обработка"
         processing_menu = menubar.addMenu('Обработка')
         
@@ -166,6 +269,20 @@ class ImageProcessorWindow(QMainWindow):
         border_action.triggered.connect(self.show_border_dialog)
         processing_menu.addAction(border_action)
         
+        # Меню "Вид"
+        view_menu = menubar.addMenu('Вид')
+        self.view_menu = view_menu
+        
+        self.profiler_action = QAction('Показывать профиль кадра', self)
+        self.profiler_action.setCheckable(True)
+        self.profiler_action.setShortcut('Ctrl+P')
+        self.profiler_action.toggled.connect(self.toggle_profiler_overlay)
+        view_menu.addAction(self.profiler_action)
+        
+        export_profile_action = QAction('Экспорт профиля (Chrome trace)...', self)
+        export_profile_action.triggered.connect(self.export_profile)
+        view_menu.addAction(export_profile_action)
+        
         # Меню "Справка"
         help_menu = menubar.addMenu('Справка')
         
@@ -173,12 +290,62 @@ class ImageProcessorWindow(QMainWindow):
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
     
+    def create_folder_dock(self):
+        """Создание панели с сеткой миниатюр папки"""
+        
+        self.folder_browser = FolderBrowser(self.file_handler)
+        self.folder_browser.file_activated.connect(self.open_image_file)
+        
+        self.folder_dock = QDockWidget("Обзор папки", self)
+        self.folder_dock.setObjectName("folder_dock")
+        self.folder_dock.setWidget(self.folder_browser)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.folder_dock)
+        self.folder_dock.hide()
+        
+        toggle_action = self.folder_dock.toggleViewAction()
+        toggle_action.setShortcut('Ctrl+B')
+        self.view_menu.addSeparator()
+        self.view_menu.addAction(toggle_action)
+    
+    def open_folder(self):
+        """Выбор папки для обзора миниатюр"""
+        
+        directory = QFileDialog.getExistingDirectory(
+            self, "Выберите папку", self.settings.get('files.last_directory', '')
+        )
+        
+        if directory:
+            self.folder_browser.set_directory(directory)
+            self.folder_dock.show()
+    
     def create_status_bar(self):
         """Создание строки состояния"""
         
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Готов к работе")
+        
+        # Индикатор профиля последнего кадра (скрыт по умолчанию)
+        self.profiler_label = QLabel()
+        self.profiler_label.setStyleSheet("color: #555; font-size: 11px;")
+        self.profiler_label.hide()
+        self.status_bar.addPermanentWidget(self.profiler_label)
+        
+        self.profiler_timer = QTimer(self)
+        self.profiler_timer.timeout.connect(self.update_profiler_overlay)
+        
+        # Индикатор записи: глубина очереди и отброшенные кадры
+        self.recording_label = QLabel()
+        self.recording_label.setStyleSheet("color: #c62828; font-size: 11px;")
+        self.recording_label.hide()
+        self.status_bar.addPermanentWidget(self.recording_label)
+        
+        self.recording_timer = QTimer(self)
+        self.recording_timer.timeout.connect(self.update_recording_status)
+        
+        # Доля кадров, пропущенных детектором изменений
+        self.camera_status_timer = QTimer(self)
+        self.camera_status_timer.timeout.connect(self.update_camera_status)
     
     def apply_styles(self):
         """Применение стилей к интерфейсу"""
@@ -216,10 +383,15 @@ class ImageProcessorWindow(QMainWindow):
         self.control_panel.channel_changed.connect(self.change_channel)
         self.control_panel.processing_requested.connect(self.process_image)
         self.control_panel.save_image_requested.connect(self.save_image)
+        self.control_panel.exact_statistics_requested.connect(self.request_exact_statistics)
         
         # Соединения с обработчиком изображений
         self.image_loaded.connect(self.control_panel.on_image_loaded)
         self.processing_finished.connect(self.image_viewer.update_image)
+        self.image_decoded.connect(self.on_image_decoded)
+        
+        # Статистика каналов
+        self.statistics_ready.connect(self.control_panel.on_statistics_ready)
     
     def load_image(self):
         """Загрузка изображения из файла"""
@@ -227,26 +399,142 @@ class ImageProcessorWindow(QMainWindow):
         try:
             file_path = self.file_handler.open_file_dialog(self)
             if file_path:
-                self.current_image = self.file_handler.load_image(file_path)
-                
-                if self.current_image is not None:
-                    self.image_viewer.set_image(self.current_image)
-                    self.image_loaded.emit(self.current_image)
-                    
-                    # Обновление статуса
-                    file_name = Path(file_path).name
-                    height, width = self.current_image.shape[:2]
-                    self.status_bar.showMessage(
-                        f"Загружено: {file_name} ({width}×{height})"
-                    )
-                    
-                    self.logger.info(f"Изображение загружено: {file_path}")
-                else:
-                    raise ValueError("Не удалось загрузить изображение")
+                self.open_image_file(file_path)
                     
         except Exception as e:
             self.handle_error(f"Ошибка загрузки изображения: {str(e)}")
     
+    def open_image_file(self, file_path):
+        """
+        Открытие файла изображения
+        
+        Если превью файла есть в дисковом кэше, оно показывается
+        сразу, а полное изображение декодируется в фоновом потоке.
+        
+        Args:
+            file_path: Путь к файлу
+        """
+        
+        file_name = Path(file_path).name
+        request_id = next(self._decode_requests)
+        self.pending_file = file_path
+        self.pending_request = request_id
+        
+        # Уже декодированное изображение показывается без фонового потока
+        if self.image_cache.contains(file_path):
+            self.on_image_decoded(request_id, file_path, self.file_handler.load_image(file_path))
+            return
+        
+        cached = self.file_handler.load_preview(file_path)
+        
+        if cached is not None:
+            preview, metadata = cached
+            self.image_viewer.set_image(preview)
+            self.status_bar.showMessage(
+                f"Превью: {file_name} ({metadata['width']}×{metadata['height']}), загрузка..."
+            )
+        else:
+            self.status_bar.showMessage(f"Загрузка: {file_name}...")
+        
+        self.decoder.submit(self._decode_image_file, request_id, file_path)
+    
+    def _decode_image_file(self, request_id, file_path):
+        """Полное декодирование файла (выполняется в потоке декодера)"""
+        
+        # Пока запрос ждал в очереди, пользователь открыл другой файл
+        if request_id != self.pending_request:
+            return
+        
+        image = self.file_handler.load_image(file_path)
+        self.image_decoded.emit(request_id, file_path, image)
+    
+    def on_image_decoded(self, request_id, file_path, image):
+        """Обработка завершения фонового декодирования"""
+        
+        # Результат устаревшего запроса (пользователь открыл другой файл)
+        if request_id != self.pending_request:
+            return
+        
+        self.pending_file = None
+        self.pending_request = None
+        
+        try:
+            if image is None:
+                raise ValueError("Не удалось загрузить изображение")
+            
+            self.set_current_image(image)
+            self.current_file = file_path
+            self.image_viewer.set_image(self.current_image)
+            self.image_loaded.emit(self.current_image)
+            self.statistics_worker.submit(self.current_image, exact=True)
+            
+            self.add_recent_file(file_path)
+            
+            if self.folder_dock.isVisible():
+                self.folder_browser.set_directory(os.path.dirname(os.path.abspath(file_path)))
+                self.folder_browser.select_file(file_path)
+            
+            # Следующий файл вероятнее при листании вперед, поэтому он первый
+            previous_file, next_file = self.file_handler.get_neighbor_files(file_path)
+            self.prefetcher.prefetch([next_file, previous_file])
+            
+            # Обновление статуса
+            file_name = Path(file_path).name
+            height, width = self.current_image.shape[:2]
+            self.status_bar.showMessage(
+                f"Загружено: {file_name} ({width}×{height})"
+            )
+            
+            self.logger.info("Изображение загружено: %s", file_path)
+            
+        except Exception as e:
+            self.handle_error(f"Ошибка загрузки изображения: {str(e)}")
+    
+    def add_recent_file(self, file_path):
+        """Добавление файла в начало списка недавних"""
+        
+        file_path = os.path.abspath(file_path)
+        recent_files = [path for path in self.settings.get('files.recent_files', [])
+                        if path != file_path]
+        recent_files.insert(0, file_path)
+        
+        limit = self.settings.get('files.max_recent_files', 10)
+        self.settings.set('files.recent_files', recent_files[:limit])
+        self.settings.set('files.last_directory', os.path.dirname(file_path))
+        
+        self.update_recent_menu()
+    
+    def update_recent_menu(self):
+        """Пересборка меню недавних файлов"""
+        
+        self.recent_menu.clear()
+        recent_files = self.settings.get('files.recent_files', [])
+        
+        for index, file_path in enumerate(recent_files, start=1):
+            action = QAction(f"{index}. {Path(file_path).name}", self)
+            action.setToolTip(file_path)
+            action.setEnabled(os.path.exists(file_path))
+            action.triggered.connect(lambda checked=False, path=file_path: self.open_image_file(path))
+            self.recent_menu.addAction(action)
+        
+        self.recent_menu.setEnabled(bool(recent_files))
+    
+    def show_next_image(self):
+        """Открытие следующего изображения в папке текущего файла"""
+        
+        if self.current_file:
+            _, next_file = self.file_handler.get_neighbor_files(self.current_file)
+            if next_file:
+                self.open_image_file(next_file)
+    
+    def show_previous_image(self):
+        """Открытие предыдущего изображения в папке текущего файла"""
+        
+        if self.current_file:
+            previous_file, _ = self.file_handler.get_neighbor_files(self.current_file)
+            if previous_file:
+                self.open_image_file(previous_file)
+    
     def save_image(self):
         """Сохранение обработанного изображения"""
         
@@ -264,7 +552,7 @@ class ImageProcessorWindow(QMainWindow):
                 success = self.file_handler.save_image(image_to_save, file_path)
                 if success:
                     self.status_bar.showMessage(f"Сохранено: {Path(file_path).name}")
-                    self.logger.info(f"Изображение сохранено: {file_path}")
+                    self.logger.info("Изображение сохранено: %s", file_path)
                 else:
                     raise RuntimeError("Не удалось сохранить изображение")
                 
@@ -275,10 +563,16 @@ class ImageProcessorWindow(QMainWindow):
         """Запуск камеры"""
         
         try:
+            if self.multi_camera_manager:
+                self.stop_multi_camera()
+            
             if not self.camera_manager:
                 self.camera_manager = CameraManager()
-                self.camera_manager.frame_ready.connect(self.image_viewer.set_image)
+                self.camera_manager.set_skip_unchanged(self.skip_unchanged_action.isChecked())
+                self.camera_manager.frame_ready.connect(self.image_viewer.submit_frame)
+                self.camera_manager.frame_ready.connect(self.statistics_worker.submit)
                 self.camera_manager.error_occurred.connect(self.handle_camera_error)
+                self.camera_manager.recording_failed.connect(self.on_recording_failed)
                 self.camera_manager.camera_started.connect(self.on_camera_started)
                 self.camera_manager.camera_stopped.connect(self.on_camera_stopped)
             
@@ -295,12 +589,23 @@ class ImageProcessorWindow(QMainWindow):
 
         self.control_panel.on_camera_started()
         self.camera_active = True
+        self.image_viewer.reset_render_stats()
+        self.camera_status_timer.start(1000)
+        
+        # Камера могла быть запущена, когда окно не в фокусе
+        self.update_camera_schedule()
     
     def on_camera_stopped(self):
         """Обработка сигнала остановки камеры"""
         
         self.control_panel.on_camera_stopped()
         self.camera_active = False
+        self.camera_status_timer.stop()
+        
+        # Запись останавливается вместе с камерой
+        self.recording_timer.stop()
+        self.recording_label.hide()
+        self.record_action.setChecked(False)
     
     def stop_camera(self):
         """Остановка камеры"""
@@ -316,6 +621,114 @@ class ImageProcessorWindow(QMainWindow):
         except Exception as e:
             self.handle_error(f"Ошибка остановки камеры: {str(e)}")
     
+    def set_skip_unchanged(self, enabled):
+        """Включение/выключение пропуска кадров статичной сцены"""
+        
+        if self.camera_manager:
+            self.camera_manager.set_skip_unchanged(enabled)
+    
+    def camera_mode_for_window(self):
+        """
+        Режим опроса камеры по состоянию окна
+        
+        Returns:
+            camera.hidden_mode для свернутого или скрытого окна,
+            camera.unfocused_mode для окна не в фокусе, иначе MODE_ACTIVE
+        """
+        
+        if self.isMinimized() or not self.isVisible():
+            mode = self.settings.get('camera.hidden_mode', CameraManager.MODE_PAUSED)
+        elif not self.isActiveWindow():
+            mode = self.settings.get('camera.unfocused_mode', CameraManager.MODE_KEEP_ALIVE)
+        else:
+            mode = CameraManager.MODE_ACTIVE
+        
+        if mode not in CameraManager.MODES:
+            self.logger.warning("Неизвестный режим опроса камеры в настройках: %s", mode)
+            mode = CameraManager.MODE_ACTIVE
+        
+        return mode
+    
+    def update_camera_schedule(self):
+        """Выбор частоты опроса камеры по видимости и фокусу окна"""
+        
+        if not (self.camera_manager and self.camera_active):
+            return
+        
+        # Во время записи CameraManager сам оставляет полную частоту
+        self.camera_manager.keep_alive_fps = self.settings.get('camera.keep_alive_fps', 2)
+        self.camera_manager.set_mode(self.camera_mode_for_window())
+    
+    def update_camera_status(self):
+        """Обновление доли пропущенных кадров камеры, статистики отрисовки и пула буферов"""
+        
+        if self.camera_manager:
+            self.control_panel.update_camera_status(self.camera_manager.skipped_fraction,
+                                                    self.image_viewer.get_render_stats(),
+                                                    get_buffer_pool().get_stats())
+    
+    def toggle_multi_camera(self, enabled):
+        """Запуск/остановка синхронного захвата с нескольких камер"""
+        
+        if enabled:
+            self.start_multi_camera()
+        else:
+            self.stop_multi_camera()
+    
+    def start_multi_camera(self):
+        """Запуск захвата с нескольких источников в мозаику"""
+        
+        try:
+            specs, ok = QInputDialog.getText(
+                self, "Несколько камер",
+                "Источники через запятую (индекс камеры, synthetic:N или путь к видео):",
+                text="0, 1"
+            )
+            if not ok or not specs.strip():
+                self.multi_camera_action.setChecked(False)
+                return
+            
+            sources = [create_source(spec) for spec in specs.split(',') if spec.strip()]
+            
+            # Одиночная камера и мозаика не работают одновременно
+            if self.camera_active:
+                self.stop_camera()
+            
+            self.multi_camera_manager = MultiCameraManager(sources)
+            self.multi_camera_manager.composite_ready.connect(self.image_viewer.submit_frame)
+            self.multi_camera_manager.error_occurred.connect(self.handle_camera_error)
+            self.multi_camera_manager.capture_stopped.connect(self.on_multi_camera_stopped)
+            self.multi_camera_manager.start_capture()
+            
+            if self.multi_camera_manager.is_capturing:
+                self.status_bar.showMessage(f"Захват с {len(sources)} источников")
+                self.logger.info("Запущен захват с нескольких источников: %s", specs)
+            
+        except Exception as e:
+            self.multi_camera_action.setChecked(False)
+            self.handle_error(f"Ошибка запуска нескольких камер: {str(e)}")
+    
+    def stop_multi_camera(self):
+        """Остановка захвата с нескольких источников"""
+        
+        if self.multi_camera_manager:
+            stats = self.multi_camera_manager.get_stats()
+            self.multi_camera_manager.stop_capture()
+            self.multi_camera_manager = None
+            
+            self.status_bar.showMessage(
+                f"Захват остановлен: {stats['sets']} наборов, "
+                f"разброс {stats['skew_ms']:.1f} мс, "
+                f"вне допуска {stats['out_of_tolerance']}"
+            )
+        
+        self.multi_camera_action.setChecked(False)
+    
+    def on_multi_camera_stopped(self):
+        """Обработка остановки захвата с нескольких источников"""
+        
+        self.multi_camera_action.setChecked(False)
+    
     def toggle_camera(self):
         """Переключение состояния камеры"""
         
@@ -324,16 +737,109 @@ class ImageProcessorWindow(QMainWindow):
         else:
             self.start_camera()
     
+    def toggle_recording(self, enabled):
+        """Запуск/остановка записи видео с камеры"""
+        
+        if enabled:
+            self.start_recording()
+        else:
+            self.stop_recording()
+    
+    def start_recording(self):
+        """Запуск записи видео в выбранный файл"""
+        
+        try:
+            if not (self.camera_manager and self.camera_active):
+                raise RuntimeError("Сначала включите камеру")
+            
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, "Запись видео", "recording.mp4",
+                "MP4 видео (*.mp4);;AVI видео (*.avi)"
+            )
+            if not file_path:
+                self.record_action.setChecked(False)
+                return
+            
+            # Выбранный канал записывается так же, как отображается
+            transform = None
+            if self.current_channel != 'original':
+                channel = self.current_channel
+                transform = lambda frame: self.image_processor.create_channel_display(frame, channel)
+            
+            # Причину ошибки показывает on_recording_failed
+            recorder = self.camera_manager.start_recording(file_path, transform=transform)
+            if recorder is None:
+                return
+            
+            self.update_recording_status()
+            self.recording_label.show()
+            self.recording_timer.start(500)
+            self.status_bar.showMessage(f"Запись: {Path(file_path).name}")
+            
+        except Exception as e:
+            self.record_action.setChecked(False)
+            self.handle_error(f"Ошибка запуска записи: {str(e)}")
+    
+    def stop_recording(self):
+        """Остановка записи видео"""
+        
+        self.recording_timer.stop()
+        self.recording_label.hide()
+        self.record_action.setChecked(False)
+        
+        if self.camera_manager:
+            stats = self.camera_manager.stop_recording()
+            if stats is not None:
+                self.status_bar.showMessage(
+                    f"Запись остановлена: {stats['written']} кадров, "
+                    f"отброшено {stats['dropped']}"
+                )
+        
+        # Без записи камера снова следует видимости окна
+        self.update_camera_schedule()
+    
+    def on_recording_failed(self, error_message):
+        """
+        Обработка ошибки запуска записи
+        
+        Захват с камеры продолжается, поэтому camera_active не меняется.
+        """
+        
+        self.recording_timer.stop()
+        self.recording_label.hide()
+        self.record_action.setChecked(False)
+        self.handle_error(error_message)
+    
+    def update_recording_status(self):
+        """Обновление индикатора очереди записи"""
+        
+        recorder = self.camera_manager.recorder if self.camera_manager else None
+        if recorder is None:
+            self.stop_recording()
+            return
+        
+        # Поток записи завершился с ошибкой (например, кончилось место на диске)
+        if recorder.error is not None or not recorder.is_alive():
+            error = recorder.error or "поток записи завершился"
+            self.stop_recording()
+            self.handle_error(f"Запись видео прервана: {error}")
+            return
+        
+        stats = recorder.get_stats()
+        self.recording_label.setText(
+            f"⏺ REC {stats['written']} · очередь {stats['depth']}/{stats['queue_size']} "
+            f"(макс. {stats['max_depth']}) · отброшено {stats['dropped']} [{stats['drop_policy']}]"
+        )
+    
     def capture_frame(self):
         """Захват кадра с камеры"""
         
         try:
             if self.camera_manager and self.camera_active:
-                frame = self.camera_manager.capture_single_frame()
+                # Момент нажатия: берется кадр, который был на экране
+                frame = self.camera_manager.capture_single_frame(time.monotonic())
                 if frame is not None:
-                    self.current_image = frame.copy()
-                    self.image_viewer.set_image(self.current_image)
-                    self.image_loaded.emit(self.current_image)
+                    self.show_captured_frame(frame)
                     self.status_bar.showMessage("Кадр захвачен")
                     self.logger.info("Кадр захвачен с камеры")
                 else:
@@ -346,6 +852,70 @@ class ImageProcessorWindow(QMainWindow):
         except Exception as e:
             self.handle_error(f"Ошибка захвата кадра: {str(e)}")
     
+    def capture_burst(self):
+        """Серийный захват: самый резкий кадр за последнюю секунду"""
+        
+        try:
+            if self.camera_manager and self.camera_active:
+                result = self.camera_manager.capture_burst(1.0, time.monotonic())
+                if result is not None:
+                    frame, score = result
+                    self.show_captured_frame(frame)
+                    self.status_bar.showMessage(f"Захвачен самый резкий кадр (резкость {score:.0f})")
+                    self.logger.info("Серийный захват, резкость %.1f", score)
+                else:
+                    QMessageBox.warning(self, "Предупреждение", 
+                                      "Не удалось захватить кадр")
+            else:
+                QMessageBox.warning(self, "Предупреждение", 
+                                  "Камера не активна")
+                
+        except Exception as e:
+            self.handle_error(f"Ошибка серийного захвата: {str(e)}")
+    
+    def set_current_image(self, image):
+        """
+        Замена оригинального изображения
+        
+        Изображение помещается в общее хранилище (без копирования),
+        ссылка на предыдущее освобождается, результат обработки
+        предыдущего изображения сбрасывается.
+        
+        Args:
+            image: numpy массив, ImageROI или ImageHandle
+        """
+        
+        self.set_processed_image(None)
+        
+        previous = self.current_image
+        self.current_image = self.image_store.put(image) if image is not None else None
+        
+        if previous is not None:
+            previous.release()
+    
+    def set_processed_image(self, image):
+        """
+        Замена результата обработки
+        
+        Args:
+            image: Результат обработки или None
+        """
+        
+        previous = self.processed_image
+        self.processed_image = self.image_store.put(image) if image is not None else None
+        
+        if previous is not None:
+            previous.release()
+    
+    def show_captured_frame(self, frame):
+        """Установка захваченного кадра текущим изображением"""
+        
+        self.set_current_image(frame)
+        self.current_file = None
+        self.image_viewer.set_image(self.current_image)
+        self.image_loaded.emit(self.current_image)
+        self.statistics_worker.submit(self.current_image, exact=True)
+    
     def change_channel(self, channel):
         """Изменение RGB канала"""
 
@@ -353,6 +923,8 @@ class ImageProcessorWindow(QMainWindow):
             # Берем текущее изображение (обработанное или оригинальное)
             current_img = self.processed_image if self.processed_image is not None else self.current_image
             
+            self.current_channel = channel
+            
             if current_img is None:
                 return
             
@@ -383,8 +955,9 @@ class ImageProcessorWindow(QMainWindow):
             
             # Для сброса просто используем оригинал
             if function_name == 'reset':
-                self.processed_image = None
+                self.set_processed_image(None)
                 self.image_viewer.set_image(self.current_image)
+                self.statistics_worker.submit(self.current_image, exact=True)
                 self.status_bar.showMessage("Изменения сброшены")
                 self.control_panel.reset_controls()
                 return
@@ -395,22 +968,81 @@ class ImageProcessorWindow(QMainWindow):
                 raise ValueError(f"Функция {function_name} не найдена")
             
             # Выполнение обработки
-            self.processed_image = process_function(current_img, **parameters)
-            self.image_viewer.set_image(self.processed_image)
+            self.profiler.mark_frame()
+            self.set_processed_image(process_function(current_img, **parameters))
+            
+            # Локальное изменение перерисовывает только измененную область
+            region = self.image_processor.last_modified_region
+            self.image_viewer.update_region(self.processed_image, region, base_image=current_img)
+            
             self.processing_finished.emit(self.processed_image)
+            self.update_processed_statistics(region, current_img)
             
             self.status_bar.showMessage(f"Применена обработка: {function_name}")
-            self.logger.info(f"Обработка выполнена: {function_name}")
+            self.logger.info("Обработка выполнена: %s", function_name)
             
         except Exception as e:
             self.handle_error(f"Ошибка обработки: {str(e)}")
     
+    def toggle_profiler_overlay(self, enabled):
+        """Включение/выключение индикатора профиля в строке состояния"""
+        
+        if enabled:
+            self.update_profiler_overlay()
+            self.profiler_label.show()
+            self.profiler_timer.start(500)
+        else:
+            self.profiler_timer.stop()
+            self.profiler_label.hide()
+    
+    def update_profiler_overlay(self):
+        """Обновление разбивки последнего кадра"""
+        
+        self.profiler_label.setText(self.profiler.format_last_frame())
+    
+    def export_profile(self):
+        """Экспорт профиля в формате Chrome trace events"""
+        
+        try:
+            file_path, _ = QFileDialog.getSaveFileName(
+                self,
+                "Экспорт профиля",
+                "profile_trace.json",
+                "Chrome trace (*.json)"
+            )
+            if file_path:
+                self.profiler.export_chrome_trace(file_path)
+                self.status_bar.showMessage(f"Профиль сохранен: {Path(file_path).name}")
+                
+        except Exception as e:
+            self.handle_error(f"Ошибка экспорта профиля: {str(e)}")
+    
+    def update_processed_statistics(self, region, source_image):
+        """Обновление статистики каналов после обработки"""
+        
+        if region is not None:
+            # Изменилась только область - инкрементное обновление
+            self.statistics_worker.submit(self.processed_image, exact=True,
+                                          region=region, base_image=source_image)
+        else:
+            self.statistics_worker.submit(self.processed_image, exact=True)
+    
+    def request_exact_statistics(self):
+        """Точный расчет статистики для текущего изображения"""
+        
+        image = self.processed_image if self.processed_image is not None else self.current_image
+        if image is None:
+            image = self.image_viewer.get_current_image()
+        
+        self.statistics_worker.submit(image, exact=True)
+    
     def reset_image(self):
         """Сброс изменений к оригинальному изображению"""
         
         if self.current_image is not None:
-            self.processed_image = None
+            self.set_processed_image(None)
             self.image_viewer.set_image(self.current_image)
+            self.statistics_worker.submit(self.current_image, exact=True)
             self.status_bar.showMessage("Изменения сброшены")
             self.control_panel.reset_controls()
     
@@ -424,7 +1056,7 @@ class ImageProcessorWindow(QMainWindow):
     def handle_camera_error(self, error_message):
         """Обработка ошибок камеры"""
         
-        self.logger.error(f"Ошибка камеры: {error_message}")
+        self.logger.error("Ошибка камеры: %s", error_message)
         QMessageBox.warning(self, "Ошибка камеры", error_message)
         self.camera_active = False
         self.status_bar.showMessage("Ошибка камеры")
@@ -461,6 +1093,26 @@ class ImageProcessorWindow(QMainWindow):
         
         QMessageBox.about(self, "О программе", about_text)
     
+    def changeEvent(self, event):
+        """Сворачивание и смена фокуса окна меняют режим опроса камеры"""
+        
+        if event.type() in (QEvent.WindowStateChange, QEvent.ActivationChange):
+            self.update_camera_schedule()
+        
+        super().changeEvent(event)
+    
+    def showEvent(self, event):
+        """Показ окна возобновляет опрос камеры"""
+        
+        super().showEvent(event)
+        self.update_camera_schedule()
+    
+    def hideEvent(self, event):
+        """Скрытие окна приостанавливает опрос камеры"""
+        
+        super().hideEvent(event)
+        self.update_camera_schedule()
+    
     def closeEvent(self, event):
         """Обработка закрытия приложения"""
         
@@ -468,5 +1120,15 @@ class ImageProcessorWindow(QMainWindow):
         if self.camera_active:
             self.stop_camera()
         
+        self.stop_multi_camera()
+        
+        self.statistics_worker.stop()
+        self.prefetcher.stop()
+        self.decoder.shutdown(wait=False)
+        self.folder_browser.shutdown()
+        
+        # Сохранение списка недавних файлов
+        self.settings.save_settings()
+        
         self.logger.info("Приложение закрыто")
         event.accept()
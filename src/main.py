@@ -1,6 +1,9 @@
 import sys
 import os
 import logging
+import argparse
+import subprocess
+import importlib.util
 from pathlib import Path
 
 # Добавление корневой папки в Python path
@@ -8,38 +11,48 @@ ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 
-from gui.main_window import ImageProcessorWindow
 from utils.error_handler import setup_logging
 
 def main():
     """Главная функция запуска приложения"""
-    
+
+    args, _ = parse_arguments()
+
+    if args.import_report:
+        sys.exit(print_import_report(args.import_report))
+
+    if args.benchmark is not None:
+        sys.exit(print_benchmark(args.benchmark))
+
     # Настройка логирования
     setup_logging()
     logger = logging.getLogger(__name__)
-    
+
     try:
-        # Проверка зависимостей
-        check_dependencies()
-        
         # Создание приложения Qt
         app = QApplication(sys.argv)
         app.setAttribute(Qt.AA_EnableHighDpiScaling, True)
         app.setApplicationName("Обработка изображений")
         app.setApplicationVersion("1.0")
         app.setOrganizationName("")
-        
+
+        # Модули окна (OpenCV, NumPy) импортируются после создания приложения
+        from gui.main_window import ImageProcessorWindow
+
         # Создание и отображение главного окна
-        window = ImageProcessorWindow()
+        window = ImageProcessorWindow(viewer_backend=args.viewer_backend)
         window.show()
-        
+
         logger.info("Приложение успешно запущено")
-        
+
+        # Проверка зависимостей после первой отрисовки окна
+        QTimer.singleShot(0, lambda: report_missing_dependencies(window))
+
         # Запуск основного цикла приложения
         sys.exit(app.exec_())
-        
+
     except ImportError as e:
         error_msg = f"Ошибка импорта модулей: {e}\nПроверьте установку зависимостей"
         if 'app' in locals():
@@ -48,7 +61,7 @@ def main():
             print(f"❌ {error_msg}")
         logger.error(error_msg)
         sys.exit(1)
-        
+
     except Exception as e:
         error_msg = f"Критическая ошибка: {e}"
         if 'app' in locals():
@@ -58,36 +71,173 @@ def main():
         logger.error(error_msg, exc_info=True)
         sys.exit(1)
 
+def parse_arguments():
+    """Разбор аргументов командной строки"""
+
+    parser = argparse.ArgumentParser(description="Обработка изображений")
+    parser.add_argument(
+        '--import-report', nargs='?', type=int, const=20, default=0,
+        metavar='N',
+        help="Вывести N самых медленных импортов при запуске (аналог -X importtime)"
+    )
+    parser.add_argument(
+        '--benchmark', nargs='?', const='', default=None,
+        metavar='IMAGE',
+        help="Замерить пропускную способность пресетов изменения размера "
+             "(на указанном изображении или на синтетическом кадре 1920x1080)"
+    )
+
+    parser.add_argument(
+        '--viewer-backend', choices=['raster', 'opengl', 'auto'], default=None,
+        help="Способ отображения изображений (по умолчанию - из настроек; "
+             "для проверки программного рендеринга Mesa: LIBGL_ALWAYS_SOFTWARE=1)"
+    )
+
+    # Неизвестные аргументы остаются для QApplication
+    return parser.parse_known_args()
+
 def check_dependencies():
-    """Проверка установки необходимых зависимостей"""
+    """
+    Проверка установки необходимых зависимостей
+
+    Модули не импортируются: проверяется только их наличие,
+    поэтому проверка не замедляет запуск.
+
+    Returns:
+        Список названий отсутствующих обязательных модулей
+    """
     required_modules = {
         'cv2': 'OpenCV',
         'PyQt5': 'PyQt5',
-        'numpy': 'NumPy',
-        'PIL': 'Pillow'
+        'numpy': 'NumPy'
     }
-    
+
     missing_modules = []
-    
+
     for module, name in required_modules.items():
-        try:
-            __import__(module)
+        if importlib.util.find_spec(module) is not None:
             print(f"✅ {name}: установлен")
-        except ImportError:
+        else:
             missing_modules.append(name)
             print(f"❌ {name}: не установлен")
-    
-    # Проверка PyTorch (опциональная)
-    try:
-        import torch
-        print(f"✅ PyTorch: {torch.__version__}")
-    except ImportError:
-        print("⚠️ PyTorch: не установлен (опционально)")
-    
+
+    # Проверка опциональных модулей
+    optional_modules = {
+        'PIL': 'Pillow',
+        'torch': 'PyTorch'
+    }
+
+    for module, name in optional_modules.items():
+        if importlib.util.find_spec(module) is not None:
+            print(f"✅ {name}: установлен")
+        else:
+            print(f"⚠️ {name}: не установлен (опционально)")
+
+    if not missing_modules:
+        print("Все зависимости установлены!")
+
+    return missing_modules
+
+def report_missing_dependencies(parent=None):
+    """Отложенная проверка зависимостей с предупреждением пользователя"""
+
+    missing_modules = check_dependencies()
+
     if missing_modules:
-        raise ImportError(f"Отсутствуют модули: {', '.join(missing_modules)}")
-    
-    print("Все зависимости установлены!")
+        error_msg = f"Отсутствуют модули: {', '.join(missing_modules)}"
+        logging.getLogger(__name__).warning(error_msg)
+        QMessageBox.warning(parent, "Зависимости", error_msg)
+
+def print_import_report(limit=20):
+    """
+    Вывод отчета о времени импорта модулей приложения
+
+    Запускает импорт главного окна в отдельном процессе
+    с флагом -X importtime и выводит самые медленные модули.
+
+    Args:
+        limit: Количество выводимых модулей
+
+    Returns:
+        Код возврата дочернего процесса
+    """
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import gui.main_window'],
+        cwd=str(Path(__file__).parent),
+        capture_output=True,
+        text=True
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue  # Строка заголовка
+
+        entries.append((cumulative_us, self_us, parts[2].strip()))
+
+    if not entries:
+        print(result.stderr)
+        return result.returncode or 1
+
+    total_ms = sum(self_us for _, self_us, _ in entries) / 1000.0
+    print(f"Суммарное время импорта: {total_ms:.1f} мс ({len(entries)} модулей)")
+    print(f"{'накоп., мс':>12} {'собств., мс':>12}  модуль")
+
+    for cumulative_us, self_us, name in sorted(entries, reverse=True)[:limit]:
+        print(f"{cumulative_us / 1000.0:12.1f} {self_us / 1000.0:12.1f}  {name}")
+
+    return result.returncode
+
+def print_benchmark(image_path=''):
+    """
+    Вывод пропускной способности пресетов изменения размера
+
+    Args:
+        image_path: Путь к изображению (пустая строка - синтетический кадр)
+
+    Returns:
+        Код возврата
+    """
+
+    import cv2
+    import numpy as np
+    from processing.resize import ResizeEngine
+
+    if image_path:
+        image = cv2.imread(image_path)
+        if image is None:
+            print(f"❌ Не удалось загрузить изображение: {image_path}")
+            return 1
+    else:
+        image = np.random.default_rng(0).integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+
+    engine = ResizeEngine()
+    height, width = image.shape[:2]
+    print(f"Изменение размера {width}x{height}, пропускная способность в Мпикс/с исходного изображения")
+    print(f"{'масштаб':>8} {'размер':>11}" + "".join(f"{p:>10}" for p in engine.PRESETS) + "   авто")
+
+    for scale in (2.0, 0.75, 0.5, 0.25, 0.1):
+        new_width = max(1, round(width * scale))
+        new_height = max(1, round(height * scale))
+
+        results = engine.benchmark(image, new_width, new_height)
+        auto_preset = engine.choose_preset((width, height), (new_width, new_height))
+
+        row = "".join(f"{r['megapixels_per_second']:10.0f}" for r in results)
+        print(f"{scale:8.2f} {f'{new_width}x{new_height}':>11}{row}   {auto_preset}")
+
+    return 0
 
 if __name__ == "__main__":
     main()
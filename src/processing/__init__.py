@@ -5,10 +5,37 @@
 from .image_processor import ImageProcessor
 from .variant_functions import VariantProcessor
 from .rgb_channels import RGBProcessor
+from .statistics import ChannelStatistics, StatisticsWorker
+from .roi import ImageROI, as_array, materialize
+from .rotation import RotationEngine
+from .blur import BlurEngine
+from .resize import ResizeEngine
+from .annotations import AnnotationLayer, draw_rectangles
+from .canvas import CanvasComposer, fit_to_canvas
+from .buffer_pool import BufferPool, get_buffer_pool, output_buffer
+from .image_store import ImageStore, ImageHandle, get_image_store
 
 __all__ = [
     'ImageProcessor',
     'VariantProcessor',
-    'RGBProcessor'
+    'RGBProcessor',
+    'ChannelStatistics',
+    'StatisticsWorker',
+    'ImageROI',
+    'as_array',
+    'materialize',
+    'RotationEngine',
+    'BlurEngine',
+    'ResizeEngine',
+    'AnnotationLayer',
+    'draw_rectangles',
+    'CanvasComposer',
+    'fit_to_canvas',
+    'BufferPool',
+    'get_buffer_pool',
+    'output_buffer',
+    'ImageStore',
+    'ImageHandle',
+    'get_image_store'
 ]
 
@@ -0,0 +1,188 @@
+"""
+Модуль аннотаций изображений
+
+Содержит пакетное рисование прямоугольников (например, сотен
+детекций на кадре) в один выходной буфер и слой аннотаций,
+который накладывается на изображение только при отображении,
+не изменяя исходные пиксели.
+"""
+
+import cv2
+import numpy as np
+
+from .buffer_pool import output_buffer
+
+
+# Цвет и толщина по умолчанию (как у синего прямоугольника ImageProcessor)
+DEFAULT_COLOR = (150, 60, 0)
+DEFAULT_THICKNESS = 3
+
+
+def normalize_rectangles(rectangles, colors=None, thicknesses=None):
+    """
+    Приведение описания прямоугольников к массивам
+
+    Args:
+        rectangles: Массив Nx4 (x, y, ширина, высота)
+        colors: Один цвет BGR или массив Nx3 (None - цвет по умолчанию)
+        thicknesses: Одна толщина или массив из N значений
+                     (отрицательная толщина - заливка)
+
+    Returns:
+        Кортеж (rectangles Nx4 int32, colors Nx3 int32, thicknesses N int32)
+    """
+
+    rectangles = np.asarray(rectangles, dtype=np.int32).reshape(-1, 4)
+    count = len(rectangles)
+
+    if np.any(rectangles[:, 2:] <= 0):
+        raise ValueError("Ширина и высота должны быть положительными")
+
+    colors = np.asarray(DEFAULT_COLOR if colors is None else colors, dtype=np.int32)
+    colors = np.broadcast_to(colors.reshape(-1, 3), (count, 3))
+
+    thicknesses = np.asarray(DEFAULT_THICKNESS if thicknesses is None else thicknesses,
+                             dtype=np.int32)
+    thicknesses = np.broadcast_to(thicknesses.reshape(-1), (count,))
+
+    return rectangles, colors, thicknesses
+
+
+def draw_rectangles(image, rectangles, colors=None, thicknesses=None, out=None):
+    """
+    Рисование набора прямоугольников в один выходной буфер
+
+    Исходное изображение копируется один раз (или не копируется
+    совсем, если передан out), после чего все прямоугольники
+    рисуются в этот буфер.
+
+    Args:
+        image: Исходное изображение
+        rectangles: Массив Nx4 (x, y, ширина, высота)
+        colors: Один цвет BGR или массив Nx3
+        thicknesses: Одна толщина или массив из N значений
+        out: Буфер результата той же формы (может совпадать с image)
+
+    Returns:
+        Изображение с прямоугольниками
+    """
+
+    rectangles, colors, thicknesses = normalize_rectangles(rectangles, colors, thicknesses)
+
+    if out is None:
+        out = np.array(image, copy=True, order='C')
+    elif out is not image:
+        np.copyto(output_buffer(out, image.shape, image.dtype), image)
+
+    gray = out.ndim == 2
+
+    for (x, y, width, height), color, thickness in zip(rectangles.tolist(), colors.tolist(),
+                                                       thicknesses.tolist()):
+        cv2.rectangle(out, (x, y), (x + width, y + height),
+                      color[0] if gray else tuple(color), thickness)
+
+    return out
+
+
+def bounding_region(rectangles, thicknesses=None):
+    """
+    Общая область пикселей, изменяемых набором прямоугольников
+
+    Args:
+        rectangles: Массив Nx4 (x, y, ширина, высота)
+        thicknesses: Одна толщина или массив из N значений
+
+    Returns:
+        Кортеж (x, y, ширина, высота) или None для пустого набора
+    """
+
+    rectangles, _, thicknesses = normalize_rectangles(rectangles, None, thicknesses)
+    if len(rectangles) == 0:
+        return None
+
+    pad = np.maximum(thicknesses, 0)
+    x0 = int(np.min(rectangles[:, 0] - pad))
+    y0 = int(np.min(rectangles[:, 1] - pad))
+    x1 = int(np.max(rectangles[:, 0] + rectangles[:, 2] + pad)) + 1
+    y1 = int(np.max(rectangles[:, 1] + rectangles[:, 3] + pad)) + 1
+
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+class AnnotationLayer:
+    """
+    Слой аннотаций поверх изображения
+
+    Хранит прямоугольники в массивах и не изменяет исходное
+    изображение: виджет просмотра накладывает слой при отрисовке,
+    а render() создает отдельное изображение с аннотациями.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Удаление всех аннотаций"""
+
+        self.rectangles = np.empty((0, 4), dtype=np.int32)
+        self.colors = np.empty((0, 3), dtype=np.int32)
+        self.thicknesses = np.empty(0, dtype=np.int32)
+        self.visible = True
+
+    def __len__(self):
+        return len(self.rectangles)
+
+    def add_rectangles(self, rectangles, colors=None, thicknesses=None):
+        """
+        Добавление набора прямоугольников
+
+        Args:
+            rectangles: Массив Nx4 (x, y, ширина, высота)
+            colors: Один цвет BGR или массив Nx3
+            thicknesses: Одна толщина или массив из N значений
+        """
+
+        rectangles, colors, thicknesses = normalize_rectangles(rectangles, colors, thicknesses)
+
+        self.rectangles = np.concatenate([self.rectangles, rectangles])
+        self.colors = np.concatenate([self.colors, colors])
+        self.thicknesses = np.concatenate([self.thicknesses, thicknesses])
+
+    def set_rectangles(self, rectangles, colors=None, thicknesses=None):
+        """
+        Замена всех прямоугольников слоя (например, детекций нового кадра)
+
+        Args:
+            rectangles: Массив Nx4 (x, y, ширина, высота)
+            colors: Один цвет BGR или массив Nx3
+            thicknesses: Одна толщина или массив из N значений
+        """
+
+        visible = self.visible
+        self.clear()
+        self.visible = visible
+        self.add_rectangles(rectangles, colors, thicknesses)
+
+    def region(self):
+        """
+        Область изображения, занимаемая аннотациями
+
+        Returns:
+            Кортеж (x, y, ширина, высота) или None для пустого слоя
+        """
+
+        return bounding_region(self.rectangles, self.thicknesses)
+
+    def render(self, image, out=None):
+        """
+        Изображение с нарисованными аннотациями слоя
+
+        Args:
+            image: Исходное изображение (не изменяется, если out не image)
+            out: Буфер результата той же формы
+
+        Returns:
+            Изображение с аннотациями
+        """
+
+        return draw_rectangles(image, self.rectangles, self.colors, self.thicknesses, out=out)
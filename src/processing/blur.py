@@ -0,0 +1,307 @@
+"""
+Модуль размытия изображений
+
+Содержит движок гауссова размытия с несколькими режимами:
+точный (cv2.GaussianBlur), явно сепарабельный, приближение
+итерированным box-фильтром и пирамидальный (уменьшение -
+размытие - увеличение) для больших радиусов. Режим выбирается
+автоматически по модели стоимости с учетом допустимой ошибки.
+"""
+
+import math
+import logging
+
+import cv2
+import numpy as np
+
+from .buffer_pool import output_buffer
+
+
+class BlurEngine:
+    """Движок гауссова размытия с автоматическим выбором режима"""
+
+    MODES = ('exact', 'separable', 'box', 'pyramid')
+
+    # Число проходов box-фильтра (3 прохода дают близкое к гауссу ядро)
+    BOX_PASSES = 3
+
+    # Модель стоимости (условные операции на пиксель)
+    BOX_PASS_COST = 4.0          # Скользящая сумма по одной оси
+    EXACT_OVERHEAD = 1.3         # cv2.GaussianBlur с точной арифметикой
+    EXACT_SMALL_OVERHEAD = 0.8   # cv2.GaussianBlur для малых ядер
+    EXACT_SMALL_KERNEL = 5       # Наибольшее ядро со специализированной реализацией
+    PYRAMID_FIXED_COST = 16.0    # pyrDown + pyrUp по всем уровням
+
+    def __init__(self, max_error=0.1):
+        self.logger = logging.getLogger(__name__)
+
+        # Допустимая ошибка: L1 норма разности импульсных откликов
+        self.max_error = max_error
+
+        self._error_cache = {}
+        self.last_report = None
+
+    @staticmethod
+    def sigma_for_kernel(kernel_size):
+        """
+        Сигма гауссова ядра по его размеру (правило OpenCV при sigma=0)
+
+        Args:
+            kernel_size: Нечетный размер ядра
+
+        Returns:
+            Стандартное отклонение гауссиана
+        """
+
+        return 0.3 * ((kernel_size - 1) * 0.5 - 1) + 0.8
+
+    @staticmethod
+    def box_sizes(sigma, passes=BOX_PASSES):
+        """
+        Размеры box-фильтров, приближающих гауссиан
+
+        Ширины подбираются так, чтобы суммарная дисперсия
+        проходов совпадала с дисперсией гауссиана.
+
+        Args:
+            sigma: Стандартное отклонение гауссиана
+            passes: Число проходов
+
+        Returns:
+            Список нечетных ширин фильтров
+        """
+
+        ideal = math.sqrt(12.0 * sigma * sigma / passes + 1)
+        lower = int(math.floor(ideal))
+        if lower % 2 == 0:
+            lower -= 1
+        lower = max(lower, 1)
+        upper = lower + 2
+
+        count_lower = round(
+            (12.0 * sigma * sigma - passes * lower * lower - 4 * passes * lower - 3 * passes)
+            / (-4.0 * lower - 4)
+        )
+
+        return [lower if i < count_lower else upper for i in range(passes)]
+
+    @staticmethod
+    def pyramid_levels(sigma):
+        """
+        Число уровней пирамиды для заданной сигмы
+
+        На уменьшенном изображении остается размытие с сигмой не менее 1.
+
+        Args:
+            sigma: Стандартное отклонение гауссиана
+
+        Returns:
+            Число уровней (0 - пирамида не нужна)
+        """
+
+        return max(0, int(math.log2(max(1.0, sigma / 2.0))))
+
+    def estimate_cost(self, kernel_size, mode):
+        """
+        Оценка стоимости режима в условных операциях на пиксель
+
+        Args:
+            kernel_size: Размер ядра
+            mode: Режим размытия
+
+        Returns:
+            Оценка стоимости (None, если режим неприменим)
+        """
+
+        if mode == 'separable':
+            return 2.0 * kernel_size
+
+        if mode == 'exact':
+            # Для малых ядер cv2.GaussianBlur использует специализированные
+            # целочисленные ядра и работает быстрее cv2.sepFilter2D
+            overhead = (self.EXACT_SMALL_OVERHEAD if kernel_size <= self.EXACT_SMALL_KERNEL
+                        else self.EXACT_OVERHEAD)
+            return 2.0 * kernel_size * overhead
+
+        if mode == 'box':
+            return 2.0 * self.BOX_PASSES * self.BOX_PASS_COST
+
+        if mode == 'pyramid':
+            sigma = self.sigma_for_kernel(kernel_size)
+            levels = self.pyramid_levels(sigma)
+            if levels == 0:
+                return None
+            residual_kernel = 6.0 * self._residual_sigma(sigma, levels)
+            return self.PYRAMID_FIXED_COST + 2.0 * residual_kernel / (4 ** levels)
+
+        raise ValueError(f"Неизвестный режим размытия: {mode}")
+
+    def choose_mode(self, kernel_size):
+        """
+        Выбор самого дешевого режима с допустимой ошибкой
+
+        Args:
+            kernel_size: Размер ядра
+
+        Returns:
+            Название режима
+        """
+
+        best_mode = 'exact'
+        best_key = (self.estimate_cost(kernel_size, 'exact'), 0.0)
+
+        for mode in ('separable', 'box', 'pyramid'):
+            cost = self.estimate_cost(kernel_size, mode)
+            if cost is None:
+                continue
+
+            error = self.error_bound(kernel_size, mode)['l1_error']
+            if error > self.max_error:
+                continue
+
+            key = (cost, error)
+            if key < best_key:
+                best_mode, best_key = mode, key
+
+        return best_mode
+
+    def blur(self, image, kernel_size, mode='auto', out=None):
+        """
+        Гауссово размытие изображения
+
+        Args:
+            image: Исходное изображение
+            kernel_size: Нечетный размер ядра
+            mode: 'auto', 'exact', 'separable', 'box' или 'pyramid'
+            out: Буфер результата той же формы и типа
+
+        Returns:
+            Размытое изображение
+        """
+
+        if mode == 'auto':
+            mode = self.choose_mode(kernel_size)
+        elif mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим размытия: {mode}")
+
+        if mode == 'pyramid' and self.pyramid_levels(self.sigma_for_kernel(kernel_size)) == 0:
+            mode = 'separable'
+
+        if out is not None:
+            output_buffer(out, image.shape, image.dtype)
+
+        result = self._apply(image, kernel_size, mode, out)
+        self.last_report = self.error_bound(kernel_size, mode)
+
+        return result
+
+    def error_bound(self, kernel_size, mode):
+        """
+        Оценка ошибки режима относительно точного гауссова размытия
+
+        Ошибка считается по импульсному отклику: L1 норма разности
+        откликов ограничивает отклонение любого пикселя величиной
+        l1_error * (максимальное значение пикселя). Для пирамидального
+        режима отклик зависит от положения, поэтому берется максимум
+        по нескольким фазам решетки.
+
+        Args:
+            kernel_size: Размер ядра
+            mode: Режим размытия
+
+        Returns:
+            Словарь с ключами 'mode', 'kernel_size', 'sigma',
+            'l1_error' и 'max_abs_error' (в уровнях 8-битного изображения)
+        """
+
+        key = (kernel_size, mode)
+        report = self._error_cache.get(key)
+        if report is not None:
+            return report
+
+        sigma = self.sigma_for_kernel(kernel_size)
+
+        if mode == 'exact':
+            l1_error = 0.0
+        else:
+            levels = self.pyramid_levels(sigma) if mode == 'pyramid' else 0
+            step = 2 ** levels
+            size = 2 * kernel_size + 4 * step
+            size += (-size) % step
+            center = size // 2
+
+            phases = sorted({0, step // 2, step - 1})
+            l1_error = 0.0
+
+            for dy in phases:
+                for dx in phases:
+                    impulse = np.zeros((size, size), dtype=np.float32)
+                    impulse[center + dy, center + dx] = 1.0
+
+                    reference = self._apply(impulse, kernel_size, 'exact')
+                    approximation = self._apply(impulse, kernel_size, mode)
+                    l1_error = max(l1_error, float(np.abs(approximation - reference).sum()))
+
+        report = {
+            'mode': mode,
+            'kernel_size': kernel_size,
+            'sigma': sigma,
+            'l1_error': l1_error,
+            'max_abs_error': 255.0 * l1_error
+        }
+
+        self._error_cache[key] = report
+        return report
+
+    def _apply(self, image, kernel_size, mode, out=None):
+        """Выполнение размытия выбранным режимом"""
+
+        if mode == 'exact':
+            return cv2.GaussianBlur(image, (kernel_size, kernel_size), 0, dst=out)
+
+        sigma = self.sigma_for_kernel(kernel_size)
+
+        if mode == 'separable':
+            kernel = cv2.getGaussianKernel(kernel_size, 0)
+            return cv2.sepFilter2D(image, -1, kernel, kernel, dst=out)
+
+        if mode == 'box':
+            # Стоимость cv2.blur не зависит от ширины окна; при переданном
+            # out первый проход пишет в него, остальные выполняются на месте
+            result = image
+            for width in self.box_sizes(sigma):
+                result = cv2.blur(result, (width, width), dst=out)
+            return result
+
+        if mode == 'pyramid':
+            levels = self.pyramid_levels(sigma)
+
+            sizes = []
+            result = image
+            for _ in range(levels):
+                sizes.append((result.shape[1], result.shape[0]))
+                result = cv2.pyrDown(result)
+
+            result = cv2.GaussianBlur(result, (0, 0), self._residual_sigma(sigma, levels))
+
+            # Последнее увеличение до исходного размера пишет сразу в out
+            for index, size in enumerate(reversed(sizes)):
+                dst = out if index == levels - 1 else None
+                result = cv2.pyrUp(result, dst=dst, dstsize=size)
+            return result
+
+        raise ValueError(f"Неизвестный режим размытия: {mode}")
+
+    @staticmethod
+    def _residual_sigma(sigma, levels):
+        """
+        Сигма размытия на уменьшенном изображении
+
+        Каждый уровень pyrDown и pyrUp добавляет гауссиан с сигмой
+        около 2^i (в пикселях исходного изображения), поэтому их
+        дисперсия вычитается из требуемой.
+        """
+
+        pyramid_variance = 2.0 * sum(4.0 ** i for i in range(levels))
+        residual = math.sqrt(max(sigma * sigma - pyramid_variance, 0.25))
+        return residual / (2 ** levels)
@@ -0,0 +1,256 @@
+"""
+Модуль пула буферов изображений
+
+Содержит пул предвыделенных массивов, сгруппированных по форме и
+типу данных. Потоковая обработка (например, кадры камеры) берет
+буфер результата из пула и возвращает его после использования,
+поэтому в установившемся режиме новые массивы не выделяются.
+Операции обработки принимают такие буферы через параметр out.
+"""
+
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def output_buffer(out, shape, dtype):
+    """
+    Буфер результата операции
+
+    Args:
+        out: Буфер, переданный вызывающим кодом, или None
+        shape: Требуемая форма результата
+        dtype: Требуемый тип данных результата
+
+    Returns:
+        out или новый массив, если out не передан
+
+    Raises:
+        ValueError: Если форма или тип out не совпадают с требуемыми
+    """
+
+    shape = tuple(shape)
+    dtype = np.dtype(dtype)
+
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+
+    if out.shape != shape or out.dtype != dtype:
+        raise ValueError(
+            f"Буфер результата {out.shape} {out.dtype} не соответствует "
+            f"ожидаемому {shape} {dtype}"
+        )
+
+    return out
+
+
+def output_copy(image, out):
+    """
+    Копия изображения в буфер результата
+
+    Args:
+        image: Исходное изображение
+        out: Буфер той же формы и типа, сам image или None
+
+    Returns:
+        Копия image (в out, если он передан)
+    """
+
+    if out is None:
+        return image.copy()
+
+    if out is not image:
+        np.copyto(output_buffer(out, image.shape, image.dtype), image)
+
+    return out
+
+
+class BufferPool:
+    """Пул переиспользуемых буферов с учетом пиковой занятости"""
+
+    def __init__(self, max_free_per_key=4, max_free_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            max_free_per_key: Максимальное число свободных буферов одной
+                              формы и типа; лишние возвращенные буферы
+                              освобождаются
+            max_free_bytes: Максимальный общий объем свободных буферов;
+                            крупные разовые буферы (например, для
+                            большого изображения) не удерживаются
+        """
+
+        self.max_free_per_key = max_free_per_key
+        self.max_free_bytes = max_free_bytes
+
+        self._lock = threading.Lock()
+        self._free = {}         # ключ -> список свободных буферов
+        self._in_use = {}       # id(буфер) -> (ключ, буфер)
+        self._keys = {}         # ключ -> счетчики
+
+        self.allocations = 0
+        self.reuses = 0
+        self.bytes_in_use = 0
+        self.high_water_bytes = 0
+        self.free_bytes = 0
+
+    @staticmethod
+    def make_key(shape, dtype):
+        """Ключ пула: форма и тип данных"""
+
+        return (tuple(int(size) for size in shape), np.dtype(dtype).str)
+
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        Получение буфера
+
+        Содержимое буфера не инициализируется.
+
+        Args:
+            shape: Форма массива
+            dtype: Тип данных
+
+        Returns:
+            C-непрерывный массив заданной формы и типа
+        """
+
+        key = self.make_key(shape, dtype)
+
+        with self._lock:
+            free = self._free.get(key)
+            counters = self._keys.setdefault(
+                key, {'allocated': 0, 'in_use': 0, 'high_water': 0}
+            )
+
+            if free:
+                buffer = free.pop()
+                self.free_bytes -= buffer.nbytes
+                self.reuses += 1
+            else:
+                buffer = np.empty(key[0], dtype=np.dtype(key[1]))
+                counters['allocated'] += 1
+                self.allocations += 1
+
+            self._in_use[id(buffer)] = (key, buffer)
+            counters['in_use'] += 1
+            counters['high_water'] = max(counters['high_water'], counters['in_use'])
+
+            self.bytes_in_use += buffer.nbytes
+            self.high_water_bytes = max(self.high_water_bytes, self.bytes_in_use)
+
+        return buffer
+
+    def acquire_like(self, image):
+        """
+        Получение буфера той же формы и типа, что и image
+
+        Args:
+            image: Образец массива
+
+        Returns:
+            Буфер из пула
+        """
+
+        return self.acquire(image.shape, image.dtype)
+
+    def release(self, buffer):
+        """
+        Возврат буфера в пул
+
+        После возврата буфер может быть выдан другому потребителю,
+        поэтому ссылки на него использовать нельзя.
+
+        Args:
+            buffer: Буфер, полученный через acquire
+
+        Raises:
+            ValueError: Если буфер не выдан этим пулом или уже возвращен
+        """
+
+        with self._lock:
+            entry = self._in_use.get(id(buffer))
+            if entry is None or entry[1] is not buffer:
+                raise ValueError("Буфер не принадлежит пулу или уже возвращен")
+
+            del self._in_use[id(buffer)]
+            key = entry[0]
+
+            self._keys[key]['in_use'] -= 1
+            self.bytes_in_use -= buffer.nbytes
+
+            free = self._free.setdefault(key, [])
+            if (len(free) < self.max_free_per_key
+                    and self.free_bytes + buffer.nbytes <= self.max_free_bytes):
+                free.append(buffer)
+                self.free_bytes += buffer.nbytes
+
+    @contextmanager
+    def borrowed(self, shape, dtype=np.uint8):
+        """
+        Временный буфер на время блока with
+
+        Args:
+            shape: Форма массива
+            dtype: Тип данных
+        """
+
+        buffer = self.acquire(shape, dtype)
+        try:
+            yield buffer
+        finally:
+            self.release(buffer)
+
+    def clear(self):
+        """Освобождение всех свободных буферов (выданные не затрагиваются)"""
+
+        with self._lock:
+            self._free.clear()
+            self.free_bytes = 0
+
+    def get_stats(self):
+        """
+        Статистика пула
+
+        Returns:
+            Словарь с общими счетчиками и пиковой занятостью
+            по каждой паре (форма, тип)
+        """
+
+        with self._lock:
+            keys = {
+                key: dict(counters, free=len(self._free.get(key, ())))
+                for key, counters in self._keys.items()
+            }
+
+            return {
+                'allocations': self.allocations,
+                'reuses': self.reuses,
+                'in_use': len(self._in_use),
+                'bytes_in_use': self.bytes_in_use,
+                'high_water_bytes': self.high_water_bytes,
+                'free_bytes': self.free_bytes,
+                'keys': keys
+            }
+
+    def reset_high_water(self):
+        """Сброс пиковых значений до текущей занятости"""
+
+        with self._lock:
+            self.high_water_bytes = self.bytes_in_use
+            for counters in self._keys.values():
+                counters['high_water'] = counters['in_use']
+
+
+# Общий пул приложения
+_buffer_pool = BufferPool()
+
+
+def get_buffer_pool():
+    """
+    Получение общего пула буферов
+
+    Returns:
+        Экземпляр BufferPool
+    """
+
+    return _buffer_pool
@@ -0,0 +1,164 @@
+"""
+Модуль композиции кадров на холст фиксированного размера
+
+Содержит вписывание изображения в холст с сохранением пропорций
+(letterbox - полосы сверху и снизу, pillarbox - полосы по бокам),
+заполнение холста с обрезкой и растяжение. Изображение
+масштабируется сразу в область предвыделенного буфера, без
+промежуточных копий cv2.resize и cv2.copyMakeBorder.
+"""
+
+import logging
+
+import numpy as np
+
+from .buffer_pool import output_buffer
+from .resize import ResizeEngine
+
+
+class CanvasComposer:
+    """
+    Композиция кадров на холст с переиспользуемым буфером
+
+    Буфер холста выделяется один раз и используется для всех кадров
+    одинаковой формы. Рамка заливается только при изменении геометрии:
+    область изображения перезаписывается каждым кадром целиком,
+    поэтому полосы остаются нетронутыми.
+    """
+
+    FIT_MODES = ('contain', 'cover', 'stretch')
+
+    def __init__(self, width, height, fit='contain', border_color=0, preset='auto'):
+        if width <= 0 or height <= 0:
+            raise ValueError("Размеры холста должны быть положительными")
+
+        if fit not in self.FIT_MODES:
+            raise ValueError(f"Неизвестный режим вписывания: {fit}")
+
+        self.logger = logging.getLogger(__name__)
+
+        self.width = width
+        self.height = height
+        self.fit = fit
+        self.border_color = border_color
+        self.preset = preset
+
+        self.resize_engine = ResizeEngine()
+
+        self._buffer = None
+        self._layout = None
+        self.last_layout = None
+
+    @staticmethod
+    def compute_layout(src_width, src_height, canvas_width, canvas_height, fit='contain'):
+        """
+        Расчет размещения изображения на холсте
+
+        Args:
+            src_width, src_height: Размер исходного изображения
+            canvas_width, canvas_height: Размер холста
+            fit: 'contain' (целиком, с полосами), 'cover' (весь холст,
+                 с обрезкой) или 'stretch' (без сохранения пропорций)
+
+        Returns:
+            Словарь с ключами 'source' (x, y, ширина, высота) - используемая
+            область исходника, 'target' (x, y, ширина, высота) - область
+            холста и 'bars' ('letterbox', 'pillarbox' или None)
+        """
+
+        source = (0, 0, src_width, src_height)
+        target = (0, 0, canvas_width, canvas_height)
+        bars = None
+
+        if fit == 'contain':
+            scale = min(canvas_width / src_width, canvas_height / src_height)
+            width = min(canvas_width, max(1, round(src_width * scale)))
+            height = min(canvas_height, max(1, round(src_height * scale)))
+            target = ((canvas_width - width) // 2, (canvas_height - height) // 2, width, height)
+
+            if height < canvas_height:
+                bars = 'letterbox'
+            elif width < canvas_width:
+                bars = 'pillarbox'
+
+        elif fit == 'cover':
+            scale = max(canvas_width / src_width, canvas_height / src_height)
+            width = min(src_width, max(1, round(canvas_width / scale)))
+            height = min(src_height, max(1, round(canvas_height / scale)))
+            source = ((src_width - width) // 2, (src_height - height) // 2, width, height)
+
+        elif fit != 'stretch':
+            raise ValueError(f"Неизвестный режим вписывания: {fit}")
+
+        return {'source': source, 'target': target, 'bars': bars}
+
+    def compose(self, image, out=None):
+        """
+        Размещение кадра на холсте
+
+        Args:
+            image: Исходное изображение
+            out: Внешний буфер холста (по умолчанию - внутренний буфер,
+                 который перезаписывается следующим кадром)
+
+        Returns:
+            Буфер холста height x width с изображением
+
+        Raises:
+            ValueError: Если форма или тип out не соответствуют холсту и кадру
+        """
+
+        src_height, src_width = image.shape[:2]
+        layout = self.compute_layout(src_width, src_height, self.width, self.height, self.fit)
+
+        shape = (self.height, self.width) + image.shape[2:]
+
+        if out is None:
+            if (self._buffer is None or self._buffer.shape != shape
+                    or self._buffer.dtype != image.dtype):
+                self._buffer = np.empty(shape, dtype=image.dtype)
+                self._layout = None
+            out = self._buffer
+            fill_border = layout != self._layout
+            self._layout = layout
+        else:
+            out = output_buffer(out, shape, image.dtype)
+            fill_border = True
+
+        sx, sy, sw, sh = layout['source']
+        tx, ty, tw, th = layout['target']
+
+        # Заливаются только полосы вне области изображения
+        if fill_border:
+            out[:ty] = self.border_color
+            out[ty + th:] = self.border_color
+            out[ty:ty + th, :tx] = self.border_color
+            out[ty:ty + th, tx + tw:] = self.border_color
+
+        self.resize_engine.resize(image[sy:sy + sh, sx:sx + sw], tw, th, self.preset,
+                                  out=out[ty:ty + th, tx:tx + tw])
+
+        self.last_layout = layout
+        return out
+
+
+def fit_to_canvas(image, width, height, fit='contain', border_color=0, preset='auto', out=None):
+    """
+    Однократное размещение изображения на холсте
+
+    Args:
+        image: Исходное изображение
+        width, height: Размер холста
+        fit: Режим вписывания ('contain', 'cover', 'stretch')
+        border_color: Цвет полос
+        preset: Пресет изменения размера
+        out: Буфер холста (None - новый буфер), например из пула
+
+    Returns:
+        Изображение холста
+    """
+
+    out = output_buffer(out, (height, width) + image.shape[2:], image.dtype)
+
+    composer = CanvasComposer(width, height, fit, border_color, preset)
+    return composer.compose(image, out=out)
@@ -8,14 +8,43 @@
 import cv2
 import numpy as np
 import logging
+from collections import OrderedDict
 from utils.validators import ImageValidator
+from utils.profiler import profiled
+from .rgb_channels import RGBProcessor
+from .roi import ImageROI, as_array
+from .rotation import RotationEngine
+from .blur import BlurEngine
+from .resize import ResizeEngine
+from .annotations import draw_rectangles, bounding_region
+from .canvas import CanvasComposer
+from .buffer_pool import get_buffer_pool, output_buffer, output_copy
 
 
 class ImageProcessor:
     """Класс для обработки изображений"""
     
+    # Максимальное число каналов cv2.resize при пакетной обработке
+    MAX_PACKED_CHANNELS = 128
+    
+    # Толщина линии синего прямоугольника
+    RECTANGLE_THICKNESS = 3
+    
+    # Количество холстов fit_to_canvas, композиторы которых хранятся между кадрами
+    CANVAS_CACHE_SIZE = 8
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.rotation_engine = RotationEngine()
+        self.blur_engine = BlurEngine()
+        self.resize_engine = ResizeEngine()
+        
+        # Композиторы холстов по (ширина, высота, режим, пресет)
+        self._canvas_composers = OrderedDict()
+        
+        # Область (x, y, ширина, высота), измененная последней операцией;
+        # None - изменено все изображение или его геометрия
+        self.last_modified_region = None
 
     def on_channel_changed(self, channel_text):
         """Обработка изменения RGB канала"""
@@ -50,16 +79,19 @@ class ImageProcessor:
         display_image = self.create_channel_display(current_img, channel)
         self.parent().image_viewer.set_image(display_image)
 
-    def create_channel_display(self, image, channel):
+    @profiled()
+    def create_channel_display(self, image, channel, out=None):
         """Создает изображение для отображения выбранного канала без модификации оригинала"""
+        image = as_array(image)
+        
         if channel == 'original':
-            return image.copy()
+            return output_copy(image, out)
         
         if len(image.shape) != 3:
-            return image.copy()
+            return output_copy(image, out)
         
-        # Создаем копию для отображения
-        display = image.copy()
+        # Создаем копию для отображения (в out, если он передан)
+        display = output_copy(image, out)
         
         if channel == 'red':
             display[:, :, 0] = 0  # Синий
@@ -73,50 +105,46 @@ class ImageProcessor:
         
         return display
         
-    def get_channel_image(self, image, channel):
+    @profiled()
+    def get_channel_image(self, image, channel, out=None):
         """
         Получение изображения с выделенным RGB каналом
         
         Args:
             image: Исходное изображение
             channel: Название канала ('original', 'red', 'green', 'blue')
+            out: Буфер результата той же формы и типа
             
         Returns:
             Обработанное изображение
         """
         try:
+            image = as_array(image)
+            
             if image is None or not ImageValidator.is_valid_image(image):
                 raise ValueError("Невалидное изображение")
             
             if channel == 'original':
-                return image.copy()
+                return output_copy(image, out)
             
             # Проверка, что изображение цветное
             if len(image.shape) != 3:
                 self.logger.warning("Изображение не цветное, возвращаем оригинал")
-                return image.copy()
-            
-            # Создание черного изображения того же размера
-            result = np.zeros_like(image)
-            
-            # Выделение нужного канала
-            if channel == 'red':
-                result[:, :, 2] = image[:, :, 2]  # В OpenCV порядок BGR
-            elif channel == 'green':
-                result[:, :, 1] = image[:, :, 1]
-            elif channel == 'blue':
-                result[:, :, 0] = image[:, :, 0]
-            else:
-                self.logger.warning(f"Неизвестный канал: {channel}")
-                return image.copy()
+                return output_copy(image, out)
             
-            return result
+            if channel not in RGBProcessor.CHANNEL_INDEX:
+                self.logger.warning("Неизвестный канал: %s", channel)
+                return output_copy(image, out)
+            
+            # Остальные каналы обнуляются (в OpenCV порядок BGR)
+            return RGBProcessor.extract_channel(image, channel, out=out)
             
         except Exception as e:
-            self.logger.error(f"Ошибка при выделении канала: {str(e)}")
+            self.logger.error("Ошибка при выделении канала: %s", e)
             raise
     
-    def resize_image(self, image, new_width, new_height):
+    @profiled()
+    def resize_image(self, image, new_width, new_height, preset='auto', out=None):
         """
         Изменение размера изображения
         
@@ -124,11 +152,17 @@ class ImageProcessor:
             image: Исходное изображение
             new_width: Новая ширина
             new_height: Новая высота
+            preset: Пресет ('auto', 'fast', 'balanced', 'quality', 'pyramid');
+                    при 'auto' выбирается по коэффициенту масштабирования
+            out: Буфер результата new_height x new_width
             
         Returns:
             Изображение с измененным размером
         """
+        self.last_modified_region = None
         try:
+            image = as_array(image)
+            
             if image is None or not ImageValidator.is_valid_image(image):
                 raise ValueError("Невалидное изображение")
             
@@ -140,53 +174,61 @@ class ImageProcessor:
                 raise ValueError("Размеры слишком большие (максимум 8000)")
             
             # Изменение размера
-            resized = cv2.resize(image, (new_width, new_height), 
-                               interpolation=cv2.INTER_LINEAR)
+            resized = self.resize_engine.resize(image, new_width, new_height, preset, out=out)
             
-            self.logger.info(f"Размер изменен на {new_width}x{new_height}")
+            self.logger.info("Размер изменен на %sx%s (пресет %s)",
+                             new_width, new_height, self.resize_engine.last_preset)
             return resized
             
         except Exception as e:
-            self.logger.error(f"Ошибка при изменении размера: {str(e)}")
+            self.logger.error("Ошибка при изменении размера: %s", e)
             raise
     
-    def decrease_brightness(self, image, value):
+    @profiled()
+    def decrease_brightness(self, image, value, out=None):
         """
         Понижение яркости изображения
         
         Args:
             image: Исходное изображение
             value: Значение понижения яркости (0-100)
+            out: Буфер результата uint8 той же формы
             
         Returns:
             Изображение с пониженной яркостью
         """
+        self.last_modified_region = None
         try:
+            image = as_array(image)
+            
             if image is None or not ImageValidator.is_valid_image(image):
                 raise ValueError("Невалидное изображение")
             
             # Валидация параметра
             value = max(0, min(100, value))
             
-            # Создание копии изображения
-            result = image.copy().astype(np.float32)
+            result = output_buffer(out, image.shape, np.uint8)
             
             # Понижение яркости
-            # Применяем коэффициент к каждому пикселю
-            factor = 1.0 - (value / 100.0)
-            result = result * factor
-            
-            # Ограничение значений в диапазоне [0, 255]
-            result = np.clip(result, 0, 255).astype(np.uint8)
+            # Применяем коэффициент к каждому пикселю во временном
+            # буфере float32 из пула
+            factor = np.float32(1.0 - (value / 100.0))
+            with get_buffer_pool().borrowed(image.shape, np.float32) as scaled:
+                np.multiply(image, factor, out=scaled)
+                
+                # Ограничение значений в диапазоне [0, 255]
+                np.clip(scaled, 0, 255, out=scaled)
+                np.copyto(result, scaled, casting='unsafe')
             
-            self.logger.info(f"Яркость понижена на {value}%")
+            self.logger.info("Яркость понижена на %s%%", value)
             return result
             
         except Exception as e:
-            self.logger.error(f"Ошибка при понижении яркости: {str(e)}")
+            self.logger.error("Ошибка при понижении яркости: %s", e)
             raise
     
-    def draw_blue_rectangle(self, image, top_left_x, top_left_y, width, height):
+    @profiled()
+    def draw_blue_rectangle(self, image, top_left_x, top_left_y, width, height, out=None):
         """
         Рисование синего прямоугольника на изображении
         
@@ -196,17 +238,18 @@ class ImageProcessor:
             top_left_y: Y координата верхнего левого угла
             width: Ширина прямоугольника
             height: Высота прямоугольника
+            out: Буфер результата той же формы (может совпадать с image)
             
         Returns:
             Изображение с нарисованным прямоугольником
         """
+        self.last_modified_region = None
         try:
+            image = as_array(image)
+            
             if image is None or not ImageValidator.is_valid_image(image):
                 raise ValueError("Невалидное изображение")
             
-            # Создание копии изображения
-            result = image.copy()
-            
             # Валидация параметров
             img_height, img_width = image.shape[:2]
             
@@ -229,10 +272,13 @@ class ImageProcessor:
             if bottom_right_y >= img_height:
                 raise ValueError(f"Прямоугольник выходит за границы по высоте")
             
+            # Создание копии изображения (в out, если он передан)
+            result = output_copy(image, out)
+            
             # Рисование прямоугольника
             # Синий цвет в BGR формате: (255, 0, 0)
             color = (150, 60, 0)
-            thickness = 3  # Толщина линии
+            thickness = self.RECTANGLE_THICKNESS  # Толщина линии
             
             cv2.rectangle(
                 result, 
@@ -242,75 +288,178 @@ class ImageProcessor:
                 thickness
             )
             
-            self.logger.info(f"Нарисован прямоугольник: верхний левый угол=({top_left_x}, {top_left_y}), размер={width}x{height}")
+            self.last_modified_region = self.clip_region(
+                self.rectangle_region(top_left_x, top_left_y, width, height, thickness),
+                result.shape
+            )
+            
+            self.logger.info("Нарисован прямоугольник: верхний левый угол=(%s, %s), размер=%sx%s", top_left_x, top_left_y, width, height)
             return result
             
         except Exception as e:
-            self.logger.error(f"Ошибка при рисовании прямоугольника: {str(e)}")
+            self.logger.error("Ошибка при рисовании прямоугольника: %s", e)
             raise
     
-    def rotate_image(self, image, angle):
+    @staticmethod
+    def rectangle_region(top_left_x, top_left_y, width, height, thickness=RECTANGLE_THICKNESS):
+        """
+        Область пикселей, изменяемых при рисовании прямоугольника
+        
+        Args:
+            top_left_x: X координата верхнего левого угла
+            top_left_y: Y координата верхнего левого угла
+            width: Ширина прямоугольника
+            height: Высота прямоугольника
+            thickness: Толщина линии
+            
+        Returns:
+            Кортеж (x, y, width, height) с учетом толщины линии
+        """
+        
+        return (top_left_x - thickness, top_left_y - thickness,
+                width + 2 * thickness + 1, height + 2 * thickness + 1)
+    
+    @staticmethod
+    def clip_region(region, shape):
+        """
+        Обрезка области по границам изображения
+        
+        Args:
+            region: Кортеж (x, y, ширина, высота)
+            shape: Форма изображения
+            
+        Returns:
+            Кортеж (x, y, ширина, высота) внутри изображения или None,
+            если область не пересекается с изображением
+        """
+        
+        height, width = shape[:2]
+        x, y, w, h = region
+        
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(width, x + w), min(height, y + h)
+        
+        if x1 <= x0 or y1 <= y0:
+            return None
+        
+        return (x0, y0, x1 - x0, y1 - y0)
+    
+    @profiled()
+    def draw_rectangles(self, image, rectangles, colors=None, thicknesses=None, out=None):
+        """
+        Рисование набора прямоугольников за одну операцию
+        
+        Изображение копируется один раз, все прямоугольники
+        рисуются в общий выходной буфер.
+        
+        Args:
+            image: Исходное изображение
+            rectangles: Массив Nx4 (x, y, ширина, высота)
+            colors: Один цвет BGR или массив Nx3 (по умолчанию синий)
+            thicknesses: Одна толщина или массив из N значений
+            out: Буфер результата той же формы (может совпадать с image)
+            
+        Returns:
+            Изображение с нарисованными прямоугольниками
+        """
+        self.last_modified_region = None
+        try:
+            image = as_array(image)
+            
+            if image is None or not ImageValidator.is_valid_image(image):
+                raise ValueError("Невалидное изображение")
+            
+            if thicknesses is None:
+                thicknesses = self.RECTANGLE_THICKNESS
+            
+            result = draw_rectangles(image, rectangles, colors, thicknesses, out=out)
+            
+            region = bounding_region(rectangles, thicknesses)
+            if region is not None:
+                self.last_modified_region = self.clip_region(region, result.shape)
+            
+            self.logger.info("Нарисовано прямоугольников: %s", len(rectangles))
+            return result
+            
+        except Exception as e:
+            self.logger.error("Ошибка при рисовании прямоугольников: %s", e)
+            raise
+    
+    @profiled()
+    def rotate_image(self, image, angle, expand=False, out=None):
         """
         Поворот изображения
         
+        Углы, кратные 90°, поворачиваются без интерполяции (без потерь,
+        размеры для 90°/270° меняются местами). Для остальных углов
+        преобразование берется из кэша движка поворота.
+        
         Args:
             image: Исходное изображение
             angle: Угол поворота в градусах
+            expand: Расширить холст, чтобы углы не обрезались
+            out: Буфер результата повернутого размера
             
         Returns:
             Повернутое изображение
         """
+        self.last_modified_region = None
         try:
+            image = as_array(image)
+            
             if image is None or not ImageValidator.is_valid_image(image):
                 raise ValueError("Невалидное изображение")
             
-            height, width = image.shape[:2]
-            center = (width // 2, height // 2)
-            
-            # Матрица поворота
-            rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-            
             # Поворот изображения
-            rotated = cv2.warpAffine(image, rotation_matrix, (width, height))
+            rotated = self.rotation_engine.rotate(image, angle, expand=expand, out=out)
             
-            self.logger.info(f"Изображение повернуто на {angle}°")
+            self.logger.info("Изображение повернуто на %s°", angle)
             return rotated
             
         except Exception as e:
-            self.logger.error(f"Ошибка при повороте изображения: {str(e)}")
+            self.logger.error("Ошибка при повороте изображения: %s", e)
             raise
     
-    def apply_blur(self, image, kernel_size=5):
+    @profiled()
+    def apply_blur(self, image, kernel_size=5, mode='auto', out=None):
         """
         Размытие изображения
         
         Args:
             image: Исходное изображение
             kernel_size: Размер ядра размытия
+            mode: Режим размытия ('auto', 'exact', 'separable', 'box', 'pyramid')
+            out: Буфер результата той же формы и типа
             
         Returns:
             Размытое изображение
         """
+        self.last_modified_region = None
         try:
+            image = as_array(image)
+            
             if image is None or not ImageValidator.is_valid_image(image):
                 raise ValueError("Невалидное изображение")
             
             # Проверка, что kernel_size нечетное
             if kernel_size % 2 == 0:
                 kernel_size += 1
-                self.logger.info(f"Размер ядра увеличен до нечетного: {kernel_size}")
+                self.logger.info("Размер ядра увеличен до нечетного: %s", kernel_size)
                 
-            # Размытие
-            blurred = cv2.GaussianBlur(image, (kernel_size, kernel_size), 0)
+            # Размытие (режим выбирается по модели стоимости)
+            blurred = self.blur_engine.blur(image, kernel_size, mode, out=out)
+            report = self.blur_engine.last_report
             
-            self.logger.info(f"Применено размытие с ядром {kernel_size}x{kernel_size}")
+            self.logger.info("Применено размытие с ядром %sx%s (режим %s, ошибка L1 не более %.4f)",
+                             kernel_size, kernel_size, report['mode'], report['l1_error'])
             return blurred
             
         except Exception as e:
-            self.logger.error(f"Ошибка при размытии изображения: {str(e)}")
+            self.logger.error("Ошибка при размытии изображения: %s", e)
             raise
     
-    def crop_image(self, image, x, y, width, height):
+    @profiled()
+    def crop_image(self, image, x, y, width, height, out=None):
         """
         Обрезка изображения
         
@@ -320,11 +469,17 @@ class ImageProcessor:
             y: Y координата верхнего левого угла
             width: Ширина области обрезки
             height: Высота области обрезки
+            out: Буфер height x width для копии области
             
         Returns:
-            Обрезанное изображение
+            Область интереса ImageROI, ссылающаяся на исходный буфер,
+            или out с копией области, если он передан
         """
+        self.last_modified_region = None
         try:
+            source = image
+            image = as_array(image)
+            
             if image is None or not ImageValidator.is_valid_image(image):
                 raise ValueError("Невалидное изображение")
             
@@ -337,17 +492,21 @@ class ImageProcessor:
             if width <= 0 or height <= 0:
                 raise ValueError("Ширина и высота должны быть положительными")
             
-            # Обрезка изображения
-            cropped = image[y:y+height, x:x+width]
+            # Обрезка без копирования: область ссылается на родительский буфер
+            cropped = ImageROI(source, x, y, width, height)
             
-            self.logger.info(f"Изображение обрезано: x={x}, y={y}, width={width}, height={height}")
+            if out is not None:
+                cropped = output_copy(cropped.array, out)
+            
+            self.logger.info("Изображение обрезано: x=%s, y=%s, width=%s, height=%s", x, y, width, height)
             return cropped
             
         except Exception as e:
-            self.logger.error(f"Ошибка при обрезке изображения: {str(e)}")
+            self.logger.error("Ошибка при обрезке изображения: %s", e)
             raise
     
-    def add_black_border(self, image, top, bottom, left, right):
+    @profiled()
+    def add_black_border(self, image, top, bottom, left, right, out=None):
         """
         Добавление черной рамки к изображению
         
@@ -357,11 +516,15 @@ class ImageProcessor:
             bottom: Размер нижней границы (в пикселях)
             left: Размер левой границы (в пикселях)
             right: Размер правой границы (в пикселях)
+            out: Буфер результата с учетом рамки
             
         Returns:
             Изображение с черной рамкой
         """
+        self.last_modified_region = None
         try:
+            image = as_array(image)
+            
             if image is None or not ImageValidator.is_valid_image(image):
                 raise ValueError("Невалидное изображение")
             
@@ -375,17 +538,341 @@ class ImageProcessor:
             else:  # Оттенки серого
                 border_color = 0  # Черный цвет
             
+            if out is not None:
+                img_height, img_width = image.shape[:2]
+                output_buffer(out, (img_height + top + bottom, img_width + left + right)
+                              + image.shape[2:], image.dtype)
+            
             # Добавление границ
             result = cv2.copyMakeBorder(
                 image,
                 top, bottom, left, right,
                 cv2.BORDER_CONSTANT,
+                dst=out,
                 value=border_color
             )
             
-            self.logger.info(f"Добавлена черная рамка: top={top}, bottom={bottom}, left={left}, right={right}")
+            self.logger.info("Добавлена черная рамка: top=%s, bottom=%s, left=%s, right=%s", top, bottom, left, right)
+            return result
+            
+        except Exception as e:
+            self.logger.error("Ошибка при добавлении рамки: %s", e)
+            raise
+    
+    @profiled()
+    def fit_to_canvas(self, image, canvas_width, canvas_height, fit='contain', preset='auto', out=None):
+        """
+        Вписывание изображения в холст фиксированного размера
+        
+        Изображение масштабируется сразу в область результата,
+        черные полосы (letterbox/pillarbox) заливаются в том же
+        буфере - без промежуточных resize и copyMakeBorder.
+        Композитор холста сохраняется между вызовами; для потока
+        кадров буфер результата передается через out.
+        
+        Args:
+            image: Исходное изображение
+            canvas_width: Ширина холста
+            canvas_height: Высота холста
+            fit: 'contain' (с полосами), 'cover' (с обрезкой) или 'stretch'
+            preset: Пресет изменения размера
+            out: Буфер холста canvas_height x canvas_width
+            
+        Returns:
+            Изображение холста canvas_height x canvas_width
+        """
+        self.last_modified_region = None
+        try:
+            image = as_array(image)
+            
+            if image is None or not ImageValidator.is_valid_image(image):
+                raise ValueError("Невалидное изображение")
+            
+            if canvas_width > 8000 or canvas_height > 8000:
+                raise ValueError("Размеры слишком большие (максимум 8000)")
+            
+            composer = self.get_canvas_composer(canvas_width, canvas_height, fit, preset)
+            result = output_buffer(out, (canvas_height, canvas_width) + image.shape[2:], image.dtype)
+            composer.compose(image, out=result)
+            
+            self.logger.info("Изображение вписано в холст %sx%s (режим %s, полосы: %s)",
+                             canvas_width, canvas_height, fit, composer.last_layout['bars'])
             return result
             
         except Exception as e:
-            self.logger.error(f"Ошибка при добавлении рамки: {str(e)}")
-            raise
\ No newline at end of file
+            self.logger.error("Ошибка при вписывании в холст: %s", e)
+            raise
+
+    def get_canvas_composer(self, canvas_width, canvas_height, fit='contain', preset='auto'):
+        """
+        Композитор холста из кэша (создается при первом обращении)
+        
+        Args:
+            canvas_width: Ширина холста
+            canvas_height: Высота холста
+            fit: Режим вписывания
+            preset: Пресет изменения размера
+            
+        Returns:
+            Экземпляр CanvasComposer
+        """
+        key = (canvas_width, canvas_height, fit, preset)
+        
+        composer = self._canvas_composers.get(key)
+        if composer is not None:
+            self._canvas_composers.move_to_end(key)
+            return composer
+        
+        composer = CanvasComposer(canvas_width, canvas_height, fit, preset=preset)
+        self._canvas_composers[key] = composer
+        if len(self._canvas_composers) > self.CANVAS_CACHE_SIZE:
+            self._canvas_composers.popitem(last=False)
+        
+        return composer
+
+    # ------------------------------------------------------------------
+    # Пакетная обработка: массивы NxHxW или NxHxWxC одинаковых кадров
+    # ------------------------------------------------------------------
+
+    @profiled()
+    def get_channel_image_batch(self, images, channel, out=None):
+        """
+        Выделение RGB канала для пакета изображений
+        
+        Args:
+            images: Пакет изображений NxHxWxC
+            channel: Название канала ('original', 'red', 'green', 'blue')
+            out: Буфер результата той же формы и типа
+            
+        Returns:
+            Пакет изображений с выделенным каналом
+        """
+        try:
+            if not ImageValidator.is_valid_batch(images):
+                raise ValueError("Невалидный пакет изображений")
+            
+            if channel == 'original' or images.ndim != 4:
+                return output_copy(images, out)
+            
+            # Как и для одного изображения: неизвестный канал - копия оригинала
+            if channel not in RGBProcessor.CHANNEL_INDEX:
+                self.logger.warning("Неизвестный канал: %s", channel)
+                return output_copy(images, out)
+            
+            return RGBProcessor.extract_channel_batch(images, channel, out=out)
+            
+        except Exception as e:
+            self.logger.error("Ошибка при выделении канала пакета: %s", e)
+            raise
+    
+    @profiled()
+    def resize_image_batch(self, images, new_width, new_height, preset='auto', out=None):
+        """
+        Изменение размера пакета изображений
+        
+        Каналы всех кадров упаковываются в одно многоканальное
+        изображение, поэтому ResizeEngine вызывается один раз на
+        каждые MAX_PACKED_CHANNELS каналов. Если интерполяция
+        пресета зависит от числа каналов, кадры обрабатываются
+        по одному. Результат совпадает с поэлементным вызовом
+        resize_image.
+        
+        Args:
+            images: Пакет изображений NxHxW или NxHxWxC
+            new_width: Новая ширина
+            new_height: Новая высота
+            preset: Пресет ('auto', 'fast', 'balanced', 'quality', 'pyramid');
+                    при 'auto' выбирается по коэффициенту масштабирования
+            out: Буфер результата Nxnew_heightxnew_width[xC]
+            
+        Returns:
+            Пакет изображений Nxnew_heightxnew_width[xC]
+        """
+        try:
+            if not ImageValidator.is_valid_batch(images):
+                raise ValueError("Невалидный пакет изображений")
+            
+            if new_width <= 0 or new_height <= 0:
+                raise ValueError("Размеры должны быть положительными")
+            
+            if new_width > 8000 or new_height > 8000:
+                raise ValueError("Размеры слишком большие (максимум 8000)")
+            
+            count, height, width = images.shape[:3]
+            channels = images.shape[3] if images.ndim == 4 else 1
+            
+            result = output_buffer(out, (count, new_height, new_width) + images.shape[3:],
+                                   images.dtype)
+            
+            frames = images.reshape(count, height, width, channels)
+            frames_out = result.reshape(count, new_height, new_width, channels)
+            
+            # Пресет выбирается один раз по размерам кадра, как в resize_image
+            src_size, dst_size = (width, height), (new_width, new_height)
+            if preset == 'auto':
+                preset = self.resize_engine.choose_preset(src_size, dst_size)
+            elif preset not in self.resize_engine.PRESETS:
+                raise ValueError(f"Неизвестный пресет изменения размера: {preset}")
+            
+            frames_per_chunk = 1
+            if self.resize_engine.supports_packing(preset, src_size, dst_size):
+                frames_per_chunk = max(1, self.MAX_PACKED_CHANNELS // channels)
+            
+            pool = get_buffer_pool()
+            for start in range(0, count, frames_per_chunk):
+                stop = min(count, start + frames_per_chunk)
+                packed_channels = (stop - start) * channels
+                
+                if stop - start == 1:
+                    # Одиночный кадр обрабатывается без упаковки
+                    self.resize_engine.resize(images[start], new_width, new_height, preset,
+                                              out=result[start])
+                    continue
+                
+                # HxWx(n*C): кадры становятся каналами одного изображения;
+                # промежуточные буферы берутся из пула
+                with pool.borrowed((height, width, packed_channels), images.dtype) as packed, \
+                        pool.borrowed((new_height, new_width, packed_channels), images.dtype) as resized:
+                    packed.reshape(height, width, stop - start, channels)[...] = \
+                        frames[start:stop].transpose(1, 2, 0, 3)
+                    
+                    self.resize_engine.resize(packed, new_width, new_height, preset, out=resized)
+                    frames_out[start:stop] = resized.reshape(
+                        new_height, new_width, stop - start, channels
+                    ).transpose(2, 0, 1, 3)
+            
+            self.logger.info("Размер пакета из %s кадров изменен на %sx%s (пресет %s)",
+                             count, new_width, new_height, preset)
+            return result
+            
+        except Exception as e:
+            self.logger.error("Ошибка при изменении размера пакета: %s", e)
+            raise
+    
+    @profiled()
+    def decrease_brightness_batch(self, images, value, out=None):
+        """
+        Понижение яркости пакета изображений
+        
+        Args:
+            images: Пакет изображений NxHxW или NxHxWxC
+            value: Значение понижения яркости (0-100)
+            out: Буфер результата uint8 той же формы
+            
+        Returns:
+            Пакет изображений с пониженной яркостью
+        """
+        try:
+            if not ImageValidator.is_valid_batch(images):
+                raise ValueError("Невалидный пакет изображений")
+            
+            value = max(0, min(100, value))
+            factor = np.float32(1.0 - (value / 100.0))
+            
+            result = output_buffer(out, images.shape, np.uint8)
+            
+            # Один промежуточный буфер float32 из пула на весь пакет
+            with get_buffer_pool().borrowed(images.shape, np.float32) as scaled:
+                np.multiply(images, factor, out=scaled)
+                np.clip(scaled, 0, 255, out=scaled)
+                np.copyto(result, scaled, casting='unsafe')
+            
+            self.logger.info("Яркость пакета из %s кадров понижена на %s%%",
+                             len(images), value)
+            return result
+            
+        except Exception as e:
+            self.logger.error("Ошибка при понижении яркости пакета: %s", e)
+            raise
+    
+    @profiled()
+    def crop_image_batch(self, images, x, y, width, height, out=None):
+        """
+        Обрезка пакета изображений
+        
+        Args:
+            images: Пакет изображений NxHxW или NxHxWxC
+            x: X координата верхнего левого угла
+            y: Y координата верхнего левого угла
+            width: Ширина области обрезки
+            height: Высота области обрезки
+            out: Буфер Nxheightxwidth[xC] для копии областей
+            
+        Returns:
+            Пакет обрезанных изображений (представление исходного массива
+            или out с копией, если он передан)
+        """
+        try:
+            if not ImageValidator.is_valid_batch(images):
+                raise ValueError("Невалидный пакет изображений")
+            
+            img_height, img_width = images.shape[1:3]
+            
+            if x < 0 or y < 0 or x + width > img_width or y + height > img_height:
+                raise ValueError("Область обрезки выходит за пределы изображения")
+            
+            if width <= 0 or height <= 0:
+                raise ValueError("Ширина и высота должны быть положительными")
+            
+            cropped = images[:, y:y+height, x:x+width]
+            
+            if out is not None:
+                cropped = output_copy(cropped, out)
+            
+            self.logger.info("Пакет из %s кадров обрезан: x=%s, y=%s, width=%s, height=%s",
+                             len(images), x, y, width, height)
+            return cropped
+            
+        except Exception as e:
+            self.logger.error("Ошибка при обрезке пакета: %s", e)
+            raise
+    
+    @profiled()
+    def add_black_border_batch(self, images, top, bottom, left, right, out=None):
+        """
+        Добавление черной рамки к пакету изображений
+        
+        Args:
+            images: Пакет изображений NxHxW или NxHxWxC
+            top: Размер верхней границы (в пикселях)
+            bottom: Размер нижней границы (в пикселях)
+            left: Размер левой границы (в пикселях)
+            right: Размер правой границы (в пикселях)
+            out: Буфер результата с учетом рамки
+            
+        Returns:
+            Пакет изображений с черной рамкой
+        """
+        try:
+            if not ImageValidator.is_valid_batch(images):
+                raise ValueError("Невалидный пакет изображений")
+            
+            if top < 0 or bottom < 0 or left < 0 or right < 0:
+                raise ValueError("Размеры границ должны быть неотрицательными")
+            
+            count, height, width = images.shape[:3]
+            
+            shape = (count, height + top + bottom, width + left + right) + images.shape[3:]
+            
+            if out is None:
+                # Одно выделение под весь пакет, рамка остается нулевой
+                result = np.zeros(shape, dtype=images.dtype)
+            else:
+                # В переданном буфере заливается только рамка
+                result = output_buffer(out, shape, images.dtype)
+                result[:, :top] = 0
+                result[:, top+height:] = 0
+                result[:, top:top+height, :left] = 0
+                result[:, top:top+height, left+width:] = 0
+            
+            result[:, top:top+height, left:left+width] = images
+            
+            self.logger.info("Добавлена черная рамка к пакету из %s кадров: "
+                             "top=%s, bottom=%s, left=%s, right=%s",
+                             count, top, bottom, left, right)
+            return result
+            
+        except Exception as e:
+            self.logger.error("Ошибка при добавлении рамки к пакету: %s", e)
+            raise
+
@@ -0,0 +1,277 @@
+"""
+Модуль общего хранилища изображений
+
+Содержит хранилище неизменяемых изображений с подсчетом ссылок.
+Компоненты приложения (главное окно, панель управления, просмотр,
+статистика) разделяют один буфер через дескриптор ImageHandle
+вместо собственных копий. Буфер помечается как доступный только
+для чтения (представление чужого изменяемого буфера копируется),
+а изменение выполняется явно: materialize() возвращает копию,
+результат которой помещается в хранилище как новое изображение. Номер поколения дескриптора уникален, поэтому кэши,
+построенные по изображению, хранят номер вместо ссылки на пиксели
+и сбрасываются при его смене.
+"""
+
+import itertools
+import threading
+
+import numpy as np
+
+
+class ImageHandle:
+    """Дескриптор неизменяемого изображения хранилища"""
+
+    def __init__(self, store, array, generation):
+        self._store = store
+        self._array = array
+        self.generation = generation
+        self.refcount = 1
+
+    @property
+    def array(self):
+        """Массив изображения (только для чтения)"""
+
+        return self._array
+
+    @property
+    def shape(self):
+        return self._array.shape
+
+    @property
+    def ndim(self):
+        return self._array.ndim
+
+    @property
+    def dtype(self):
+        return self._array.dtype
+
+    @property
+    def size(self):
+        return self._array.size
+
+    @property
+    def nbytes(self):
+        return self._array.nbytes
+
+    def retain(self):
+        """
+        Увеличение числа ссылок
+
+        Returns:
+            Этот же дескриптор
+        """
+
+        self._store.retain(self)
+        return self
+
+    def release(self):
+        """Уменьшение числа ссылок (при нуле изображение удаляется из хранилища)"""
+
+        self._store.release(self)
+
+    def materialize(self):
+        """
+        Копия изображения для записи
+
+        Returns:
+            Непрерывный numpy массив, доступный для записи
+        """
+
+        return np.array(self._array, copy=True, order='C')
+
+    def __array__(self, dtype=None, copy=None):
+        return export_array(self._array, dtype, copy)
+
+    def __repr__(self):
+        return (f"ImageHandle(generation={self.generation}, shape={self.shape}, "
+                f"refcount={self.refcount})")
+
+
+def export_array(array, dtype=None, copy=None):
+    """
+    Массив для протокола numpy __array__
+
+    Args:
+        array: Массив изображения
+        dtype: Требуемый тип данных или None
+        copy: True - всегда копия, False - копирование запрещено,
+              None - копия только при преобразовании типа
+
+    Returns:
+        array или его копия
+
+    Raises:
+        ValueError: Если copy=False, а тип требует преобразования
+    """
+
+    if dtype is not None and np.dtype(dtype) != array.dtype:
+        if copy is False:
+            raise ValueError(
+                f"Преобразование {array.dtype} в {np.dtype(dtype)} невозможно без копирования"
+            )
+        return array.astype(dtype)
+
+    return array.copy() if copy else array
+
+
+def root_array(array):
+    """
+    Массив, которому принадлежит память представления
+
+    Args:
+        array: numpy массив или представление
+
+    Returns:
+        Корневой numpy массив цепочки base
+    """
+
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+class ImageStore:
+    """Хранилище неизменяемых изображений с подсчетом ссылок"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generations = itertools.count(1)
+        self._handles = {}      # поколение -> дескриптор
+        self._arrays = {}       # id(массив) -> дескриптор
+
+        self.bytes_stored = 0
+        self.peak_bytes = 0
+
+    def put(self, image):
+        """
+        Помещение изображения в хранилище
+
+        Хранилище становится владельцем массива: флаг записи
+        сбрасывается у самого массива, поэтому изменить пиксели через
+        прежние ссылки тоже нельзя. Представление (в том числе
+        ImageROI) хранится без копирования, только если его корневой
+        буфер уже доступен только для чтения (например, изображение
+        хранилища); представление изменяемого буфера копируется.
+        Повторное помещение того же массива (или дескриптора)
+        возвращает существующий дескриптор с увеличенным числом ссылок
+        (скопированное представление каждый раз копируется заново).
+
+        Args:
+            image: numpy массив, ImageROI или ImageHandle
+
+        Returns:
+            ImageHandle
+        """
+
+        if isinstance(image, ImageHandle):
+            return image.retain()
+
+        array = image if isinstance(image, np.ndarray) else np.asarray(image)
+
+        with self._lock:
+            handle = self._arrays.get(id(array))
+            if handle is not None and handle.array is array:
+                handle.refcount += 1
+                return handle
+
+            root = root_array(array)
+            if root is array and array.flags.owndata:
+                array.flags.writeable = False
+            elif root.flags.writeable or not root.flags.owndata:
+                # Пиксели могут измениться через родительский буфер
+                array = np.array(array, copy=True, order='C')
+                array.flags.writeable = False
+
+            handle = ImageHandle(self, array, next(self._generations))
+            self._handles[handle.generation] = handle
+            self._arrays[id(array)] = handle
+
+            self.bytes_stored += array.nbytes
+            self.peak_bytes = max(self.peak_bytes, self.bytes_stored)
+
+        return handle
+
+    def get(self, generation):
+        """
+        Поиск изображения по номеру поколения
+
+        Args:
+            generation: Номер поколения
+
+        Returns:
+            ImageHandle (без увеличения числа ссылок) или None
+        """
+
+        with self._lock:
+            return self._handles.get(generation)
+
+    def retain(self, handle):
+        """Увеличение числа ссылок дескриптора"""
+
+        with self._lock:
+            if handle.refcount <= 0:
+                raise ValueError("Изображение уже удалено из хранилища")
+            handle.refcount += 1
+
+    def release(self, handle):
+        """
+        Уменьшение числа ссылок дескриптора
+
+        Когда ссылок не остается, хранилище перестает держать
+        изображение; пиксели освобождаются, как только исчезнут
+        оставшиеся представления массива.
+        """
+
+        with self._lock:
+            if handle.refcount <= 0:
+                raise ValueError("Изображение уже удалено из хранилища")
+
+            handle.refcount -= 1
+            if handle.refcount == 0:
+                del self._handles[handle.generation]
+                del self._arrays[id(handle.array)]
+                self.bytes_stored -= handle.nbytes
+
+    def get_stats(self):
+        """
+        Статистика хранилища
+
+        Returns:
+            Словарь с ключами 'images', 'bytes' и 'peak_bytes'
+        """
+
+        with self._lock:
+            return {
+                'images': len(self._handles),
+                'bytes': self.bytes_stored,
+                'peak_bytes': self.peak_bytes
+            }
+
+
+def image_generation(image):
+    """
+    Номер поколения изображения
+
+    Args:
+        image: ImageHandle, numpy массив или ImageROI
+
+    Returns:
+        Номер поколения или None, если изображение не из хранилища
+    """
+
+    return image.generation if isinstance(image, ImageHandle) else None
+
+
+# Общее хранилище приложения
+_image_store = ImageStore()
+
+
+def get_image_store():
+    """
+    Получение общего хранилища изображений
+
+    Returns:
+        Экземпляр ImageStore
+    """
+
+    return _image_store
@@ -0,0 +1,216 @@
+"""
+Модуль изменения размера изображений
+
+Содержит движок изменения размера с пресетами качества и
+скорости: быстрый (ближайший сосед), сбалансированный
+(билинейный), качественный (INTER_AREA при уменьшении,
+Lanczos при увеличении) и пирамидальный (последовательные
+уменьшения вдвое через pyrDown и финальный шаг INTER_AREA).
+"""
+
+import time
+import logging
+
+import cv2
+import numpy as np
+
+from .buffer_pool import output_buffer
+
+
+class ResizeEngine:
+    """Движок изменения размера с автоматическим выбором пресета"""
+
+    PRESETS = ('fast', 'balanced', 'quality', 'pyramid')
+
+    # Интерполяция пресетов (качественный пресет зависит от направления)
+    INTERPOLATION = {
+        'fast': cv2.INTER_NEAREST,
+        'balanced': cv2.INTER_LINEAR
+    }
+
+    # Уменьшение сильнее этого коэффициента выполняется пирамидой:
+    # INTER_AREA на больших коэффициентах медленный, а линейная
+    # интерполяция дает алиасинг
+    PYRAMID_SCALE_THRESHOLD = 0.5
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.last_preset = None
+
+    @staticmethod
+    def scale_factor(src_size, dst_size):
+        """
+        Коэффициент масштабирования (минимальный по осям)
+
+        Args:
+            src_size: (ширина, высота) исходного изображения
+            dst_size: (ширина, высота) результата
+
+        Returns:
+            Коэффициент (< 1 - уменьшение, > 1 - увеличение)
+        """
+
+        return min(dst_size[0] / src_size[0], dst_size[1] / src_size[1])
+
+    def choose_preset(self, src_size, dst_size):
+        """
+        Выбор пресета по коэффициенту масштабирования
+
+        Args:
+            src_size: (ширина, высота) исходного изображения
+            dst_size: (ширина, высота) результата
+
+        Returns:
+            Название пресета
+        """
+
+        scale = self.scale_factor(src_size, dst_size)
+
+        if scale < self.PYRAMID_SCALE_THRESHOLD:
+            return 'pyramid'
+
+        if scale < 1.0:
+            return 'quality'
+
+        return 'balanced'
+
+    def supports_packing(self, preset, src_size, dst_size):
+        """
+        Можно ли обрабатывать кадры пакета, упакованные в каналы
+        одного изображения
+
+        INTER_AREA при уменьшении поддерживает не более четырех
+        каналов, а точное уменьшение вдвое выполняется отдельной
+        реализацией только для 1, 3 и 4 каналов - результат
+        упакованного изображения отличался бы от поэлементного.
+
+        Args:
+            preset: Название пресета (кроме 'auto')
+            src_size: (ширина, высота) исходного изображения
+            dst_size: (ширина, высота) результата
+
+        Returns:
+            True, если результат не зависит от числа каналов
+        """
+
+        if preset == 'pyramid':
+            return False
+
+        if preset == 'quality' and self.scale_factor(src_size, dst_size) < 1.0:
+            return False
+
+        if preset == 'balanced' and (src_size[0], src_size[1]) == (2 * dst_size[0], 2 * dst_size[1]):
+            return False
+
+        return True
+
+    def resize(self, image, new_width, new_height, preset='auto', out=None):
+        """
+        Изменение размера изображения
+
+        Args:
+            image: Исходное изображение
+            new_width: Новая ширина
+            new_height: Новая высота
+            preset: 'auto', 'fast', 'balanced', 'quality' или 'pyramid'
+            out: Буфер результата new_height x new_width (в том числе
+                 представление области большего изображения)
+
+        Returns:
+            Изображение с измененным размером
+        """
+
+        height, width = image.shape[:2]
+        src_size = (width, height)
+        dst_size = (new_width, new_height)
+
+        if preset == 'auto':
+            preset = self.choose_preset(src_size, dst_size)
+        elif preset not in self.PRESETS:
+            raise ValueError(f"Неизвестный пресет изменения размера: {preset}")
+
+        self.last_preset = preset
+
+        if out is not None:
+            output_buffer(out, (new_height, new_width) + image.shape[2:], image.dtype)
+
+        if preset == 'pyramid':
+            return self._resize_pyramid(image, dst_size, out)
+
+        return cv2.resize(image, dst_size, dst=out,
+                          interpolation=self.interpolation_for(preset, src_size, dst_size))
+
+    def interpolation_for(self, preset, src_size, dst_size):
+        """
+        Флаг интерполяции OpenCV для пресета
+
+        Args:
+            preset: Название пресета (кроме 'pyramid')
+            src_size: (ширина, высота) исходного изображения
+            dst_size: (ширина, высота) результата
+
+        Returns:
+            Константа cv2.INTER_*
+        """
+
+        if preset == 'quality':
+            if self.scale_factor(src_size, dst_size) < 1.0:
+                return cv2.INTER_AREA
+            return cv2.INTER_LANCZOS4
+
+        return self.INTERPOLATION[preset]
+
+    @staticmethod
+    def _resize_pyramid(image, dst_size, out=None):
+        """Уменьшение вдвое через pyrDown, пока размер не меньше целевого, затем INTER_AREA"""
+
+        new_width, new_height = dst_size
+        result = image
+
+        while (result.shape[1] // 2 >= new_width and result.shape[0] // 2 >= new_height
+               and min(result.shape[:2]) > 1):
+            result = cv2.pyrDown(result)
+
+        if (result.shape[1], result.shape[0]) == dst_size:
+            if out is None:
+                return result
+            np.copyto(out, result)
+            return out
+
+        return cv2.resize(result, dst_size, dst=out, interpolation=cv2.INTER_AREA)
+
+    def benchmark(self, image, new_width, new_height, presets=PRESETS, repeats=5):
+        """
+        Замер пропускной способности пресетов
+
+        Args:
+            image: Исходное изображение
+            new_width: Новая ширина
+            new_height: Новая высота
+            presets: Проверяемые пресеты
+            repeats: Количество повторов (берется лучшее время)
+
+        Returns:
+            Список словарей с ключами 'preset', 'time_ms' и
+            'megapixels_per_second' (по исходному изображению)
+        """
+
+        megapixels = image.shape[0] * image.shape[1] / 1e6
+        results = []
+
+        for preset in presets:
+            best_ns = None
+            for _ in range(max(1, repeats)):
+                start_ns = time.perf_counter_ns()
+                self.resize(image, new_width, new_height, preset)
+                elapsed_ns = time.perf_counter_ns() - start_ns
+                best_ns = elapsed_ns if best_ns is None else min(best_ns, elapsed_ns)
+
+            seconds = max(best_ns, 1) / 1e9
+            results.append({
+                'preset': preset,
+                'time_ms': seconds * 1000.0,
+                'megapixels_per_second': megapixels / seconds
+            })
+
+        return results
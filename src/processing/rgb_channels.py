@@ -8,18 +8,24 @@
 import cv2
 import numpy as np
 
+from .buffer_pool import output_buffer
+
 
 class RGBProcessor:
     """Класс для работы с RGB каналами"""
     
+    # Индексы каналов в порядке BGR (OpenCV)
+    CHANNEL_INDEX = {'blue': 0, 'green': 1, 'red': 2}
+    
     @staticmethod
-    def extract_channel(image, channel):
+    def extract_channel(image, channel, out=None):
         """
         Извлечение отдельного цветового канала
         
         Args:
             image: Исходное изображение
             channel: Канал ('red', 'green', 'blue')
+            out: Буфер результата той же формы и типа
             
         Returns:
             Изображение с выделенным каналом
@@ -28,27 +34,18 @@ class RGBProcessor:
         if image is None or len(image.shape) != 3:
             return image
         
-        # Создание черного изображения
-        result = np.zeros_like(image)
-        
-        # Копирование нужного канала
-        if channel == 'red':
-            result[:, :, 2] = image[:, :, 2]
-        elif channel == 'green':
-            result[:, :, 1] = image[:, :, 1]
-        elif channel == 'blue':
-            result[:, :, 0] = image[:, :, 0]
-        
-        return result
+        return RGBProcessor._copy_channel(image, channel, out)
     
     @staticmethod
-    def get_channel_grayscale(image, channel):
+    def get_channel_grayscale(image, channel, out=None):
         """
         Получение канала в оттенках серого
         
         Args:
             image: Исходное изображение
             channel: Канал ('red', 'green', 'blue')
+            out: Непрерывный буфер HxW для копии канала
+                 (без него возвращается представление исходного массива)
             
         Returns:
             Канал в оттенках серого
@@ -57,17 +54,19 @@ class RGBProcessor:
         if image is None or len(image.shape) != 3:
             return image
         
-        if channel == 'red':
-            return image[:, :, 2]
-        elif channel == 'green':
-            return image[:, :, 1]
-        elif channel == 'blue':
-            return image[:, :, 0]
+        channel_index = RGBProcessor.CHANNEL_INDEX.get(channel)
+        if channel_index is None:
+            return image
+        
+        gray = image[:, :, channel_index]
+        if out is None:
+            return gray
         
-        return image
+        np.copyto(output_buffer(out, gray.shape, gray.dtype), gray)
+        return out
     
     @staticmethod
-    def merge_channels(red, green, blue):
+    def merge_channels(red, green, blue, out=None):
         """
         Объединение каналов в RGB изображение
         
@@ -75,9 +74,52 @@ class RGBProcessor:
             red: Красный канал
             green: Зеленый канал
             blue: Синий канал
+            out: Буфер результата HxWx3
             
         Returns:
             RGB изображение
         """
         
-        return cv2.merge([blue, green, red])
\ No newline at end of file
+        if out is not None:
+            output_buffer(out, blue.shape[:2] + (3,), blue.dtype)
+        
+        return cv2.merge([blue, green, red], dst=out)
+    
+    @staticmethod
+    def extract_channel_batch(images, channel, out=None):
+        """
+        Извлечение цветового канала для пакета изображений
+        
+        Args:
+            images: Пакет изображений NxHxWxC
+            channel: Канал ('red', 'green', 'blue')
+            out: Буфер результата той же формы и типа
+            
+        Returns:
+            Пакет изображений с выделенным каналом
+        """
+        
+        if images is None or images.ndim != 4:
+            return images
+        
+        # Одно выделение под весь пакет (или ни одного, если передан out)
+        return RGBProcessor._copy_channel(images, channel, out)
+    
+    @staticmethod
+    def _copy_channel(images, channel, out=None):
+        """Черный буфер с копией одного канала (последняя ось - каналы)"""
+        
+        if out is None:
+            # Создание черного изображения
+            result = np.zeros_like(images)
+        else:
+            result = output_buffer(out, images.shape, images.dtype)
+            result.fill(0)
+        
+        # Копирование нужного канала
+        channel_index = RGBProcessor.CHANNEL_INDEX.get(channel)
+        if channel_index is not None:
+            result[..., channel_index] = images[..., channel_index]
+        
+        return result
+
@@ -0,0 +1,139 @@
+"""
+Модуль областей интереса (ROI)
+
+Содержит класс ImageROI - область родительского изображения,
+которая хранит ссылку на родительский буфер и смещения вместо
+копии пикселей. Копирование выполняется только явно.
+"""
+
+import numpy as np
+
+from .image_store import ImageHandle, export_array
+
+
+class ImageROI:
+    """Область интереса родительского изображения без копирования пикселей"""
+
+    def __init__(self, parent, x, y, width, height):
+        if isinstance(parent, ImageHandle):
+            parent = parent.array
+
+        # Вложенная область ссылается сразу на корневой буфер
+        if isinstance(parent, ImageROI):
+            x += parent.x
+            y += parent.y
+            parent = parent.parent
+
+        parent_height, parent_width = parent.shape[:2]
+
+        if width <= 0 or height <= 0:
+            raise ValueError("Ширина и высота должны быть положительными")
+
+        if x < 0 or y < 0 or x + width > parent_width or y + height > parent_height:
+            raise ValueError("Область выходит за пределы изображения")
+
+        self.parent = parent
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def shape(self):
+        """Форма области (как у numpy массива)"""
+
+        return (self.height, self.width) + self.parent.shape[2:]
+
+    @property
+    def ndim(self):
+        return self.parent.ndim
+
+    @property
+    def dtype(self):
+        return self.parent.dtype
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.size * self.parent.itemsize
+
+    @property
+    def array(self):
+        """
+        Представление области в родительском буфере (только для чтения)
+
+        Запись через представление запрещена, чтобы операции
+        не изменяли родительское изображение.
+        """
+
+        view = self.parent[self.y:self.y + self.height, self.x:self.x + self.width]
+        view.flags.writeable = False
+        return view
+
+    def materialize(self):
+        """
+        Копирование области в собственный непрерывный буфер
+
+        Returns:
+            Непрерывный numpy массив, доступный для записи
+        """
+
+        return np.array(self.array, copy=True, order='C')
+
+    def __array__(self, dtype=None, copy=None):
+        return export_array(self.array, dtype, copy)
+
+    def __repr__(self):
+        return (f"ImageROI(x={self.x}, y={self.y}, width={self.width}, "
+                f"height={self.height}, parent_shape={self.parent.shape})")
+
+
+def as_array(image):
+    """
+    Получение numpy представления изображения без копирования
+
+    Args:
+        image: numpy массив, ImageROI или ImageHandle
+
+    Returns:
+        Представление изображения, доступное только для чтения
+    """
+
+    if isinstance(image, (ImageROI, ImageHandle)):
+        return image.array
+
+    if isinstance(image, np.ndarray):
+        view = image.view()
+        view.flags.writeable = False
+        return view
+
+    return image
+
+
+def materialize(image):
+    """
+    Получение непрерывного изображения с собственным буфером
+
+    Копирование выполняется только для областей интереса
+    и несмежных представлений.
+
+    Args:
+        image: numpy массив, ImageROI или ImageHandle
+
+    Returns:
+        Непрерывный numpy массив
+    """
+
+    if isinstance(image, ImageROI):
+        return image.materialize()
+
+    if isinstance(image, ImageHandle):
+        image = image.array
+
+    if isinstance(image, np.ndarray) and not image.flags.c_contiguous:
+        return np.ascontiguousarray(image)
+
+    return image
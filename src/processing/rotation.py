@@ -0,0 +1,201 @@
+"""
+Модуль поворота изображений
+
+Содержит движок поворота с быстрым путем без потерь для
+прямых углов и кэшем матриц и таблиц переназначения для
+повторяющихся поворотов (например, в видеопотоке с камеры).
+"""
+
+import math
+import logging
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from .buffer_pool import output_buffer, output_copy
+
+
+class RotationEngine:
+    """Движок поворота изображений с кэшированием преобразований"""
+
+    # Прямые углы (против часовой стрелки, как в cv2.getRotationMatrix2D)
+    RIGHT_ANGLE_CODES = {
+        90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+        180: cv2.ROTATE_180,
+        270: cv2.ROTATE_90_CLOCKWISE
+    }
+
+    # Таблицы переназначения строятся только для кадров до этого размера:
+    # для больших изображений таблицы занимают слишком много памяти
+    REMAP_MAX_PIXELS = 2_000_000
+
+    def __init__(self, cache_size=16):
+        self.logger = logging.getLogger(__name__)
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def rotate(self, image, angle, expand=False, interpolation=cv2.INTER_LINEAR, out=None):
+        """
+        Поворот изображения
+
+        Args:
+            image: Исходное изображение
+            angle: Угол поворота в градусах (против часовой стрелки)
+            expand: Расширить холст, чтобы углы изображения не обрезались
+            interpolation: Интерполяция для произвольных углов
+            out: Буфер результата (для 90° и 270° ширина и высота
+                 меняются местами, при expand - размер расширенного холста)
+
+        Returns:
+            Повернутое изображение
+        """
+
+        normalized = self.normalize_angle(angle)
+        height, width = image.shape[:2]
+
+        if normalized == 0:
+            return output_copy(image, out)
+
+        # Прямые углы: перестановка пикселей без интерполяции и размытия
+        code = self.RIGHT_ANGLE_CODES.get(normalized)
+        if code is not None:
+            if out is not None:
+                size = (height, width) if normalized == 180 else (width, height)
+                output_buffer(out, size + image.shape[2:], image.dtype)
+            return cv2.rotate(image, code, dst=out)
+
+        transform = self.get_transform(width, height, normalized, expand)
+
+        if out is not None:
+            out_width, out_height = transform['size']
+            output_buffer(out, (out_height, out_width) + image.shape[2:], image.dtype)
+
+        if transform['maps'] is not None:
+            map1, map2 = transform['maps']
+            return cv2.remap(image, map1, map2, interpolation, dst=out)
+
+        return cv2.warpAffine(image, transform['matrix'], transform['size'],
+                              dst=out, flags=interpolation)
+
+    @staticmethod
+    def normalize_angle(angle):
+        """
+        Приведение угла к диапазону [0, 360)
+
+        Целые значения возвращаются как int, чтобы прямые углы
+        распознавались независимо от типа аргумента.
+        """
+
+        normalized = angle % 360
+        if float(normalized).is_integer():
+            return int(normalized)
+        return normalized
+
+    def get_transform(self, width, height, angle, expand=False):
+        """
+        Получение кэшированного преобразования поворота
+
+        Args:
+            width: Ширина изображения
+            height: Высота изображения
+            angle: Нормализованный угол поворота
+            expand: Расширенный холст
+
+        Returns:
+            Словарь с ключами 'matrix', 'size' и 'maps'
+            ('maps' равно None для больших изображений)
+        """
+
+        key = (width, height, angle, expand)
+
+        transform = self._cache.get(key)
+        if transform is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return transform
+
+        self.cache_misses += 1
+
+        matrix, size = self.build_matrix(width, height, angle, expand)
+        maps = None
+
+        out_width, out_height = size
+        if out_width * out_height <= self.REMAP_MAX_PIXELS:
+            maps = self.build_remap_tables(matrix, size)
+
+        transform = {'matrix': matrix, 'size': size, 'maps': maps}
+
+        self._cache[key] = transform
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return transform
+
+    @staticmethod
+    def build_matrix(width, height, angle, expand=False):
+        """
+        Построение матрицы поворота
+
+        Args:
+            width: Ширина изображения
+            height: Высота изображения
+            angle: Угол поворота в градусах
+            expand: Расширить холст под повернутое изображение
+
+        Returns:
+            Кортеж (матрица 2x3, (ширина, высота) результата)
+        """
+
+        center = (width // 2, height // 2)
+        matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+
+        if not expand:
+            return matrix, (width, height)
+
+        cos = abs(matrix[0, 0])
+        sin = abs(matrix[0, 1])
+
+        out_width = int(math.ceil(height * sin + width * cos))
+        out_height = int(math.ceil(height * cos + width * sin))
+
+        # Сдвиг центра в центр нового холста
+        matrix[0, 2] += out_width / 2.0 - center[0]
+        matrix[1, 2] += out_height / 2.0 - center[1]
+
+        return matrix, (out_width, out_height)
+
+    @staticmethod
+    def build_remap_tables(matrix, size):
+        """
+        Построение таблиц переназначения для cv2.remap
+
+        Args:
+            matrix: Прямая матрица поворота 2x3
+            size: (ширина, высота) результата
+
+        Returns:
+            Пара таблиц в формате с фиксированной точкой (CV_16SC2, CV_16UC1)
+        """
+
+        out_width, out_height = size
+        inverse = cv2.invertAffineTransform(matrix)
+
+        xs = np.arange(out_width, dtype=np.float32)
+        ys = np.arange(out_height, dtype=np.float32)[:, np.newaxis]
+
+        map_x = (inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]).astype(np.float32)
+        map_y = (inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]).astype(np.float32)
+
+        return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+
+    def clear_cache(self):
+        """Очистка кэша преобразований"""
+
+        self._cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
@@ -0,0 +1,316 @@
+"""
+Модуль статистики цветовых каналов
+
+Содержит расчет гистограмм, среднего, стандартного отклонения
+и минимума/максимума по каналам, а также фоновый поток для
+расчета статистики без снижения частоты кадров.
+"""
+
+import logging
+import threading
+
+import cv2
+import numpy as np
+
+from utils.profiler import profiled
+from .roi import as_array
+from .image_store import image_generation
+
+
+class ChannelStatistics:
+    """Класс для расчета статистики по каналам изображения"""
+
+    # Имена каналов в порядке BGR (OpenCV)
+    COLOR_CHANNELS = ('blue', 'green', 'red')
+    GRAY_CHANNELS = ('gray',)
+
+    # Число пикселей полосы при точном расчете гистограмм
+    HISTOGRAM_CHUNK_PIXELS = 1 << 20
+
+    def __init__(self, subsample_step=4):
+        self.subsample_step = max(1, int(subsample_step))
+
+        # Точные гистограммы последнего изображения для инкрементных обновлений;
+        # изображение определяется номером поколения хранилища, а не ссылкой,
+        # чтобы кэш не удерживал пиксели
+        self._source_generation = None
+        self._histograms = None
+
+    @staticmethod
+    def channel_names(image):
+        """
+        Имена каналов изображения
+
+        Args:
+            image: Изображение
+
+        Returns:
+            Кортеж имен каналов
+        """
+
+        if image.ndim == 3 and image.shape[2] == 3:
+            return ChannelStatistics.COLOR_CHANNELS
+
+        if image.ndim == 2:
+            return ChannelStatistics.GRAY_CHANNELS
+
+        return tuple(f"channel_{i}" for i in range(image.shape[2]))
+
+    @staticmethod
+    def exact_histograms(image):
+        """
+        Точные гистограммы каналов через np.bincount
+
+        Args:
+            image: 8-битное изображение HxW или HxWxC
+
+        Returns:
+            Массив Cx256 (int64) с количеством пикселей каждого уровня
+        """
+
+        planes = image[:, :, np.newaxis] if image.ndim == 2 else image
+        channels = planes.shape[2]
+
+        # np.bincount приводит значения к intp (8 байт на пиксель), поэтому
+        # большое изображение обрабатывается полосами ограниченного размера
+        rows = max(1, ChannelStatistics.HISTOGRAM_CHUNK_PIXELS // max(1, planes.shape[1]))
+
+        histograms = np.zeros((channels, 256), dtype=np.int64)
+        for start in range(0, planes.shape[0], rows):
+            strip = planes[start:start + rows]
+            for c in range(channels):
+                histograms[c] += np.bincount(strip[:, :, c].ravel(), minlength=256)
+
+        return histograms
+
+    @staticmethod
+    def sampled_histograms(image, step):
+        """
+        Приближенные гистограммы по разреженной сетке через cv2.calcHist
+
+        Args:
+            image: 8-битное изображение HxW или HxWxC
+            step: Шаг сетки выборки по обеим осям
+
+        Returns:
+            Массив Cx256 (int64) с количеством выбранных пикселей
+        """
+
+        sample = np.ascontiguousarray(image[::step, ::step])
+        channels = 1 if sample.ndim == 2 else sample.shape[2]
+
+        histograms = np.empty((channels, 256), dtype=np.int64)
+        for c in range(channels):
+            histograms[c] = cv2.calcHist([sample], [c], None, [256], [0, 256]).ravel()
+
+        return histograms
+
+    @staticmethod
+    def summarize(histograms, names):
+        """
+        Расчет статистики каналов по гистограммам
+
+        Args:
+            histograms: Массив Cx256 гистограмм
+            names: Имена каналов
+
+        Returns:
+            Словарь {канал: {'histogram', 'mean', 'std', 'min', 'max'}}
+        """
+
+        levels = np.arange(256, dtype=np.float64)
+        result = {}
+
+        for name, histogram in zip(names, histograms):
+            count = histogram.sum()
+            if count == 0:
+                result[name] = {'histogram': histogram, 'mean': 0.0, 'std': 0.0,
+                                'min': 0, 'max': 0}
+                continue
+
+            mean = float(np.dot(histogram, levels) / count)
+            variance = float(np.dot(histogram, levels * levels) / count) - mean * mean
+            nonzero = np.flatnonzero(histogram)
+
+            result[name] = {
+                'histogram': histogram,
+                'mean': mean,
+                'std': float(np.sqrt(max(variance, 0.0))),
+                'min': int(nonzero[0]),
+                'max': int(nonzero[-1])
+            }
+
+        return result
+
+    @profiled()
+    def compute(self, image, exact=False):
+        """
+        Расчет статистики по всему изображению
+
+        Args:
+            image: 8-битное изображение
+            exact: True - точный расчет по всем пикселям,
+                   False - по сетке с шагом subsample_step
+
+        Returns:
+            Словарь с ключами 'exact', 'step', 'pixel_count', 'channels'
+        """
+
+        source = image
+        image = as_array(image)
+        self._validate(image)
+
+        if exact or self.subsample_step == 1:
+            histograms = self.exact_histograms(image)
+            self._source_generation = image_generation(source)
+            self._histograms = histograms.copy()
+            step = 1
+        else:
+            histograms = self.sampled_histograms(image, self.subsample_step)
+            step = self.subsample_step
+
+        return self._build_result(image, histograms, step)
+
+    @profiled()
+    def update_region(self, image, base_image, x, y, width, height):
+        """
+        Инкрементное обновление статистики после изменения области
+
+        Из гистограмм вычитается вклад области базового изображения
+        и добавляется вклад той же области нового изображения.
+        Если точная статистика базового изображения неизвестна,
+        выполняется полный точный расчет.
+
+        Args:
+            image: Новое изображение (numpy массив, ImageROI или ImageHandle)
+            base_image: ImageHandle изображения, из которого получено новое
+                        (для массивов без поколения - полный расчет)
+            x, y: Левый верхний угол измененной области
+            width, height: Размер измененной области
+
+        Returns:
+            Словарь статистики (как в compute с exact=True)
+        """
+
+        generation = image_generation(base_image)
+        if (generation is None or generation != self._source_generation
+                or base_image.shape != image.shape):
+            return self.compute(image, exact=True)
+
+        source = image
+        image = as_array(image)
+        base_image = as_array(base_image)
+        self._validate(image)
+
+        img_height, img_width = image.shape[:2]
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(img_width, x + width), min(img_height, y + height)
+
+        if x1 > x0 and y1 > y0:
+            self._histograms -= self.exact_histograms(base_image[y0:y1, x0:x1])
+            self._histograms += self.exact_histograms(image[y0:y1, x0:x1])
+
+        self._source_generation = image_generation(source)
+        return self._build_result(image, self._histograms.copy(), 1)
+
+    def _build_result(self, image, histograms, step):
+        """Формирование словаря результата"""
+
+        return {
+            'exact': step == 1,
+            'step': step,
+            'pixel_count': int(histograms[0].sum()),
+            'channels': self.summarize(histograms, self.channel_names(image))
+        }
+
+    @staticmethod
+    def _validate(image):
+        """Проверка поддерживаемого формата изображения"""
+
+        if image is None or image.size == 0 or image.ndim not in (2, 3):
+            raise ValueError("Невалидное изображение")
+
+        if image.dtype != np.uint8:
+            raise ValueError("Поддерживаются только 8-битные изображения")
+
+
+class StatisticsWorker(threading.Thread):
+    """
+    Фоновый поток расчета статистики каналов
+
+    Хранится только последний запрос: если кадры поступают быстрее,
+    чем считается статистика, промежуточные кадры пропускаются.
+    Результат передается в callback из потока расчета (например,
+    в emit Qt-сигнала, доставляемого в GUI поток).
+    """
+
+    def __init__(self, callback, subsample_step=4):
+        super().__init__(name="StatisticsWorker", daemon=True)
+
+        self.callback = callback
+        self.statistics = ChannelStatistics(subsample_step)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = None
+        self._running = True
+
+    def submit(self, image, exact=False, region=None, base_image=None):
+        """
+        Постановка изображения в очередь расчета
+
+        Args:
+            image: Изображение
+            exact: Требуется ли точный расчет
+            region: Измененная область (x, y, width, height) для
+                    инкрементного обновления
+            base_image: Изображение, из которого получено новое
+        """
+
+        if image is None:
+            return
+
+        with self._lock:
+            # Приближенный кадр не вытесняет ожидающий точный запрос
+            if self._pending is not None and self._pending[1] and not exact:
+                return
+            self._pending = (image, exact, region, base_image)
+
+        self._wakeup.set()
+
+    def run(self):
+        """Основной цикл потока"""
+
+        while self._running:
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+            with self._lock:
+                request, self._pending = self._pending, None
+
+            if request is None or not self._running:
+                continue
+
+            image, exact, region, base_image = request
+
+            try:
+                if region is not None:
+                    result = self.statistics.update_region(image, base_image, *region)
+                else:
+                    result = self.statistics.compute(image, exact=exact)
+
+                self.callback(result)
+
+            except Exception as e:
+                self.logger.error("Ошибка расчета статистики: %s", e)
+
+            # Изображения не удерживаются в памяти до следующего запроса
+            request = image = base_image = None
+
+    def stop(self):
+        """Остановка потока"""
+
+        self._running = False
+        self._wakeup.set()
+        self.join(timeout=1.0)
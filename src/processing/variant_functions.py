@@ -8,12 +8,28 @@
 import cv2
 import numpy as np
 
+from .rotation import RotationEngine
+from .blur import BlurEngine
+from .resize import ResizeEngine
+from .annotations import draw_rectangles
+from .buffer_pool import get_buffer_pool, output_buffer, output_copy
+
+
+# Общий движок поворота с кэшем преобразований
+_rotation_engine = RotationEngine()
+
+# Общий движок размытия с кэшем оценок ошибки
+_blur_engine = BlurEngine()
+
+# Общий движок изменения размера
+_resize_engine = ResizeEngine()
+
 
 class VariantProcessor:
     """Класс с функциями обработки для вариантов"""
     
     @staticmethod
-    def resize_image(image, new_width, new_height):
+    def resize_image(image, new_width, new_height, preset='auto', out=None):
         """
         Функция 1: Изменение размера изображения
         
@@ -21,41 +37,44 @@ class VariantProcessor:
             image: Исходное изображение
             new_width: Новая ширина
             new_height: Новая высота
+            preset: Пресет ('auto', 'fast', 'balanced', 'quality', 'pyramid')
+            out: Буфер результата new_height x new_width
             
         Returns:
             Изображение с измененным размером
         """
         
-        return cv2.resize(image, (new_width, new_height), 
-                         interpolation=cv2.INTER_LINEAR)
+        return _resize_engine.resize(image, new_width, new_height, preset, out=out)
     
     @staticmethod
-    def decrease_brightness(image, value):
+    def decrease_brightness(image, value, out=None):
         """
         Функция 8: Понижение яркости
         
         Args:
             image: Исходное изображение
             value: Значение понижения (0-100)
+            out: Буфер результата uint8 той же формы
             
         Returns:
             Изображение с пониженной яркостью
         """
         
-        # Преобразование в float для точных вычислений
-        result = image.astype(np.float32)
+        result = output_buffer(out, image.shape, np.uint8)
+        factor = np.float32(1.0 - (value / 100.0))
         
-        # Применение коэффициента яркости
-        factor = 1.0 - (value / 100.0)
-        result = result * factor
-        
-        # Ограничение значений и преобразование обратно
-        result = np.clip(result, 0, 255).astype(np.uint8)
+        # Вычисления в float во временном буфере из пула
+        with get_buffer_pool().borrowed(image.shape, np.float32) as scaled:
+            np.multiply(image, factor, out=scaled)
+            
+            # Ограничение значений и преобразование обратно
+            np.clip(scaled, 0, 255, out=scaled)
+            np.copyto(result, scaled, casting='unsafe')
         
         return result
     
     @staticmethod
-    def draw_blue_rectangle(image, top_left_x, top_left_y, width, height):
+    def draw_blue_rectangle(image, top_left_x, top_left_y, width, height, out=None):
         """
         Функция: Рисование синего прямоугольника
         
@@ -65,12 +84,13 @@ class VariantProcessor:
             top_left_y: Y координата верхнего левого угла
             width: Ширина прямоугольника
             height: Высота прямоугольника
+            out: Буфер результата той же формы (может совпадать с image)
             
         Returns:
             Изображение с нарисованным прямоугольником
         """
         
-        result = image.copy()
+        result = output_copy(image, out)
         
         # Синий цвет в BGR
         color = (120, 50, 0)
@@ -91,40 +111,53 @@ class VariantProcessor:
         return result
     
     @staticmethod
-    def rotate_image(image, angle):
+    def draw_rectangles(image, rectangles, colors=(120, 50, 0), thicknesses=3, out=None):
+        """
+        Функция: Рисование набора прямоугольников в один буфер
+        
+        Args:
+            image: Исходное изображение
+            rectangles: Массив Nx4 (x, y, ширина, высота)
+            colors: Один цвет BGR или массив Nx3
+            thicknesses: Одна толщина или массив из N значений
+            out: Буфер результата той же формы (может совпадать с image)
+            
+        Returns:
+            Изображение с нарисованными прямоугольниками
+        """
+        
+        return draw_rectangles(image, rectangles, colors, thicknesses, out=out)
+    
+    @staticmethod
+    def rotate_image(image, angle, expand=False, out=None):
         """
         Дополнительная функция: Поворот изображения
         
         Args:
             image: Исходное изображение
             angle: Угол поворота в градусах
+            expand: Расширить холст, чтобы углы не обрезались
+            out: Буфер результата повернутого размера
             
         Returns:
             Повернутое изображение
         """
         
-        height, width = image.shape[:2]
-        center = (width // 2, height // 2)
-        
-        # Матрица поворота
-        rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-        
-        # Поворот изображения
-        rotated = cv2.warpAffine(image, rotation_matrix, (width, height))
-        
-        return rotated
+        return _rotation_engine.rotate(image, angle, expand=expand, out=out)
     
     @staticmethod
-    def apply_blur(image, kernel_size=5):
+    def apply_blur(image, kernel_size=5, mode='auto', out=None):
         """
         Дополнительная функция: Размытие изображения
         
         Args:
             image: Исходное изображение
             kernel_size: Размер ядра размытия
+            mode: Режим размытия ('auto', 'exact', 'separable', 'box', 'pyramid')
+            out: Буфер результата той же формы и типа
             
         Returns:
             Размытое изображение
         """
         
-        return cv2.GaussianBlur(image, (kernel_size, kernel_size), 0)
\ No newline at end of file
+        return _blur_engine.blur(image, kernel_size, mode, out=out)
\ No newline at end of file
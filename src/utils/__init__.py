@@ -2,14 +2,40 @@
 Вспомогательные модули
 """
 
-from .file_handler import FileHandler
+import importlib
+
 from .validators import ImageValidator
-from .error_handler import ErrorHandler, setup_logging
+from .error_handler import ErrorHandler, setup_logging, shutdown_logging
+from .profiler import Profiler, get_profiler, profiled
+from .image_cache import DecodedImageCache, ImagePrefetcher
 
 __all__ = [
     'FileHandler',
+    'ThumbnailCache',
+    'DecodedImageCache',
+    'ImagePrefetcher',
     'ImageValidator',
     'ErrorHandler',
-    'setup_logging'
+    'setup_logging',
+    'shutdown_logging',
+    'Profiler',
+    'get_profiler',
+    'profiled'
 ]
 
+# Модули, тянущие за собой Qt и OpenCV, импортируются при первом обращении
+_LAZY_ATTRIBUTES = {
+    'FileHandler': '.file_handler',
+    'ThumbnailCache': '.thumbnail_cache'
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
@@ -8,21 +8,144 @@
 import logging
 import sys
 import os
+import time
+import queue
+import atexit
+import threading
 import platform
-import cv2
-from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
 from datetime import datetime
 from pathlib import Path
+from logging.handlers import QueueHandler, QueueListener
 
 
-def setup_logging(log_level=logging.INFO):
+# Слушатель очереди логов (фоновый поток записи)
+_log_listener = None
+
+# Обработчик корневого логгера, помещающий записи в очередь
+_queue_handler = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Обработчик, передающий записи в очередь без форматирования
+
+    Форматирование сообщения и запись на диск выполняются
+    в потоке QueueListener, а не в вызывающем (GUI) потоке.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Фильтр, схлопывающий повторяющиеся сообщения
+
+    Одинаковые записи (логгер, уровень, шаблон и текст аргументов)
+    в пределах интервала пропускаются один раз, остальные
+    подсчитываются и сообщаются при следующем пропуске записи или
+    при вызове flush(). Аргументы сравниваются по строковому
+    представлению: исключения, переданные в "%s", хэшируются по
+    идентичности, и повторы одной ошибки иначе не схлопывались бы.
+    """
+
+    def __init__(self, interval=5.0, max_keys=1024):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # ключ -> [время последнего пропуска, число подавленных, последняя подавленная запись]
+        self._entries = {}
+
+    @staticmethod
+    def make_key(record):
+        """Ключ схлопывания записи"""
+
+        args = record.args
+        if isinstance(args, tuple):
+            args = tuple(str(arg) for arg in args)
+        elif args is not None:
+            args = str(args)
+
+        return (record.name, record.levelno, str(record.msg), args)
+
+    def filter(self, record):
+        try:
+            key = self.make_key(record)
+        except Exception:
+            return True
+
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                entry[2] = record
+                return False
+
+            suppressed = entry[1] if entry is not None else 0
+            self._entries[key] = [now, 0, None]
+
+            if len(self._entries) > self.max_keys:
+                self._prune(now)
+
+        if suppressed:
+            record.msg = f"{record.msg} [повторов подавлено: {suppressed}]"
+
+        return True
+
+    def _prune(self, now):
+        """Удаление устаревших ключей"""
+
+        expired = [key for key, (last, count, _) in self._entries.items()
+                   if now - last >= self.interval and count == 0]
+        for key in expired:
+            del self._entries[key]
+
+    def flush(self):
+        """
+        Итоговые записи о подавленных повторах
+
+        Счетчики сбрасываются, поэтому каждый повтор сообщается один раз.
+
+        Returns:
+            Список записей (последняя подавленная запись каждого ключа
+            с числом повторов в тексте)
+        """
+
+        records = []
+
+        with self._lock:
+            for entry in self._entries.values():
+                count, record = entry[1], entry[2]
+                if count:
+                    record.msg = f"{record.msg} [повторов подавлено: {count}]"
+                    records.append(record)
+                entry[1], entry[2] = 0, None
+
+        return records
+
+
+def setup_logging(log_level=logging.INFO, rate_limit_interval=5.0):
     """
     Настройка системы логирования
     
+    Записи передаются через очередь в фоновый поток QueueListener,
+    который выполняет форматирование и запись в файл и консоль.
+    
     Args:
         log_level: Уровень логирования
+        rate_limit_interval: Интервал схлопывания повторяющихся сообщений (сек)
     """
     
+    global _log_listener, _queue_handler
+    
+    if _log_listener is not None:
+        logging.getLogger().setLevel(log_level)
+        return
+    
     # Создание директории для логов
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
@@ -33,19 +156,29 @@ def setup_logging(log_level=logging.INFO):
     # Формат логирования
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     date_format = '%Y-%m-%d %H:%M:%S'
+    formatter = logging.Formatter(log_format, datefmt=date_format)
     
-    # Настройка корневого логгера
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            # Вывод в файл
-            logging.FileHandler(log_filename, encoding='utf-8'),
-            # Вывод в консоль
-            logging.StreamHandler(sys.stdout)
-        ]
+    # Обработчики вывода работают в потоке слушателя
+    file_handler = logging.FileHandler(log_filename, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(
+        log_queue, file_handler, console_handler,
+        respect_handler_level=True
     )
+    _log_listener.start()
+    atexit.register(shutdown_logging)
+    
+    # Корневой логгер только помещает записи в очередь
+    _queue_handler = DeferredQueueHandler(log_queue)
+    _queue_handler.addFilter(RateLimitFilter(rate_limit_interval))
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(_queue_handler)
     
     # Отключение логов от matplotlib и других библиотек
     logging.getLogger('matplotlib').setLevel(logging.WARNING)
@@ -55,6 +188,32 @@ def setup_logging(log_level=logging.INFO):
     logger.info("Система логирования инициализирована")
 
 
+def shutdown_logging():
+    """Остановка фонового потока логирования с записью оставшихся сообщений"""
+    
+    global _log_listener, _queue_handler
+    
+    if _log_listener is None:
+        return
+    
+    # Обработчик отключается первым: после остановки слушателя
+    # очередь никто не читает
+    logging.getLogger().removeHandler(_queue_handler)
+    
+    # Итоги последних серий повторов, иначе они теряются
+    for log_filter in _queue_handler.filters:
+        if isinstance(log_filter, RateLimitFilter):
+            for record in log_filter.flush():
+                _queue_handler.enqueue(record)
+    
+    _log_listener.stop()
+    for handler in _log_listener.handlers:
+        handler.close()
+    _log_listener = None
+    _queue_handler.close()
+    _queue_handler = None
+
+
 class ErrorHandler:
     """Класс для централизованной обработки ошибок"""
     
@@ -147,6 +306,10 @@ class ErrorHandler:
         """Логирование информации о системе"""
         
         try:
+            # Импорт выполняется только при запросе информации о системе
+            import cv2
+            from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+            
             info = {
                 'Python': platform.python_version(),
                 'Platform': platform.platform(),
@@ -157,10 +320,10 @@ class ErrorHandler:
             
             self.logger.info("Информация о системе:")
             for key, value in info.items():
-                self.logger.info(f"  {key}: {value}")
+                self.logger.info("  %s: %s", key, value)
                 
         except Exception as e:
-            self.logger.warning(f"Не удалось получить информацию о системе: {e}")
+            self.logger.warning("Не удалось получить информацию о системе: %s", e)
     
     def get_error_statistics(self):
         """
@@ -220,7 +383,7 @@ class ErrorHandler:
                     f.write(f"Критическая: {'Да' if error['critical'] else 'Нет'}\n")
                     f.write("-" * 50 + "\n")
             
-            self.logger.info(f"Отчет об ошибках сохранен: {filepath}")
+            self.logger.info("Отчет об ошибках сохранен: %s", filepath)
             
         except Exception as e:
-            self.logger.error(f"Ошибка сохранения отчета: {e}")
+            self.logger.error("Ошибка сохранения отчета: %s", e)
@@ -11,13 +11,24 @@ import logging
 from pathlib import Path
 from PyQt5.QtWidgets import QFileDialog
 
+from processing.roi import materialize
+
 
 class FileHandler:
     """Класс для работы с файлами изображений"""
     
-    def __init__(self):
+    def __init__(self, thumbnail_cache=None, image_cache=None):
         self.logger = logging.getLogger(__name__)
         
+        # Дисковый кэш превью (ThumbnailCache или None)
+        self.thumbnail_cache = thumbnail_cache
+        
+        # Кэш декодированных изображений в памяти (DecodedImageCache или None)
+        self.image_cache = image_cache
+        
+        # Список изображений последнего каталога: (каталог, mtime каталога, файлы)
+        self._directory_listing = None
+        
         # Поддерживаемые форматы
         self.supported_formats = {
             'images': ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.tif'],
@@ -52,7 +63,7 @@ class FileHandler:
             return file_path
             
         except Exception as e:
-            self.logger.error(f"Ошибка открытия диалога: {str(e)}")
+            self.logger.error("Ошибка открытия диалога: %s", e)
             return ""
     
     def save_file_dialog(self, parent=None):
@@ -98,7 +109,7 @@ class FileHandler:
             return file_path
             
         except Exception as e:
-            self.logger.error(f"Ошибка диалога сохранения: {str(e)}")
+            self.logger.error("Ошибка диалога сохранения: %s", e)
             return ""
     
     def load_image(self, file_path):
@@ -116,6 +127,12 @@ class FileHandler:
             if not file_path or not os.path.exists(file_path):
                 raise FileNotFoundError(f"Файл не найден: {file_path}")
             
+            if self.image_cache is not None:
+                image = self.image_cache.get(file_path)
+                if image is not None:
+                    self.logger.info("Изображение загружено из кэша: %s", file_path)
+                    return image
+            
             # Загрузка изображения
             # cv2.IMREAD_UNCHANGED сохраняет альфа-канал если есть
             image = cv2.imread(file_path, cv2.IMREAD_UNCHANGED)
@@ -127,13 +144,95 @@ class FileHandler:
             if len(image.shape) == 3 and image.shape[2] == 4:
                 image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
             
-            self.logger.info(f"Изображение загружено: {file_path}")
+            # Превью для быстрого повторного открытия
+            if self.thumbnail_cache is not None and not self.thumbnail_cache.contains(file_path):
+                self.thumbnail_cache.put(file_path, image)
+            
+            if self.image_cache is not None:
+                self.image_cache.put(file_path, image)
+            
+            self.logger.info("Изображение загружено: %s", file_path)
             return image
             
         except Exception as e:
-            self.logger.error(f"Ошибка загрузки изображения: {str(e)}")
+            self.logger.error("Ошибка загрузки изображения: %s", e)
             return None
     
+    def list_directory_images(self, directory):
+        """
+        Список файлов изображений каталога в порядке имен
+        
+        Результат кэшируется до изменения каталога.
+        
+        Args:
+            directory: Путь к каталогу
+            
+        Returns:
+            Список полных путей к изображениям
+        """
+        
+        try:
+            directory = os.path.abspath(directory)
+            mtime = os.stat(directory).st_mtime_ns
+            
+            if (self._directory_listing is not None
+                    and self._directory_listing[:2] == (directory, mtime)):
+                return self._directory_listing[2]
+            
+            extensions = {pattern[1:] for pattern in self.supported_formats['images']}
+            with os.scandir(directory) as entries:
+                files = sorted(
+                    (entry.path for entry in entries
+                     if entry.is_file() and Path(entry.name).suffix.lower() in extensions),
+                    key=lambda path: os.path.basename(path).lower()
+                )
+            
+            self._directory_listing = (directory, mtime, files)
+            return files
+            
+        except OSError as e:
+            self.logger.error("Ошибка чтения каталога: %s", e)
+            return []
+    
+    def get_neighbor_files(self, file_path):
+        """
+        Предыдущий и следующий файлы изображений того же каталога
+        
+        Args:
+            file_path: Путь к текущему файлу
+            
+        Returns:
+            Кортеж (предыдущий путь или None, следующий путь или None)
+        """
+        
+        files = self.list_directory_images(os.path.dirname(os.path.abspath(file_path)))
+        
+        try:
+            index = files.index(os.path.abspath(file_path))
+        except ValueError:
+            return None, None
+        
+        previous_file = files[index - 1] if index > 0 else None
+        next_file = files[index + 1] if index + 1 < len(files) else None
+        
+        return previous_file, next_file
+    
+    def load_preview(self, file_path):
+        """
+        Получение превью файла из дискового кэша
+        
+        Args:
+            file_path: Путь к файлу
+            
+        Returns:
+            Кортеж (превью, метаданные) или None, если превью нет
+        """
+        
+        if self.thumbnail_cache is None or not file_path:
+            return None
+        
+        return self.thumbnail_cache.get(file_path)
+    
     def save_image(self, image, file_path):
         """
         Сохранение изображения в файл
@@ -153,6 +252,9 @@ class FileHandler:
             if not file_path:
                 raise ValueError("Не указан путь для сохранения")
             
+            # Области интереса копируются в непрерывный буфер только при сохранении
+            image = materialize(image)
+            
             # Создание директории если не существует
             directory = os.path.dirname(file_path)
             if directory and not os.path.exists(directory):
@@ -176,11 +278,11 @@ class FileHandler:
             if not success:
                 raise RuntimeError("cv2.imwrite вернул False")
             
-            self.logger.info(f"Изображение сохранено: {file_path}")
+            self.logger.info("Изображение сохранено: %s", file_path)
             return True
             
         except Exception as e:
-            self.logger.error(f"Ошибка сохранения изображения: {str(e)}")
+            self.logger.error("Ошибка сохранения изображения: %s", e)
             return False
     
     def get_file_info(self, file_path):
@@ -224,7 +326,7 @@ class FileHandler:
             return info
             
         except Exception as e:
-            self.logger.error(f"Ошибка получения информации о файле: {str(e)}")
+            self.logger.error("Ошибка получения информации о файле: %s", e)
             return None
     
     def validate_image_file(self, file_path):
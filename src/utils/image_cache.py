@@ -0,0 +1,181 @@
+"""
+Модуль кэша декодированных изображений
+
+Содержит LRU кэш декодированных изображений в памяти,
+ограниченный по суммарному размеру в байтах, и фоновый
+поток предварительного декодирования соседних файлов
+каталога для быстрого листания.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+
+class DecodedImageCache:
+    """LRU кэш декодированных изображений, ограниченный по байтам"""
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+        self.total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(file_path):
+        """
+        Ключ записи: путь, время изменения и размер файла
+
+        Args:
+            file_path: Путь к файлу
+
+        Returns:
+            Кортеж-ключ или None, если файл недоступен
+        """
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+    def get(self, file_path):
+        """
+        Получение декодированного изображения
+
+        Args:
+            file_path: Путь к файлу
+
+        Returns:
+            Изображение (только для чтения) или None
+        """
+
+        key = self.make_key(file_path)
+
+        with self._lock:
+            image = self._images.get(key) if key is not None else None
+
+            if image is None:
+                self.misses += 1
+                return None
+
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def contains(self, file_path):
+        """Проверка наличия изображения без обновления порядка LRU"""
+
+        key = self.make_key(file_path)
+
+        with self._lock:
+            return key is not None and key in self._images
+
+    def put(self, file_path, image):
+        """
+        Сохранение декодированного изображения
+
+        Изображение помечается как доступное только для чтения:
+        один и тот же буфер отдается всем, кто его запросит.
+
+        Args:
+            file_path: Путь к файлу
+            image: Декодированное изображение
+        """
+
+        key = self.make_key(file_path)
+        if key is None or image is None or image.nbytes > self.max_bytes:
+            return
+
+        image.flags.writeable = False
+
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous.nbytes
+
+            self._images[key] = image
+            self.total_bytes += image.nbytes
+
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.total_bytes -= evicted.nbytes
+
+    def clear(self):
+        """Очистка кэша"""
+
+        with self._lock:
+            self._images.clear()
+            self.total_bytes = 0
+
+
+class ImagePrefetcher(threading.Thread):
+    """
+    Фоновый поток предварительного декодирования файлов
+
+    Хранится только последний список файлов: при быстром листании
+    устаревшие запросы отбрасываются. Декодированные изображения
+    попадают в кэш через функцию загрузки (например,
+    FileHandler.load_image, которая сама заполняет кэш).
+    """
+
+    def __init__(self, load_function, cache):
+        super().__init__(name="ImagePrefetcher", daemon=True)
+
+        self.load_function = load_function
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = []
+        self._running = True
+
+    def prefetch(self, file_paths):
+        """
+        Замена очереди предварительного декодирования
+
+        Args:
+            file_paths: Пути к файлам в порядке приоритета
+        """
+
+        with self._lock:
+            self._pending = [path for path in file_paths if path]
+
+        self._wakeup.set()
+
+    def run(self):
+        """Основной цикл потока"""
+
+        while self._running:
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._running:
+                with self._lock:
+                    if not self._pending:
+                        break
+                    file_path = self._pending.pop(0)
+
+                if self.cache.contains(file_path):
+                    continue
+
+                try:
+                    self.load_function(file_path)
+                    self.logger.debug("Предварительно декодирован: %s", file_path)
+                except Exception as e:
+                    self.logger.warning("Ошибка предварительного декодирования %s: %s",
+                                        file_path, e)
+
+    def stop(self):
+        """Остановка потока"""
+
+        self._running = False
+        self._wakeup.set()
+        self.join(timeout=1.0)
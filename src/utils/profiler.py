@@ -0,0 +1,312 @@
+"""
+Модуль профилирования операций
+
+Собирает монотонные замеры времени операций обработки,
+отрисовки и чтения кадров, ведет скользящие гистограммы
+и экспортирует профиль в формате Chrome trace events.
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+# Границы корзин гистограммы в микросекундах (логарифмическая шкала)
+HISTOGRAM_BUCKETS_US = [2 ** k for k in range(0, 25)]
+
+
+class OperationStats:
+    """Скользящая статистика одной операции"""
+
+    def __init__(self, window_size=512):
+        self.durations_us = deque(maxlen=window_size)
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_US) + 1)
+        self.total_count = 0
+        self.last_bytes = 0
+        self.max_bytes = 0
+
+    def add(self, duration_us, nbytes=0):
+        """
+        Добавление замера в скользящее окно
+
+        Args:
+            duration_us: Длительность операции в микросекундах
+            nbytes: Размер выделенного результата в байтах
+        """
+
+        # Вытесняемый из окна замер удаляется из гистограммы
+        if len(self.durations_us) == self.durations_us.maxlen:
+            evicted = self.durations_us[0]
+            self.histogram[bisect.bisect_left(HISTOGRAM_BUCKETS_US, evicted)] -= 1
+
+        self.durations_us.append(duration_us)
+        self.histogram[bisect.bisect_left(HISTOGRAM_BUCKETS_US, duration_us)] += 1
+        self.total_count += 1
+        self.last_bytes = nbytes
+        self.max_bytes = max(self.max_bytes, nbytes)
+
+    def summary(self):
+        """
+        Сводка по скользящему окну
+
+        Returns:
+            Словарь с количеством замеров, средним, p50, p95 и максимумом (мкс)
+        """
+
+        if not self.durations_us:
+            return {'count': self.total_count, 'mean_us': 0.0, 'p50_us': 0.0,
+                    'p95_us': 0.0, 'max_us': 0.0, 'last_bytes': self.last_bytes,
+                    'max_bytes': self.max_bytes}
+
+        ordered = sorted(self.durations_us)
+        n = len(ordered)
+
+        return {
+            'count': self.total_count,
+            'mean_us': sum(ordered) / n,
+            'p50_us': ordered[n // 2],
+            'p95_us': ordered[min(n - 1, int(n * 0.95))],
+            'max_us': ordered[-1],
+            'last_bytes': self.last_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+
+class Profiler:
+    """Легковесный профилировщик операций приложения"""
+
+    def __init__(self, window_size=512, max_trace_events=100000):
+        self.logger = logging.getLogger(__name__)
+
+        self.enabled = True
+        self.window_size = window_size
+
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._stats = {}
+        self._trace_events = deque(maxlen=max_trace_events)
+
+        # Разбивка текущего и последнего завершенного кадра
+        self._current_frame = {}
+        self.last_frame = {}
+
+    def record(self, name, category, start_ns, duration_ns, nbytes=0):
+        """
+        Регистрация замера операции
+
+        Args:
+            name: Имя операции
+            category: Категория ('processing', 'render', 'camera')
+            start_ns: Момент начала по time.perf_counter_ns()
+            duration_ns: Длительность в наносекундах
+            nbytes: Размер выделенного результата в байтах
+        """
+
+        duration_us = duration_ns / 1000.0
+
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = OperationStats(self.window_size)
+            stats.add(duration_us, nbytes)
+
+            self._current_frame[name] = self._current_frame.get(name, 0.0) + duration_us
+
+            self._trace_events.append((
+                name, category,
+                (start_ns - self._origin_ns) / 1000.0, duration_us,
+                threading.get_ident(), nbytes
+            ))
+
+    @contextmanager
+    def measure(self, name, category='processing'):
+        """
+        Контекстный менеджер для замера участка кода
+
+        Args:
+            name: Имя операции
+            category: Категория операции
+
+        Yields:
+            Словарь, в который можно записать 'bytes' выделенной памяти
+        """
+
+        if not self.enabled:
+            yield {}
+            return
+
+        info = {'bytes': 0}
+        start = time.perf_counter_ns()
+        try:
+            yield info
+        finally:
+            self.record(name, category, start, time.perf_counter_ns() - start,
+                        info.get('bytes', 0))
+
+    def mark_frame(self):
+        """Завершение текущего кадра и сохранение его разбивки"""
+
+        with self._lock:
+            if self._current_frame:
+                self.last_frame = self._current_frame
+                self._current_frame = {}
+
+    def get_last_frame_breakdown(self):
+        """
+        Получение разбивки последнего кадра
+
+        Returns:
+            Словарь {операция: суммарное время в мкс}
+        """
+
+        with self._lock:
+            return dict(self.last_frame or self._current_frame)
+
+    def get_summary(self):
+        """
+        Получение сводки по всем операциям
+
+        Returns:
+            Словарь {операция: сводка OperationStats.summary()}
+        """
+
+        with self._lock:
+            return {name: stats.summary() for name, stats in self._stats.items()}
+
+    def get_histogram(self, name):
+        """
+        Получение гистограммы длительностей операции
+
+        Args:
+            name: Имя операции
+
+        Returns:
+            Список пар (верхняя граница в мкс или None, количество)
+        """
+
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                return []
+            edges = HISTOGRAM_BUCKETS_US + [None]
+            return list(zip(edges, stats.histogram))
+
+    def reset(self):
+        """Сброс всех накопленных замеров"""
+
+        with self._lock:
+            self._stats.clear()
+            self._trace_events.clear()
+            self._current_frame = {}
+            self.last_frame = {}
+            self._origin_ns = time.perf_counter_ns()
+
+    def export_chrome_trace(self, filepath):
+        """
+        Экспорт профиля в формате Chrome trace events
+
+        Файл открывается в chrome://tracing или Perfetto.
+
+        Args:
+            filepath: Путь для сохранения JSON файла
+        """
+
+        with self._lock:
+            events = list(self._trace_events)
+
+        pid = os.getpid()
+        trace = {
+            'traceEvents': [
+                {
+                    'name': name,
+                    'cat': category,
+                    'ph': 'X',
+                    'ts': round(ts_us, 3),
+                    'dur': round(dur_us, 3),
+                    'pid': pid,
+                    'tid': tid,
+                    'args': {'bytes': nbytes}
+                }
+                for name, category, ts_us, dur_us, tid, nbytes in events
+            ],
+            'displayTimeUnit': 'ms'
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+
+        self.logger.info("Профиль экспортирован: %s (%d событий)", filepath, len(events))
+
+    def format_last_frame(self, limit=4):
+        """
+        Краткая текстовая разбивка последнего кадра для строки состояния
+
+        Args:
+            limit: Максимальное количество операций в строке
+
+        Returns:
+            Строка вида 'Кадр 5.2 мс: read 2.1 · set_image 3.1'
+        """
+
+        breakdown = self.get_last_frame_breakdown()
+        if not breakdown:
+            return "Профиль: нет данных"
+
+        total_ms = sum(breakdown.values()) / 1000.0
+        top = sorted(breakdown.items(), key=lambda item: item[1], reverse=True)[:limit]
+        parts = [f"{name.split('.')[-1]} {us / 1000.0:.1f}" for name, us in top]
+
+        return f"Кадр {total_ms:.1f} мс: " + " · ".join(parts)
+
+
+_profiler = Profiler()
+
+
+def get_profiler():
+    """
+    Получение общего экземпляра профилировщика
+
+    Returns:
+        Экземпляр Profiler
+    """
+
+    return _profiler
+
+
+def profiled(name=None, category='processing'):
+    """
+    Декоратор для замера времени вызова и размера результата
+
+    Args:
+        name: Имя операции (по умолчанию квалифицированное имя функции)
+        category: Категория операции
+    """
+
+    def decorator(func):
+        op_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter_ns()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                profiler.record(op_name, category, start,
+                                time.perf_counter_ns() - start,
+                                getattr(result, 'nbytes', 0))
+
+        return wrapper
+
+    return decorator
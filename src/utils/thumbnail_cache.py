@@ -0,0 +1,289 @@
+"""
+Модуль дискового кэша превью изображений
+
+Хранит уменьшенные превью и метаданные открытых файлов,
+чтобы при повторном открытии превью показывалось сразу,
+пока полное изображение декодируется. Ключ записи строится
+по пути, времени изменения и размеру файла, поэтому
+измененный файл не получит устаревшее превью.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+class ThumbnailCache:
+    """Дисковый LRU кэш превью, ограниченный по суммарному размеру"""
+
+    PREVIEW_EXTENSION = '.jpg'
+    METADATA_EXTENSION = '.json'
+    JPEG_QUALITY = 85
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024, preview_size=512):
+        self.logger = logging.getLogger(__name__)
+
+        if not directory:
+            directory = Path.home() / '.cache' / 'image_processor' / 'thumbnails'
+
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.preview_size = preview_size
+
+        self._lock = threading.Lock()
+        self._entries = None    # {ключ: (время доступа, размер в байтах)}
+        self.total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(file_path):
+        """
+        Ключ записи по пути, времени изменения и размеру файла
+
+        Args:
+            file_path: Путь к файлу изображения
+
+        Returns:
+            Строковый ключ или None, если файл недоступен
+        """
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        identity = f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def contains(self, file_path):
+        """
+        Проверка наличия готовой записи без чтения превью
+
+        Args:
+            file_path: Путь к файлу изображения
+
+        Returns:
+            True, если превью и метаданные записаны
+        """
+
+        key = self.make_key(file_path)
+        return key is not None and self._paths(key)[1].exists()
+
+    def get(self, file_path):
+        """
+        Получение превью и метаданных файла
+
+        Args:
+            file_path: Путь к файлу изображения
+
+        Returns:
+            Кортеж (превью, метаданные) или None, если записи нет
+        """
+
+        key = self.make_key(file_path)
+        if key is None:
+            return None
+
+        preview_path, metadata_path = self._paths(key)
+
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+
+            preview = cv2.imread(str(preview_path), cv2.IMREAD_UNCHANGED)
+            if preview is None:
+                raise ValueError("Поврежденное превью")
+
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Время доступа хранится в mtime превью и определяет порядок вытеснения
+        try:
+            os.utime(preview_path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+            self._load_index()
+            if key in self._entries:
+                self._entries[key] = (os.path.getmtime(preview_path), self._entries[key][1])
+
+        return preview, metadata
+
+    def put(self, file_path, image):
+        """
+        Сохранение превью и метаданных декодированного изображения
+
+        Файлы записываются во временные файлы того же каталога
+        и переименовываются атомарно через os.replace.
+
+        Args:
+            file_path: Путь к исходному файлу
+            image: Полное декодированное изображение
+
+        Returns:
+            Превью или None, если запись не удалась
+        """
+
+        key = self.make_key(file_path)
+        if key is None or image is None:
+            return None
+
+        try:
+            preview = self.make_preview(image)
+
+            ok, encoded = cv2.imencode(self.PREVIEW_EXTENSION, preview,
+                                       [cv2.IMWRITE_JPEG_QUALITY, self.JPEG_QUALITY])
+            if not ok:
+                raise RuntimeError("cv2.imencode вернул False")
+
+            height, width = image.shape[:2]
+            stat = os.stat(file_path)
+            metadata = {
+                'path': os.path.abspath(file_path),
+                'name': os.path.basename(file_path),
+                'size_bytes': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'width': width,
+                'height': height,
+                'channels': 1 if image.ndim == 2 else image.shape[2],
+                'format': Path(file_path).suffix.upper()[1:]
+            }
+            metadata_bytes = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            preview_path, metadata_path = self._paths(key)
+
+            # Метаданные пишутся последними: запись без них не считается готовой
+            self._write_atomic(preview_path, encoded.tobytes())
+            self._write_atomic(metadata_path, metadata_bytes)
+
+            with self._lock:
+                self._load_index()
+                previous = self._entries.get(key)
+                if previous is not None:
+                    self.total_bytes -= previous[1]
+
+                size = len(encoded) + len(metadata_bytes)
+                self._entries[key] = (os.path.getmtime(preview_path), size)
+                self.total_bytes += size
+
+                self._evict()
+
+            return preview
+
+        except Exception as e:
+            self.logger.warning("Не удалось сохранить превью %s: %s", file_path, e)
+            return None
+
+    def make_preview(self, image):
+        """
+        Уменьшенная копия изображения для кэша
+
+        Args:
+            image: Полное изображение
+
+        Returns:
+            Превью, вписанное в квадрат preview_size
+        """
+
+        height, width = image.shape[:2]
+        scale = self.preview_size / max(height, width)
+
+        if image.dtype != np.uint8:
+            image = cv2.convertScaleAbs(image, alpha=255.0 / max(1.0, float(image.max())))
+
+        if scale >= 1.0:
+            return image
+
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    def clear(self):
+        """Удаление всех записей кэша"""
+
+        with self._lock:
+            self._load_index()
+            for key in list(self._entries):
+                self._remove(key)
+            self.total_bytes = 0
+
+    def _paths(self, key):
+        """Пути к файлам превью и метаданных записи"""
+
+        return (self.directory / (key + self.PREVIEW_EXTENSION),
+                self.directory / (key + self.METADATA_EXTENSION))
+
+    def _write_atomic(self, path, data):
+        """Запись файла через временный файл и os.replace"""
+
+        fd, temp_path = tempfile.mkstemp(dir=str(self.directory), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _load_index(self):
+        """Построение индекса записей по содержимому каталога (один раз)"""
+
+        if self._entries is not None:
+            return
+
+        self._entries = {}
+        self.total_bytes = 0
+
+        if not self.directory.is_dir():
+            return
+
+        for preview_path in self.directory.glob('*' + self.PREVIEW_EXTENSION):
+            key = preview_path.stem
+            metadata_path = preview_path.with_suffix(self.METADATA_EXTENSION)
+
+            try:
+                preview_stat = preview_path.stat()
+                size = preview_stat.st_size + metadata_path.stat().st_size
+            except OSError:
+                continue
+
+            self._entries[key] = (preview_stat.st_mtime, size)
+            self.total_bytes += size
+
+    def _evict(self):
+        """Удаление давно не использованных записей сверх лимита"""
+
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        for key, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.total_bytes -= size
+
+    def _remove(self, key):
+        """Удаление файлов записи"""
+
+        self._entries.pop(key, None)
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -5,7 +5,6 @@
 входных данных и изображений.
 """
 
-import cv2
 import numpy as np
 
 
@@ -38,6 +37,32 @@ class ImageValidator:
         
         return True
     
+    @staticmethod
+    def is_valid_batch(images):
+        """
+        Проверка валидности пакета изображений одного размера
+        
+        Args:
+            images: Массив формы NxHxW или NxHxWxC
+            
+        Returns:
+            True если пакет валиден, False в противном случае
+        """
+        
+        if images is None:
+            return False
+        
+        if not isinstance(images, np.ndarray):
+            return False
+        
+        if images.ndim not in [3, 4]:
+            return False
+        
+        if images.size == 0:
+            return False
+        
+        return True
+    
     @staticmethod
     def validate_image_size(image, max_width=8000, max_height=8000):
         """
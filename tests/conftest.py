@@ -0,0 +1,30 @@
+"""
+Общая настройка тестов
+
+Добавляет каталог src в путь импорта (как при запуске main.py)
+и включает платформу Qt без окон для тестов виджетов (OpenGL, если
+доступен, - программная реализация Mesa).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """Общий экземпляр QApplication"""
+
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    yield app
@@ -0,0 +1,676 @@
+"""
+Тесты модулей камеры: запись видео, история кадров, детектор изменений
+"""
+
+import time
+import threading
+
+import cv2
+import numpy as np
+import pytest
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QApplication, QFileDialog, QMessageBox
+
+from camera.camera_manager import CameraManager
+from camera.change_detector import ChangeDetector
+from camera.frame_history import FrameHistory
+from camera.multi_camera import FrameSynchronizer, MultiCameraManager, SyntheticSource
+from camera.video_recorder import VideoRecorder
+from gui.main_window import ImageProcessorWindow
+
+
+class FakeCapture:
+    """Устройство захвата с синтетическими кадрами"""
+
+    def __init__(self, width=64, height=48):
+        self.width = width
+        self.height = height
+        self.reads = 0
+        self.grabs = 0
+        self.released = False
+
+    def isOpened(self):
+        return not self.released
+
+    def read(self, image=None):
+        # Как cv2.VideoCapture.read: кадр пишется в image подходящей формы
+        self.reads += 1
+        shape = (self.height, self.width, 3)
+        if image is None or image.shape != shape or image.dtype != np.uint8:
+            image = np.empty(shape, dtype=np.uint8)
+        image.fill(self.reads % 256)
+        return True, image
+
+    def grab(self):
+        self.grabs += 1
+        return True
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width,
+                cv2.CAP_PROP_FRAME_HEIGHT: self.height}.get(prop, 0)
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        self.released = True
+
+
+@pytest.fixture
+def camera(qapp):
+    """Менеджер камеры с подключенным FakeCapture (без таймера)"""
+
+    manager = CameraManager()
+    manager.capture = FakeCapture()
+    manager.is_capturing = True
+    manager.set_skip_unchanged(False)
+
+    errors = []
+    manager.error_occurred.connect(errors.append)
+    manager.errors = errors
+
+    recording_errors = []
+    manager.recording_failed.connect(recording_errors.append)
+    manager.recording_errors = recording_errors
+
+    yield manager
+
+    manager._cleanup()
+
+
+class TestVideoRecorder:
+    """Фоновая запись видео"""
+
+    def test_writes_frames_and_timestamps(self, tmp_path):
+        path = str(tmp_path / "clip.avi")
+        recorder = VideoRecorder(path, fps=10, frame_size=(64, 48))
+        recorder.start()
+
+        start = time.monotonic()
+        for index in range(5):
+            recorder.submit(np.full((48, 64, 3), index * 40, dtype=np.uint8), start + index / 10)
+        # Кадр другого размера масштабируется до размера видео
+        recorder.submit(np.zeros((24, 32), dtype=np.uint8), start + 0.5)
+        recorder.stop()
+
+        assert recorder.error is None
+        assert recorder.get_stats()['written'] == 6
+
+        capture = cv2.VideoCapture(path)
+        frames = 0
+        while capture.read()[0]:
+            frames += 1
+        capture.release()
+        assert frames == 6
+
+        lines = (tmp_path / "clip.timestamps.csv").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 7
+        assert lines[1].split(",")[1] == "0.000000"
+
+    def test_start_fails_for_unwritable_path(self, tmp_path):
+        recorder = VideoRecorder(str(tmp_path / "missing" / "clip.avi"), frame_size=(64, 48))
+
+        with pytest.raises(RuntimeError):
+            recorder.start()
+        assert not recorder.is_alive()
+
+    def test_start_requires_frame_size(self, tmp_path):
+        with pytest.raises(ValueError):
+            VideoRecorder(str(tmp_path / "clip.avi")).start()
+
+    def test_error_in_thread_is_reported(self, tmp_path):
+        def broken(frame):
+            raise RuntimeError("нет места на диске")
+
+        recorder = VideoRecorder(str(tmp_path / "clip.avi"), frame_size=(64, 48),
+                                 transform=broken)
+        recorder.start()
+        recorder.submit(np.zeros((48, 64, 3), dtype=np.uint8))
+        recorder.join(timeout=5.0)
+
+        assert not recorder.is_alive()
+        assert "нет места на диске" in recorder.error
+        assert not recorder.submit(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    def test_queued_frames_are_pooled_copies(self, tmp_path):
+        recorder = VideoRecorder(str(tmp_path / "clip.avi"), frame_size=(64, 48))
+        in_use = recorder.buffer_pool.get_stats()['in_use']
+
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        for _ in range(3):
+            assert recorder.submit(frame)
+        frame.fill(255)
+
+        # Вызывающий код может сразу переиспользовать свой буфер
+        queued = [entry[0] for entry in recorder._queue]
+        assert all(not np.shares_memory(buffer, frame) for buffer in queued)
+        assert all((buffer == 0).all() for buffer in queued)
+        assert recorder.buffer_pool.get_stats()['in_use'] == in_use + 3
+
+        # Поток не запускался: буферы очереди возвращаются при остановке
+        recorder.stop()
+        assert recorder.buffer_pool.get_stats()['in_use'] == in_use
+
+    def test_written_frames_return_to_pool(self, tmp_path):
+        recorder = VideoRecorder(str(tmp_path / "clip.avi"), fps=10, frame_size=(64, 48))
+        stats = recorder.buffer_pool.get_stats()
+
+        recorder.start()
+        for index in range(20):
+            recorder.submit(np.full((48, 64, 3), index, dtype=np.uint8))
+        recorder.stop()
+
+        assert recorder.get_stats()['written'] == 20
+        after = recorder.buffer_pool.get_stats()
+        assert after['in_use'] == stats['in_use']
+        assert after['reuses'] > stats['reuses']
+
+
+class TestCameraRecording:
+    """Запись видео через CameraManager"""
+
+    def test_frame_size_from_latest_frame(self, camera, tmp_path):
+        camera._capture_frame()
+
+        recorder = camera.start_recording(
+            str(tmp_path / "clip.avi"), transform=lambda frame: frame[::2, ::2]
+        )
+        try:
+            assert recorder is not None
+            assert recorder.frame_size == (32, 24)
+            assert camera.mode == CameraManager.MODE_ACTIVE
+
+            camera._capture_frame()
+        finally:
+            stats = camera.stop_recording()
+
+        assert stats['written'] == 1
+        assert camera.errors == []
+
+    def test_open_failure_is_reported(self, camera, tmp_path):
+        recorder = camera.start_recording(str(tmp_path / "missing" / "clip.avi"))
+
+        assert recorder is None
+        assert not camera.is_recording
+        assert camera.is_capturing
+        assert camera.errors == []
+        assert len(camera.recording_errors) == 1 and "VideoWriter" in camera.recording_errors[0]
+
+
+def textured_frame(seed, blur=0, shape=(48, 64, 3)):
+    """Кадр со случайной текстурой, при blur > 0 - размытый"""
+
+    frame = np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+    if blur:
+        frame = cv2.GaussianBlur(frame, (blur, blur), 0)
+    return frame
+
+
+class TestFrameHistory:
+    """Кольцевой буфер кадров"""
+
+    def test_frame_at_returns_frame_on_screen(self):
+        history = FrameHistory(capacity=4)
+        for index in range(6):
+            history.push(np.full((2, 3), index, dtype=np.uint8), 10.0 + index)
+
+        # Кадр, показанный в момент 13.5, получен в 13.0
+        frame, timestamp = history.frame_at(13.5)
+        assert timestamp == 13.0 and frame[0, 0] == 3
+
+        # Точное совпадение времени
+        assert history.frame_at(15.0)[1] == 15.0
+
+        # Раньше всех кадров истории: самый старый из сохраненных
+        frame, timestamp = history.frame_at(0.0)
+        assert timestamp == 12.0 and frame[0, 0] == 2
+        assert len(history) == 4
+
+    def test_returns_copies(self):
+        history = FrameHistory(capacity=2)
+        history.push(np.zeros((2, 2), dtype=np.uint8), 1.0)
+
+        frame, _ = history.latest()
+        frame[...] = 255
+
+        assert history.latest()[0].max() == 0
+
+    def test_empty_and_shape_change(self):
+        history = FrameHistory(capacity=3)
+        assert history.frame_at(1.0) is None
+        assert history.sharpest(1.0, 1.0) is None
+
+        history.push(np.zeros((2, 2), dtype=np.uint8), 1.0)
+        history.push(np.zeros((4, 4), dtype=np.uint8), 2.0)
+
+        assert len(history) == 1
+        assert history.frame_at(1.5)[0].shape == (4, 4)
+
+        with pytest.raises(ValueError):
+            FrameHistory(capacity=0)
+
+    def test_sharpest_in_window(self):
+        history = FrameHistory(capacity=8)
+        history.push(textured_frame(0), 1.0)            # резкий, вне окна
+        history.push(textured_frame(1, blur=9), 2.0)
+        history.push(textured_frame(2, blur=3), 2.5)    # самый резкий в окне
+        history.push(textured_frame(3, blur=15), 3.0)
+
+        frame, timestamp, score = history.sharpest(window=1.5, until=3.0)
+
+        assert timestamp == 2.5
+        np.testing.assert_array_equal(frame, textured_frame(2, blur=3))
+        assert score == pytest.approx(float(FrameHistory.sharpness(frame[np.newaxis])[0]))
+
+    def test_sharpest_falls_back_to_latest(self):
+        history = FrameHistory(capacity=4)
+        history.push(textured_frame(0), 1.0)
+        history.push(textured_frame(1, blur=9), 2.0)
+
+        assert history.sharpest(window=0.5, until=10.0)[1] == 2.0
+
+    def test_sharpness_matches_per_frame(self):
+        frames = np.stack([textured_frame(seed, blur=blur, shape=(480, 640, 3))
+                           for seed, blur in ((0, 0), (1, 5), (2, 11))])
+        scores = FrameHistory.sharpness(frames)
+
+        assert scores[0] > scores[1] > scores[2]
+        for frame, score in zip(frames, scores):
+            assert FrameHistory.sharpness(frame[np.newaxis])[0] == pytest.approx(score)
+
+
+class TestCameraCapture:
+    """Захват кадров из истории CameraManager"""
+
+    def test_capture_single_frame_uses_history(self, camera):
+        for _ in range(3):
+            camera._capture_frame()
+        reads = camera.capture.reads
+
+        frame = camera.capture_single_frame()
+
+        assert camera.capture.reads == reads
+        assert frame[0, 0, 0] == 3
+
+    def test_capture_burst(self, camera):
+        camera._capture_frame()
+
+        frame, score = camera.capture_burst(window=1.0)
+
+        assert frame.shape == (48, 64, 3)
+        assert score == 0.0
+
+    def test_frames_are_read_into_pool_buffers(self, camera):
+        pool = camera.buffer_pool
+        emitted = []
+        camera.frame_ready.connect(emitted.append)
+
+        for _ in range(CameraManager.FRAME_BUFFERS + 1):
+            camera._capture_frame()
+        stats = pool.get_stats()
+
+        for _ in range(10):
+            camera._capture_frame()
+
+        # В установившемся режиме кадры не выделяются
+        after = pool.get_stats()
+        assert after['allocations'] == stats['allocations']
+        assert after['reuses'] == stats['reuses'] + 10
+        assert after['in_use'] == stats['in_use']
+
+        # Последние FRAME_BUFFERS кадров не перезаписаны следующими
+        recent = emitted[-CameraManager.FRAME_BUFFERS:]
+        assert len({id(frame) for frame in recent}) == CameraManager.FRAME_BUFFERS
+        reads = camera.capture.reads
+        for age, frame in enumerate(reversed(recent)):
+            assert (frame == (reads - age) % 256).all()
+
+        camera._cleanup()
+        assert pool.get_stats()['in_use'] == stats['in_use'] - CameraManager.FRAME_BUFFERS
+
+    def test_device_array_is_copied_to_pool(self, camera):
+        camera.capture.read = lambda image=None: (True, np.full((48, 64, 3), 9, dtype=np.uint8))
+        in_use = camera.buffer_pool.get_stats()['in_use']
+
+        emitted = []
+        camera.frame_ready.connect(emitted.append)
+        for _ in range(5):
+            camera._capture_frame()
+
+        assert camera.errors == []
+        assert all((frame == 9).all() for frame in emitted)
+        assert camera.buffer_pool.get_stats()['in_use'] == in_use + CameraManager.FRAME_BUFFERS
+
+
+def synthetic_frames(seed, count, width=80, height=60):
+    """Кадры SyntheticSource без ожидания частоты генератора"""
+
+    source = SyntheticSource(width, height, fps=1e6, seed=seed)
+    source.open()
+    try:
+        return [source.read() for _ in range(count)]
+    finally:
+        source.close()
+
+
+class TestFrameSynchronizer:
+    """Подбор кадров по времени"""
+
+    def test_match_within_tolerance(self):
+        first = synthetic_frames(0, 3)
+        second = synthetic_frames(1, 3)
+        histories = [
+            [(1.000, first[0]), (1.033, first[1]), (1.066, first[2])],
+            [(1.010, second[0]), (1.043, second[1]), (1.076, second[2])]
+        ]
+
+        synchronizer = FrameSynchronizer(tolerance=0.020)
+        frame_set = synchronizer.match(histories)
+
+        # Опорный момент - последний кадр отстающего источника
+        assert frame_set['reference'] == 1.066
+        assert frame_set['timestamps'] == [1.066, 1.076]
+        assert frame_set['frames'][0] is first[2] and frame_set['frames'][1] is second[2]
+        assert frame_set['skew'] == pytest.approx(0.010)
+        assert synchronizer.out_of_tolerance == 0
+
+    def test_match_beyond_tolerance(self):
+        frames = synthetic_frames(0, 2)
+        histories = [
+            [(2.000, frames[0])],
+            [(1.900, frames[1]), (2.050, frames[0])]
+        ]
+
+        synchronizer = FrameSynchronizer(tolerance=0.020)
+        frame_set = synchronizer.match(histories)
+
+        assert frame_set['reference'] == 2.000
+        assert frame_set['timestamps'] == [2.000, 2.050]
+        assert frame_set['skew'] == pytest.approx(0.050)
+        assert synchronizer.last_skew == pytest.approx(0.050)
+        assert (synchronizer.matched, synchronizer.out_of_tolerance) == (1, 1)
+
+    def test_match_waits_for_all_sources(self):
+        synchronizer = FrameSynchronizer()
+
+        assert synchronizer.match([]) is None
+        assert synchronizer.match([[(1.0, synthetic_frames(0, 1)[0])], []]) is None
+        assert synchronizer.matched == 0
+
+
+class TestMultiCameraCompose:
+    """Мозаика кадров нескольких источников"""
+
+    def test_layout(self, qapp):
+        manager = MultiCameraManager(tile_size=(80, 60))
+        frames = [synthetic_frames(seed, 1)[0] for seed in range(3)]
+        frames[2] = cv2.cvtColor(frames[2], cv2.COLOR_BGR2GRAY)
+
+        composite = manager.compose(frames)
+
+        # Три кадра - сетка 2x2, свободная ячейка остается черной
+        assert composite.shape == (120, 160, 3)
+        np.testing.assert_array_equal(composite[:60, :80], frames[0])
+        np.testing.assert_array_equal(composite[:60, 80:], frames[1])
+        np.testing.assert_array_equal(composite[60:, :80],
+                                      cv2.cvtColor(frames[2], cv2.COLOR_GRAY2BGR))
+        assert not composite[60:, 80:].any()
+
+    def test_buffer_reuse(self, qapp):
+        manager = MultiCameraManager(tile_size=(40, 30))
+        first = manager.compose(synthetic_frames(0, 2))
+        second = manager.compose(synthetic_frames(1, 2))
+
+        assert second is first
+
+        # Другое число источников - другая сетка
+        third = manager.compose(synthetic_frames(2, 5))
+        assert third is not first
+        assert third.shape == (60, 120, 3)
+
+    def test_poll_with_synthetic_sources(self, qapp):
+        sources = [SyntheticSource(80, 60, fps=200, seed=seed) for seed in range(2)]
+        manager = MultiCameraManager(sources, tile_size=(80, 60), tolerance=0.050)
+
+        composites = []
+        manager.composite_ready.connect(composites.append)
+
+        manager.start_capture()
+        try:
+            deadline = time.monotonic() + 5.0
+            while (time.monotonic() < deadline
+                   and min(len(thread.snapshot()) for thread in manager.threads) < 3):
+                time.sleep(0.01)
+
+            frame_set = manager.poll()
+        finally:
+            manager.stop_capture()
+
+        assert frame_set is not None
+        assert len(frame_set['frames']) == 2
+        assert composites and composites[0].shape == (60, 160, 3)
+        assert manager.get_stats()['sets'] == 1
+
+
+class TestChangeDetector:
+    """Пропуск кадров статичной сцены"""
+
+    @pytest.fixture
+    def scene(self):
+        return textured_frame(7, blur=5, shape=(480, 640, 3))
+
+    def test_noise_below_threshold_is_skipped(self, scene):
+        detector = ChangeDetector(threshold=8, min_blocks=2)
+        noise = np.random.default_rng(8).integers(-20, 21, scene.shape)
+
+        assert detector.is_changed(scene)
+        # Шум матрицы усредняется в блоках 10x10 пикселей
+        noisy = np.clip(scene.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        assert not detector.is_changed(noisy)
+        assert detector.last_changed_blocks < 2
+        assert detector.skipped_fraction == 0.5
+
+    def test_local_change_is_detected(self, scene):
+        detector = ChangeDetector(threshold=8, min_blocks=2)
+        detector.is_changed(scene)
+
+        # Изменение размером в несколько блоков сигнатуры
+        changed = scene.copy()
+        changed[100:130, 200:240] = 255
+
+        assert detector.is_changed(changed)
+        assert detector.last_changed_blocks >= 2
+
+    def test_min_blocks(self, scene):
+        # Изменение ровно одного блока сигнатуры (10x10 пикселей)
+        changed = scene.copy()
+        changed[:10, :10] = 255
+
+        strict = ChangeDetector(threshold=8, min_blocks=2)
+        strict.is_changed(scene)
+        assert not strict.is_changed(changed)
+        assert strict.last_changed_blocks == 1
+
+        sensitive = ChangeDetector(threshold=8, min_blocks=1)
+        sensitive.is_changed(scene)
+        assert sensitive.is_changed(changed)
+
+    def test_threshold(self, scene):
+        brighter = np.clip(scene.astype(np.int16) + 6, 0, 255).astype(np.uint8)
+
+        low = ChangeDetector(threshold=4)
+        low.is_changed(scene)
+        assert low.is_changed(brighter)
+
+        high = ChangeDetector(threshold=8)
+        high.is_changed(scene)
+        assert not high.is_changed(brighter)
+
+    def test_slow_drift_accumulates(self, scene):
+        detector = ChangeDetector(threshold=8)
+        detector.is_changed(scene)
+
+        results = [detector.is_changed(np.clip(scene.astype(np.int16) + step * 3, 0, 255)
+                                       .astype(np.uint8))
+                   for step in range(1, 5)]
+
+        # Опорная сигнатура не обновляется, пока разница не превысит порог
+        assert results == [False, False, True, False]
+
+    def test_reset(self, scene):
+        detector = ChangeDetector()
+        detector.is_changed(scene)
+        detector.is_changed(scene)
+        detector.reset()
+
+        assert detector.skipped_fraction == 0.0
+        assert detector.is_changed(scene)
+
+    def test_camera_skips_static_frames(self, camera):
+        camera.change_detector = ChangeDetector()
+        camera.capture.read = lambda image=None: (True, np.zeros((48, 64, 3), dtype=np.uint8))
+
+        emitted = []
+        camera.frame_ready.connect(emitted.append)
+        for _ in range(4):
+            camera._capture_frame()
+
+        assert len(emitted) == 1
+        assert camera.skipped_fraction == 0.75
+        assert len(camera.history) == 4
+
+
+class TestCameraSchedule:
+    """Частота опроса камеры по состоянию главного окна"""
+
+    @pytest.fixture
+    def window(self, qapp, tmp_path, monkeypatch):
+        # Настройки и кэши окна пишутся во временный каталог
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(cv2, "VideoCapture", lambda index: FakeCapture())
+
+        window = ImageProcessorWindow()
+        window.show()
+        window.start_camera()
+
+        # Окно считается активным, пока тест не скажет иначе
+        window.active = True
+        monkeypatch.setattr(window, "isActiveWindow", lambda: window.active)
+        window.update_camera_schedule()
+
+        yield window
+
+        window.close()
+
+    @staticmethod
+    def send_activation(window, active):
+        window.active = active
+        QApplication.sendEvent(window, QEvent(QEvent.ActivationChange))
+
+    def test_unfocused_window_keeps_camera_alive(self, window):
+        camera = window.camera_manager
+        assert camera.mode == CameraManager.MODE_ACTIVE
+        assert camera.timer.interval() == camera.frame_interval
+
+        window.settings.set('camera.keep_alive_fps', 5)
+        self.send_activation(window, False)
+
+        assert camera.mode == CameraManager.MODE_KEEP_ALIVE
+        assert camera.timer.isActive() and camera.timer.interval() == 200
+
+        self.send_activation(window, True)
+        assert camera.mode == CameraManager.MODE_ACTIVE
+        assert camera.timer.interval() == camera.frame_interval
+
+    def test_hidden_window_pauses_camera(self, window):
+        camera = window.camera_manager
+
+        window.hide()
+        assert camera.mode == CameraManager.MODE_PAUSED
+        assert not camera.timer.isActive()
+        assert not camera.capture.released
+
+        window.show()
+        assert camera.mode == CameraManager.MODE_ACTIVE
+        assert camera.timer.isActive()
+        # Кадр, накопленный за время паузы, отбрасывается
+        assert camera.capture.grabs == 1
+
+    def test_minimized_window_uses_hidden_mode(self, window):
+        window.settings.set('camera.hidden_mode', 'keep_alive')
+
+        window.showMinimized()
+        assert window.camera_manager.mode == CameraManager.MODE_KEEP_ALIVE
+
+        window.showNormal()
+        assert window.camera_manager.mode == CameraManager.MODE_ACTIVE
+
+    def test_settings_override_and_invalid_mode(self, window):
+        window.settings.set('camera.unfocused_mode', 'active')
+        self.send_activation(window, False)
+        assert window.camera_manager.mode == CameraManager.MODE_ACTIVE
+
+        window.settings.set('camera.unfocused_mode', 'unknown')
+        self.send_activation(window, False)
+        assert window.camera_manager.mode == CameraManager.MODE_ACTIVE
+
+    def test_recording_forces_active(self, window, tmp_path):
+        camera = window.camera_manager
+        camera._capture_frame()
+        assert camera.start_recording(str(tmp_path / "clip.avi")) is not None
+
+        window.hide()
+        assert camera.mode == CameraManager.MODE_ACTIVE
+
+        # После остановки записи режим снова следует состоянию окна
+        window.stop_recording()
+        assert camera.mode == CameraManager.MODE_PAUSED
+
+    @pytest.fixture
+    def dialogs(self, monkeypatch):
+        """Сообщения QMessageBox вместо модальных окон"""
+
+        shown = []
+        for name in ("critical", "warning"):
+            monkeypatch.setattr(QMessageBox, name,
+                                lambda parent, title, text, name=name: shown.append((name, text)))
+        return shown
+
+    def test_recording_start_failure_keeps_camera(self, window, tmp_path, monkeypatch, dialogs):
+        path = str(tmp_path / "missing" / "clip.avi")
+        monkeypatch.setattr(QFileDialog, "getSaveFileName",
+                            lambda *args, **kwargs: (path, ""))
+
+        window.camera_manager._capture_frame()
+        window.record_action.setChecked(True)
+        window.start_recording()
+
+        assert len(dialogs) == 1 and "VideoWriter" in dialogs[0][1]
+        assert window.camera_active and window.camera_manager.is_capturing
+        assert not window.record_action.isChecked()
+        assert not window.recording_label.isVisible()
+
+    def test_recorder_failure_is_reported(self, window, tmp_path, dialogs):
+        def transform(frame):
+            # Размер видео определяется в главном потоке, ошибка - в потоке записи
+            if threading.current_thread() is threading.main_thread():
+                return frame
+            raise RuntimeError("нет места на диске")
+
+        camera = window.camera_manager
+        camera._capture_frame()
+        recorder = camera.start_recording(str(tmp_path / "clip.avi"), transform=transform)
+        assert recorder is not None
+        window.record_action.setChecked(True)
+
+        camera._capture_frame()
+        recorder.join(timeout=5.0)
+        assert recorder.error == "нет места на диске"
+
+        window.update_recording_status()
+
+        assert not camera.is_recording
+        assert window.camera_active
+        assert not window.record_action.isChecked()
+        assert dialogs == [("critical", "Запись видео прервана: нет места на диске")]
+        assert window.status_bar.currentMessage() == "Ошибка выполнения операции"
@@ -0,0 +1,634 @@
+"""
+Тесты графического интерфейса: главное окно, просмотр изображений, браузер папок
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+from PyQt5.QtCore import QRunnable, Qt
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+from gui.folder_browser import ThumbnailModel
+from gui.gl_canvas import GLImageCanvas, opengl_available
+from gui.image_viewer import ImageViewer
+from gui.main_window import ImageProcessorWindow
+from processing.roi import ImageROI
+
+
+def wait_until(condition, timeout=5.0):
+    """Обработка событий Qt, пока условие не выполнится"""
+
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        QApplication.processEvents()
+        time.sleep(0.005)
+    return True
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    """Главное окно с настройками и кэшами во временном каталоге"""
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for name in ("critical", "warning"):
+        monkeypatch.setattr(QMessageBox, name, lambda *args: pytest.fail(args[-1]))
+
+    window = ImageProcessorWindow()
+    yield window
+
+    window.close()
+
+
+@pytest.fixture
+def image_files(tmp_path):
+    """Несколько файлов изображений одного каталога"""
+
+    folder = tmp_path / "images"
+    folder.mkdir()
+
+    paths = []
+    for index in range(5):
+        path = folder / f"{index}.png"
+        cv2.imwrite(str(path), np.full((20, 30, 3), index * 40, dtype=np.uint8))
+        paths.append(str(path))
+    return paths
+
+
+class TestImageOpening:
+    """Фоновое декодирование открываемых файлов"""
+
+    def test_burst_of_opens_decodes_latest(self, window, image_files, monkeypatch):
+        load_image = window.file_handler.load_image
+        release = threading.Event()
+        decoded = []
+
+        def blocking_load(file_path):
+            if threading.current_thread().name.startswith("ImageDecoder"):
+                decoded.append(file_path)
+                release.wait(5.0)
+            return load_image(file_path)
+
+        monkeypatch.setattr(window.file_handler, "load_image", blocking_load)
+
+        for path in image_files:
+            window.open_image_file(path)
+
+        threads = [thread.name for thread in threading.enumerate()
+                   if thread.name.startswith("ImageDecoder")]
+        release.set()
+
+        assert wait_until(lambda: window.current_file == image_files[-1])
+        assert len(threads) == 1
+
+        # Первый запрос уже декодировался, промежуточные пропущены
+        wait_until(lambda: len(decoded) >= 2, timeout=0.5)
+        assert decoded == [image_files[0], image_files[-1]]
+        assert window.pending_request is None
+        assert window.current_image.array[0, 0, 0] == 160
+
+    def test_stale_result_is_ignored(self, window, image_files):
+        window.open_image_file(image_files[0])
+        first_request = window.pending_request
+        window.open_image_file(image_files[1])
+
+        window.on_image_decoded(first_request, image_files[0],
+                                np.zeros((20, 30, 3), dtype=np.uint8))
+        assert window.current_file is None
+
+        assert wait_until(lambda: window.current_file == image_files[1])
+
+
+class BlockingTask(QRunnable):
+    """Задача, занимающая поток пула до вызова release"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def run(self):
+        self.started.set()
+        self.released.wait(5.0)
+
+    def release(self):
+        self.released.set()
+
+
+class TestThumbnailModel:
+    """Ленивое декодирование миниатюр пулом потоков"""
+
+    @pytest.fixture
+    def model(self, qapp):
+        model = ThumbnailModel(thumbnail_size=16, max_threads=1)
+        yield model
+
+        model.cancel_all()
+        model.pool.waitForDone(2000)
+
+    @pytest.fixture
+    def blocker(self, model):
+        """Единственный поток пула занят: новые задачи остаются в очереди"""
+
+        task = BlockingTask()
+        model.pool.start(task)
+        assert task.started.wait(5.0)
+        yield task
+
+        task.release()
+
+    @staticmethod
+    def request(model, rows):
+        for row in rows:
+            model.data(model.index(row), Qt.DecorationRole)
+
+    def test_thumbnail_lifecycle(self, model, image_files):
+        model.set_files(image_files)
+        index = model.index(2)
+
+        assert model.data(index, Qt.DecorationRole) is model.placeholder
+        assert model.pending_count() == 1
+
+        changed = []
+        model.dataChanged.connect(lambda first, last, roles: changed.append(first.row()))
+
+        assert wait_until(lambda: model.pending_count() == 0 and not model._live)
+        assert changed == [2]
+
+        icon = model.data(index, Qt.DecorationRole)
+        assert icon is not model.placeholder
+        assert not icon.isNull()
+        assert model.data(index, Qt.DisplayRole) == "2.png"
+
+    def test_cancel_outside_visible_rows(self, model, image_files, blocker):
+        model.set_files(image_files)
+        self.request(model, range(5))
+        assert model.pending_count() == 5
+
+        model.cancel_outside(1, 2)
+
+        # Задачи вне диапазона удалены из очереди пула
+        assert model.pending_count() == 2
+        assert len(model._live) == 2
+
+        blocker.release()
+        assert wait_until(lambda: model.pending_count() == 0 and not model._live)
+        assert set(model._cache) == set(image_files[1:3])
+        assert not model._failed
+
+    def test_stale_results_after_folder_change(self, model, image_files, blocker, tmp_path):
+        model.set_files(image_files[:3])
+        self.request(model, range(3))
+        old_generation = model.generation
+
+        model.set_files(image_files[3:])
+        assert model.pending_count() == 0
+
+        # Результат, отправленный до смены каталога, не попадает в кэш
+        model.on_thumbnail_loaded(image_files[0], old_generation, QImage(4, 4, QImage.Format_RGB888))
+
+        blocker.release()
+        model.pool.waitForDone(2000)
+        assert wait_until(lambda: not model._live)
+        assert not model._cache
+
+        self.request(model, range(2))
+        assert wait_until(lambda: model.pending_count() == 0)
+        assert set(model._cache) == set(image_files[3:])
+
+    def test_undecodable_file_is_not_retried(self, model, tmp_path):
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(b"not an image")
+        model.set_files([str(broken)])
+
+        self.request(model, [0])
+        assert wait_until(lambda: model.pending_count() == 0 and not model._live)
+
+        assert str(broken) in model._failed
+        self.request(model, [0])
+        assert model.pending_count() == 0
+
+
+@pytest.fixture
+def viewer(qapp):
+    """Показанный просмотрщик (растровое отображение)"""
+
+    viewer = ImageViewer()
+    viewer.show()
+    yield viewer
+
+    viewer.close()
+
+
+def numbered_frames(count, shape=(24, 32, 3)):
+    """Кадры, различимые по значению пикселей"""
+
+    return [np.full(shape, index * 10, dtype=np.uint8) for index in range(count)]
+
+
+class TestFrameStreaming:
+    """Отрисовка потоковых кадров с частотой обновления экрана"""
+
+    @pytest.fixture
+    def rendered(self, viewer, monkeypatch):
+        """Кадры, переданные в set_image"""
+
+        frames = []
+        set_image = viewer.set_image
+
+        def recording_set_image(image):
+            frames.append(image)
+            set_image(image)
+
+        monkeypatch.setattr(viewer, "set_image", recording_set_image)
+        return frames
+
+    def test_burst_renders_latest_frame_once(self, viewer, rendered):
+        frames = numbered_frames(10)
+        for frame in frames:
+            viewer.submit_frame(frame)
+
+        # До срабатывания таймера ничего не отрисовано
+        assert rendered == []
+        assert viewer.refresh_timer.isActive()
+
+        assert wait_until(lambda: viewer.frames_rendered == 1)
+        assert rendered == [frames[-1]]
+        assert np.array_equal(viewer.current_image, frames[-1])
+
+        # Следующий тик без нового кадра останавливает таймер
+        assert wait_until(lambda: not viewer.refresh_timer.isActive())
+        assert viewer.get_render_stats() == {
+            'submitted': 10,
+            'rendered': 1,
+            'skipped': 9,
+            'skipped_hidden': 0
+        }
+
+    def test_frames_while_hidden_are_not_rendered(self, viewer, rendered):
+        viewer.hide()
+        frames = numbered_frames(4)
+        for frame in frames:
+            viewer.submit_frame(frame)
+
+        # Скрытый виджет только опрашивает видимость
+        assert wait_until(
+            lambda: viewer.refresh_timer.interval() == ImageViewer.HIDDEN_POLL_INTERVAL)
+        assert rendered == []
+        assert viewer.get_render_stats()['skipped_hidden'] == 3
+
+        viewer.show()
+        assert wait_until(lambda: viewer.frames_rendered == 1)
+        assert rendered == [frames[-1]]
+        assert viewer.get_render_stats()['skipped'] == 3
+
+    def test_set_image_discards_pending_frame(self, viewer, rendered):
+        viewer.submit_frame(numbered_frames(1)[0])
+        still = np.zeros((10, 10, 3), dtype=np.uint8)
+        viewer.set_image(still)
+
+        assert wait_until(lambda: not viewer.refresh_timer.isActive())
+        assert rendered == [still]
+        assert viewer.frames_rendered == 0
+
+
+def gradient_image(height=120, width=160):
+    """Цветной градиент: соседние пиксели различаются"""
+
+    y, x = np.mgrid[0:height, 0:width]
+    return np.dstack([x * 255 // width, y * 255 // height, (x + y) % 256]).astype(np.uint8)
+
+
+def pixmap_array(pixmap):
+    """Пиксели pixmap в массиве RGB"""
+
+    image = pixmap.toImage().convertToFormat(QImage.Format_RGB888)
+    buffer = image.constBits()
+    buffer.setsize(image.byteCount())
+    rows = np.frombuffer(buffer, np.uint8).reshape(image.height(), image.bytesPerLine())
+    return rows[:, :image.width() * 3].reshape(image.height(), image.width(), 3).copy()
+
+
+class TestRegionUpdate:
+    """Частичная перерисовка после локальной обработки"""
+
+    RECTANGLE = {'top_left_x': 30, 'top_left_y': 20, 'width': 50, 'height': 40}
+
+    @pytest.fixture
+    def full_updates(self, window, monkeypatch):
+        """Изображения, показанные через полное обновление (set_image)"""
+
+        images = []
+        set_image = window.image_viewer.set_image
+
+        def recording_set_image(image):
+            images.append(image)
+            set_image(image)
+
+        monkeypatch.setattr(window.image_viewer, "set_image", recording_set_image)
+        return images
+
+    @staticmethod
+    def show(window, image):
+        window.set_current_image(image)
+        window.image_viewer.set_image(window.current_image)
+
+    @staticmethod
+    def reference(image, zoom=1.0):
+        """Просмотрщик, показавший изображение полным обновлением"""
+
+        viewer = ImageViewer()
+        viewer.zoom_factor = zoom
+        viewer.set_image(image)
+        return viewer
+
+    @pytest.mark.parametrize("source", ["array", "roi"])
+    def test_partial_update_matches_full_render(self, window, full_updates, source):
+        image = gradient_image()
+        if source == "roi":
+            image = ImageROI(gradient_image(200, 240), 40, 30, 160, 120)
+        self.show(window, image)
+        full_updates.clear()
+
+        window.process_image('draw_blue_rectangle', self.RECTANGLE)
+
+        region = window.image_processor.last_modified_region
+        assert region is not None
+        assert region[2] * region[3] < 160 * 120
+        assert full_updates == []
+
+        viewer = window.image_viewer
+        expected = self.reference(window.processed_image)
+        assert np.array_equal(pixmap_array(viewer.current_pixmap),
+                              pixmap_array(expected.current_pixmap))
+        assert np.array_equal(pixmap_array(viewer.display_pixmap),
+                              pixmap_array(expected.display_pixmap))
+
+    def test_partial_update_of_scaled_view(self, window, full_updates):
+        self.show(window, gradient_image())
+        window.image_viewer.zoom_factor = 0.5
+        window.image_viewer.update_display(smooth=True)
+        full_updates.clear()
+
+        window.process_image('draw_blue_rectangle', self.RECTANGLE)
+        assert full_updates == []
+
+        viewer = window.image_viewer
+        expected = self.reference(window.processed_image, zoom=0.5)
+        assert np.array_equal(pixmap_array(viewer.current_pixmap),
+                              pixmap_array(expected.current_pixmap))
+
+        # Масштабированная копия перерисована по области с запасом
+        # на ядро сглаживания: отличия - только округление на краях
+        difference = np.abs(pixmap_array(viewer.display_pixmap).astype(int)
+                            - pixmap_array(expected.display_pixmap))
+        assert difference.max() <= 2
+
+    @pytest.mark.parametrize("function_name, parameters", [
+        ('decrease_brightness', {'value': 30}),
+        ('apply_blur', {'kernel_size': 5}),
+        ('rotate_image', {'angle': 90}),
+        ('crop_image', {'x': 10, 'y': 10, 'width': 80, 'height': 60}),
+        ('add_black_border', {'top': 5, 'bottom': 5, 'left': 5, 'right': 5}),
+        ('resize_image', {'new_width': 80, 'new_height': 60}),
+    ])
+    def test_global_operation_updates_whole_image(self, window, full_updates,
+                                                  function_name, parameters):
+        self.show(window, gradient_image())
+        full_updates.clear()
+
+        window.process_image(function_name, parameters)
+
+        processed = window.processed_image
+        region = window.image_processor.last_modified_region
+        assert region is None or region == (0, 0, processed.shape[1], processed.shape[0])
+
+        assert full_updates == [processed]
+        expected = self.reference(processed)
+        assert np.array_equal(pixmap_array(window.image_viewer.current_pixmap),
+                              pixmap_array(expected.current_pixmap))
+
+
+class TestProgressiveZoom:
+    """Быстрый предпросмотр при изменении масштаба и сглаживание после паузы"""
+
+    @pytest.fixture
+    def renders(self, viewer, monkeypatch):
+        """Значения smooth, с которыми выполнялась перерисовка"""
+
+        calls = []
+        update_display = viewer.update_display
+
+        def recording_update_display(smooth=None):
+            calls.append(smooth)
+            update_display(smooth)
+
+        viewer.set_image(gradient_image())
+        monkeypatch.setattr(viewer, "update_display", recording_update_display)
+        return calls
+
+    def test_zoom_burst_renders_preview_then_smooth(self, viewer, renders):
+        for _ in range(5):
+            viewer.zoom_in()
+
+        # Шаги масштаба не перерисовывают изображение сразу
+        assert renders == []
+        assert viewer.zoom_render_timer.isActive()
+        assert viewer.smooth_timer.isActive()
+
+        # Один быстрый предпросмотр в ближайшем цикле событий
+        assert wait_until(lambda: renders)
+        QApplication.processEvents()
+        assert renders == [False]
+
+        assert wait_until(lambda: len(renders) == 2)
+        assert renders == [False, True]
+
+        expected = viewer.current_pixmap.size() * viewer.zoom_factor
+        assert viewer.display_pixmap.size() == expected
+
+        # После сглаживания новых перерисовок нет
+        time.sleep(ImageViewer.SMOOTH_ZOOM_DELAY * 1.5 / 1000)
+        QApplication.processEvents()
+        assert renders == [False, True]
+
+    def test_each_step_delays_smooth_render(self, viewer, renders):
+        delay = ImageViewer.SMOOTH_ZOOM_DELAY / 1000
+
+        viewer.zoom_in()
+        for _ in range(3):
+            # Шаги чаще задержки сглаживания откладывают его
+            time.sleep(delay / 3)
+            QApplication.processEvents()
+            viewer.zoom_in()
+
+        assert True not in renders
+        assert wait_until(lambda: True in renders)
+        assert renders.count(True) == 1
+        assert renders[-1] is True
+        assert 1 <= renders.count(False) <= 4
+
+
+def qimage_array(image):
+    """Пиксели QImage RGB888 или Grayscale8 в массиве (копия)"""
+
+    channels = 3 if image.format() == QImage.Format_RGB888 else 1
+    buffer = image.constBits()
+    buffer.setsize(image.bytesPerLine() * image.height())
+    rows = np.frombuffer(buffer, np.uint8).reshape(image.height(), image.bytesPerLine())
+    pixels = rows[:, :image.width() * channels].reshape(image.height(), image.width(), channels)
+    return pixels.squeeze(axis=2).copy() if channels == 1 else pixels.copy()
+
+
+class TestOpenGLBackend:
+    """Выбор способа отображения и возврат к растровому пути"""
+
+    def test_unavailable_opengl_falls_back_to_raster(self, qapp, monkeypatch):
+        monkeypatch.setattr("gui.image_viewer.opengl_available",
+                            lambda: (False, "нет контекста"))
+
+        viewer = ImageViewer(backend=ImageViewer.BACKEND_AUTO)
+
+        assert viewer.backend == ImageViewer.BACKEND_RASTER
+        assert viewer.gl_canvas is None
+        assert not viewer.scroll_area.isHidden()
+
+        image = gradient_image()
+        viewer.set_image(image)
+        assert np.array_equal(pixmap_array(viewer.current_pixmap), image[:, :, ::-1])
+
+    def test_display_buffers_come_from_pool(self, qapp, monkeypatch):
+        monkeypatch.setattr("gui.image_viewer.opengl_available",
+                            lambda: (True, "OpenGL 2.1"))
+        viewer = ImageViewer(backend=ImageViewer.BACKEND_OPENGL)
+        pool = viewer.buffer_pool
+
+        # Холст без контекста OpenGL не показывается, кадры рисуются вручную
+        monkeypatch.setattr(viewer, "is_displayed", lambda: True)
+
+        # Новый буфер берется до возврата предыдущего: в работе два буфера
+        frames = numbered_frames(12)
+        viewer.set_image(frames[0])
+        viewer.set_image(frames[1])
+        stats = pool.get_stats()
+
+        for frame in frames[2:]:
+            viewer.submit_frame(frame)
+            viewer.render_pending_frame()
+
+        # Кадры одного размера загружаются без выделения памяти
+        after = pool.get_stats()
+        assert after['allocations'] == stats['allocations']
+        assert after['in_use'] == stats['in_use']
+        assert viewer.gl_canvas._buffer is viewer.display_buffer
+        assert np.array_equal(viewer.display_buffer, frames[-1][:, :, ::-1])
+
+        # Частичное обновление берет временный буфер из пула
+        patch = frames[-1].copy()
+        patch[2:6, 3:9] = (10, 20, 30)
+        viewer.update_region(patch, (3, 2, 6, 4))
+        assert pool.get_stats()['in_use'] == stats['in_use']
+        assert (viewer.display_buffer[2:6, 3:9] == (30, 20, 10)).all()
+
+        viewer.clear_image()
+        assert viewer.display_buffer is None
+        assert pool.get_stats()['in_use'] == stats['in_use'] - 1
+
+    def test_gl_failure_switches_to_raster(self, qapp, monkeypatch):
+        monkeypatch.setattr("gui.image_viewer.opengl_available",
+                            lambda: (True, "OpenGL 2.1"))
+
+        viewer = ImageViewer(backend=ImageViewer.BACKEND_OPENGL)
+        assert viewer.backend == ImageViewer.BACKEND_OPENGL
+        assert viewer.scroll_area.isHidden()
+
+        image = gradient_image()
+        viewer.set_image(image)
+        assert viewer.current_pixmap is None
+
+        # Отказ контекста при первой инициализации холста
+        viewer.gl_canvas.gl_failed.emit("контекст OpenGL недействителен")
+
+        assert viewer.backend == ImageViewer.BACKEND_RASTER
+        assert viewer.gl_canvas is None
+        assert not viewer.scroll_area.isHidden()
+        assert np.array_equal(pixmap_array(viewer.current_pixmap), image[:, :, ::-1])
+
+    def test_auto_backend_matches_opengl_availability(self, qapp):
+        available, _ = opengl_available()
+        viewer = ImageViewer(backend=ImageViewer.BACKEND_AUTO)
+
+        expected = ImageViewer.BACKEND_OPENGL if available else ImageViewer.BACKEND_RASTER
+        assert viewer.backend == expected
+
+
+class TestGLImageCanvas:
+    """Тайлы холста OpenGL (без создания контекста)"""
+
+    TILE = 16
+
+    @pytest.fixture
+    def canvas(self, qapp, monkeypatch):
+        monkeypatch.setattr(GLImageCanvas, "TILE_SIZE", self.TILE)
+        return GLImageCanvas()
+
+    def rendered(self, canvas):
+        """Изображение, собранное из тайлов при масштабе 1"""
+
+        # Четный запас по краям: изображение встает на целые пиксели
+        canvas.resize(600 + canvas.image_width % 2, 400 + canvas.image_height % 2)
+        target = QImage(canvas.size(), QImage.Format_RGB888)
+        painter = QPainter(target)
+        canvas.render_view(painter)
+        painter.end()
+
+        origin = canvas.origin()
+        x, y = int(origin.x()), int(origin.y())
+        return qimage_array(target)[y:y + canvas.image_height, x:x + canvas.image_width]
+
+    @pytest.mark.parametrize("shape", [(35, 40, 3), (32, 48, 3), (35, 40)])
+    def test_set_image_tiles_buffer(self, canvas, shape):
+        buffer = np.random.default_rng(1).integers(0, 256, shape, dtype=np.uint8)
+        canvas.set_image(buffer)
+
+        height, width = shape[:2]
+        columns = -(-width // self.TILE)
+        rows = -(-height // self.TILE)
+        assert len(canvas._tiles) == rows * columns
+
+        for x, y, tile in canvas._tiles:
+            assert x % self.TILE == 0 and y % self.TILE == 0
+            assert tile.width() == min(self.TILE, width - x)
+            assert tile.height() == min(self.TILE, height - y)
+            assert np.array_equal(qimage_array(tile), buffer[y:y + self.TILE, x:x + self.TILE])
+
+        if buffer.ndim == 3:
+            assert np.array_equal(self.rendered(canvas), buffer)
+
+    @pytest.mark.parametrize("region, touched", [
+        ((20, 5, 6, 6), {(16, 0)}),
+        ((14, 14, 4, 4), {(0, 0), (16, 0), (0, 16), (16, 16)}),
+        ((32, 32, 8, 3), {(32, 32)}),
+    ])
+    def test_update_region_replaces_touched_tiles(self, canvas, region, touched):
+        buffer = np.zeros((35, 40, 3), dtype=np.uint8)
+        canvas.set_image(buffer)
+        before = {(x, y): tile.cacheKey() for x, y, tile in canvas._tiles}
+
+        x, y, width, height = region
+        patch = np.full((height, width, 3), 200, dtype=np.uint8)
+        canvas.update_region(patch, x, y)
+
+        after = {(tile_x, tile_y): tile.cacheKey() for tile_x, tile_y, tile in canvas._tiles}
+        changed = {key for key in before if before[key] != after[key]}
+        assert changed == touched
+
+        expected = np.zeros_like(buffer)
+        expected[y:y + height, x:x + width] = 200
+        assert np.array_equal(self.rendered(canvas), expected)
@@ -0,0 +1,683 @@
+"""
+Тесты модулей обработки изображений
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from processing.annotations import (
+    DEFAULT_COLOR, DEFAULT_THICKNESS, AnnotationLayer, bounding_region, draw_rectangles
+)
+from processing.blur import BlurEngine
+from processing.buffer_pool import BufferPool, get_buffer_pool, output_buffer
+from processing.canvas import CanvasComposer, fit_to_canvas
+from processing.image_processor import ImageProcessor
+from processing.image_store import ImageStore, image_generation
+from processing.resize import ResizeEngine
+from processing.rgb_channels import RGBProcessor
+from processing.roi import ImageROI, as_array, materialize
+from processing.rotation import RotationEngine
+from processing.statistics import ChannelStatistics
+
+
+@pytest.fixture
+def processor():
+    return ImageProcessor()
+
+
+@pytest.fixture
+def color_batch():
+    """Пакет цветных кадров NxHxWx3"""
+
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (4, 37, 53, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def gray_batch():
+    """Пакет кадров в оттенках серого NxHxW"""
+
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 256, (3, 41, 29), dtype=np.uint8)
+
+
+class TestBatchEquivalence:
+    """Пакетные операции совпадают с поэлементным вызовом"""
+
+    @pytest.mark.parametrize("channel", ['original', 'red', 'green', 'blue', 'unknown'])
+    def test_channel_image(self, processor, color_batch, channel):
+        expected = np.stack([processor.get_channel_image(image, channel) for image in color_batch])
+
+        np.testing.assert_array_equal(processor.get_channel_image_batch(color_batch, channel), expected)
+
+    @pytest.mark.parametrize("channel", ['red', 'green', 'blue', 'unknown'])
+    def test_extract_channel(self, color_batch, channel):
+        expected = np.stack([RGBProcessor.extract_channel(image, channel) for image in color_batch])
+
+        np.testing.assert_array_equal(RGBProcessor.extract_channel_batch(color_batch, channel), expected)
+
+    @pytest.mark.parametrize("value", [0, 17, 50, 100])
+    def test_decrease_brightness(self, processor, color_batch, gray_batch, value):
+        for batch in (color_batch, gray_batch):
+            expected = np.stack([processor.decrease_brightness(image, value) for image in batch])
+
+            np.testing.assert_array_equal(processor.decrease_brightness_batch(batch, value), expected)
+
+    def test_add_black_border(self, processor, color_batch, gray_batch):
+        for batch in (color_batch, gray_batch):
+            expected = np.stack([processor.add_black_border(image, 1, 2, 3, 4) for image in batch])
+
+            np.testing.assert_array_equal(processor.add_black_border_batch(batch, 1, 2, 3, 4), expected)
+
+    @pytest.mark.parametrize("preset", ['auto', 'fast', 'balanced', 'quality', 'pyramid'])
+    @pytest.mark.parametrize("size", [(20, 30), (10, 8), (106, 74), (26, 18)])
+    def test_resize(self, processor, color_batch, gray_batch, preset, size):
+        for batch in (color_batch, gray_batch, gray_batch[:1]):
+            expected = np.stack([processor.resize_image(image, *size, preset) for image in batch])
+
+            np.testing.assert_array_equal(processor.resize_image_batch(batch, *size, preset), expected)
+
+    def test_resize_exact_halving(self, processor):
+        """Точное уменьшение вдвое не упаковывается в каналы"""
+
+        batch = np.random.default_rng(2).integers(0, 256, (5, 40, 60, 4), dtype=np.uint8)
+        expected = np.stack([processor.resize_image(image, 30, 20, 'balanced') for image in batch])
+
+        np.testing.assert_array_equal(processor.resize_image_batch(batch, 30, 20, 'balanced'), expected)
+
+    def test_crop(self, processor, color_batch):
+        expected = np.stack([np.asarray(processor.crop_image(image, 5, 7, 20, 11))
+                             for image in color_batch])
+
+        np.testing.assert_array_equal(processor.crop_image_batch(color_batch, 5, 7, 20, 11), expected)
+
+    def test_out_buffer(self, processor, color_batch):
+        """Результат записывается в переданный буфер"""
+
+        out = np.empty_like(color_batch)
+        result = processor.get_channel_image_batch(color_batch, 'red', out=out)
+
+        assert result is out
+        np.testing.assert_array_equal(out, processor.get_channel_image_batch(color_batch, 'red'))
+
+
+class TestChannelStatistics:
+    """Инкрементное обновление статистики"""
+
+    def test_update_region_matches_full_compute(self):
+        store = ImageStore()
+        rng = np.random.default_rng(2)
+        base = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+        changed = base.copy()
+        changed[30:60, 40:90] = rng.integers(0, 256, (30, 50, 3), dtype=np.uint8)
+
+        base_handle = store.put(base)
+        changed_handle = store.put(changed)
+
+        statistics = ChannelStatistics()
+        statistics.compute(base_handle, exact=True)
+
+        # Базовое изображение известно - полный расчет не нужен
+        statistics.compute = lambda *args, **kwargs: pytest.fail("выполнен полный расчет")
+        incremental = statistics.update_region(changed_handle, base_handle, 40, 30, 50, 30)
+
+        np.testing.assert_equal(incremental, ChannelStatistics().compute(changed, exact=True))
+
+    def test_update_region_without_generation_recomputes(self):
+        """Для массивов вне хранилища выполняется полный точный расчет"""
+
+        rng = np.random.default_rng(3)
+        base = rng.integers(0, 256, (50, 60), dtype=np.uint8)
+        changed = base.copy()
+        changed[:10] = 0
+
+        statistics = ChannelStatistics()
+        statistics.compute(base, exact=True)
+
+        np.testing.assert_equal(statistics.update_region(changed, base, 0, 0, 60, 10),
+                                ChannelStatistics().compute(changed, exact=True))
+
+    def test_exact_histograms_in_strips(self):
+        """Расчет полосами совпадает с подсчетом по всему изображению"""
+
+        rng = np.random.default_rng(4)
+        image = rng.integers(0, 256, (300, 200, 3), dtype=np.uint8)
+
+        original_chunk = ChannelStatistics.HISTOGRAM_CHUNK_PIXELS
+        ChannelStatistics.HISTOGRAM_CHUNK_PIXELS = 1000
+        try:
+            histograms = ChannelStatistics.exact_histograms(image)
+        finally:
+            ChannelStatistics.HISTOGRAM_CHUNK_PIXELS = original_chunk
+
+        for c in range(3):
+            np.testing.assert_array_equal(histograms[c],
+                                          np.bincount(image[:, :, c].ravel(), minlength=256))
+
+
+class TestImageROI:
+    """Области интереса без копирования"""
+
+    def test_view_shares_parent_buffer(self):
+        image = np.arange(60 * 80 * 3, dtype=np.uint32).reshape(60, 80, 3).astype(np.uint8)
+        roi = ImageROI(image, 10, 5, 30, 20)
+        view = as_array(roi)
+
+        assert roi.shape == (20, 30, 3)
+        assert np.shares_memory(view, image)
+        assert not view.flags.writeable
+        np.testing.assert_array_equal(view, image[5:25, 10:40])
+
+    def test_nested_roi_refers_to_root(self):
+        image = np.zeros((60, 80), dtype=np.uint8)
+        nested = ImageROI(ImageROI(image, 10, 5, 30, 20), 2, 3, 4, 5)
+
+        assert nested.parent is image
+        assert (nested.x, nested.y) == (12, 8)
+
+    def test_materialize_copies(self):
+        image = np.random.default_rng(5).integers(0, 256, (40, 50, 3), dtype=np.uint8)
+        copy = materialize(ImageROI(image, 1, 2, 10, 20))
+
+        assert copy.flags.c_contiguous and copy.flags.writeable
+        assert not np.shares_memory(copy, image)
+        np.testing.assert_array_equal(copy, image[2:22, 1:11])
+
+        # Непрерывный массив возвращается без копирования
+        assert materialize(image) is image
+
+    def test_out_of_bounds(self):
+        with pytest.raises(ValueError):
+            ImageROI(np.zeros((10, 10), dtype=np.uint8), 5, 5, 6, 2)
+
+    def test_crop_image_returns_roi(self, processor):
+        image = np.zeros((40, 50, 3), dtype=np.uint8)
+        cropped = processor.crop_image(image, 3, 4, 10, 12)
+
+        assert isinstance(cropped, ImageROI)
+        assert np.shares_memory(np.asarray(cropped), image)
+
+
+class TestRotationEngine:
+    """Поворот изображений"""
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(11).integers(0, 256, (31, 47, 3), dtype=np.uint8)
+
+    @pytest.mark.parametrize("angle, turns", [(0, 0), (90, 1), (180, 2), (270, -1),
+                                              (-90, -1), (450.0, 1)])
+    def test_right_angles_are_exact(self, image, angle, turns):
+        rotated = RotationEngine().rotate(image, angle)
+
+        np.testing.assert_array_equal(rotated, np.rot90(image, turns))
+
+    def test_right_angle_out_buffer(self, image):
+        engine = RotationEngine()
+        out = np.empty((47, 31, 3), dtype=np.uint8)
+
+        assert engine.rotate(image, 90, out=out) is out
+        np.testing.assert_array_equal(out, np.rot90(image))
+
+        with pytest.raises(ValueError):
+            engine.rotate(image, 90, out=np.empty_like(image))
+
+    def test_expand_covers_corners(self):
+        image = np.full((40, 100), 255, dtype=np.uint8)
+        rotated = RotationEngine().rotate(image, 30, expand=True,
+                                          interpolation=cv2.INTER_NEAREST)
+
+        angle = np.deg2rad(30)
+        expected = (int(np.ceil(100 * np.sin(angle) + 40 * np.cos(angle))),
+                    int(np.ceil(40 * np.sin(angle) + 100 * np.cos(angle))))
+        assert rotated.shape == expected
+
+        # Углы исходного изображения не обрезаются: сумма пикселей сохраняется
+        assert abs(int(rotated.astype(np.int64).sum()) - 255 * 40 * 100) < 255 * 100
+
+        cropped = RotationEngine().rotate(image, 30)
+        assert cropped.shape == image.shape
+        assert cropped.astype(np.int64).sum() < rotated.astype(np.int64).sum()
+
+    def test_transform_cache(self, image):
+        engine = RotationEngine(cache_size=2)
+        for _ in range(3):
+            engine.rotate(image, 15)
+
+        assert (engine.cache_misses, engine.cache_hits) == (1, 2)
+
+        engine.rotate(image, 20)
+        engine.rotate(image, 25)
+        engine.rotate(image, 15)
+        assert engine.cache_misses == 4
+
+    def test_remap_matches_warp_affine(self):
+        # Плавный градиент: расхождения сводятся к округлению интерполяции
+        ys, xs = np.mgrid[0:31, 0:47]
+        image = (xs * 3 + ys * 2).astype(np.uint8)
+
+        remapped = RotationEngine().rotate(image, 33, expand=True)
+
+        engine = RotationEngine()
+        engine.REMAP_MAX_PIXELS = 0
+        warped = engine.rotate(image, 33, expand=True)
+
+        assert engine.get_transform(47, 31, 33, True)['maps'] is None
+        difference = np.abs(remapped.astype(np.int16) - warped)
+        # На краях, смешанных с фоном, округление заметнее
+        assert difference.max() <= 3
+        assert np.mean(difference > 1) < 0.02
+
+
+class TestBlurEngine:
+    """Размытие с оценкой ошибки"""
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(13).integers(0, 256, (192, 256, 3), dtype=np.uint8)
+
+    @pytest.mark.parametrize("kernel_size", [3, 5])
+    def test_small_kernels_use_exact(self, kernel_size):
+        engine = BlurEngine()
+
+        assert engine.choose_mode(kernel_size) == 'exact'
+        assert (engine.estimate_cost(kernel_size, 'exact')
+                < engine.estimate_cost(kernel_size, 'separable'))
+
+    @pytest.mark.parametrize("kernel_size", [3, 7, 15, 31, 51])
+    @pytest.mark.parametrize("mode", ['exact', 'separable', 'box', 'pyramid'])
+    def test_error_within_bound(self, image, kernel_size, mode):
+        engine = BlurEngine()
+        reference = cv2.GaussianBlur(image, (kernel_size, kernel_size), 0)
+        result = engine.blur(image, kernel_size, mode)
+
+        report = engine.last_report
+        if mode == 'exact':
+            assert report['l1_error'] == 0.0
+
+        # Оценка построена по импульсному отклику вдали от краев;
+        # допуск в два уровня - округление целочисленного cv2.GaussianBlur
+        margin = kernel_size
+        difference = np.abs(result.astype(np.int16) - reference)[margin:-margin, margin:-margin]
+        assert difference.max() <= report['max_abs_error'] + 2
+
+    @pytest.mark.parametrize("kernel_size", [3, 9, 21, 51])
+    def test_auto_respects_max_error(self, image, kernel_size):
+        engine = BlurEngine(max_error=0.05)
+        engine.blur(image, kernel_size)
+
+        assert engine.last_report['l1_error'] <= 0.05
+
+    def test_out_buffer(self, image):
+        out = np.empty_like(image)
+
+        assert BlurEngine().blur(image, 9, 'box', out=out) is out
+        with pytest.raises(ValueError):
+            BlurEngine().blur(image, 9, 'unknown')
+
+
+class TestAnnotations:
+    """Пакетное рисование прямоугольников"""
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(17).integers(0, 256, (90, 120, 3), dtype=np.uint8)
+
+    @pytest.fixture
+    def rectangles(self):
+        rng = np.random.default_rng(18)
+        rectangles = np.column_stack([rng.integers(0, 110, 40), rng.integers(0, 80, 40),
+                                      rng.integers(1, 40, 40), rng.integers(1, 30, 40)])
+        # Прямоугольники, выходящие за края изображения
+        return np.vstack([rectangles, [[-10, -5, 30, 20], [100, 70, 50, 50], [-3, 40, 200, 2]]])
+
+    @staticmethod
+    def draw_loop(image, rectangles, colors, thicknesses):
+        expected = image.copy()
+        for (x, y, width, height), color, thickness in zip(rectangles, colors, thicknesses):
+            color = int(color[0]) if expected.ndim == 2 else tuple(int(c) for c in color)
+            cv2.rectangle(expected, (int(x), int(y)), (int(x + width), int(y + height)),
+                          color, int(thickness))
+        return expected
+
+    def test_matches_per_rectangle_loop(self, image, rectangles):
+        colors = np.random.default_rng(19).integers(0, 256, (len(rectangles), 3))
+        thicknesses = np.tile([1, 2, 3, -1], len(rectangles))[:len(rectangles)]
+
+        result = draw_rectangles(image, rectangles, colors, thicknesses)
+
+        np.testing.assert_array_equal(result, self.draw_loop(image, rectangles, colors,
+                                                             thicknesses))
+        assert result is not image
+
+    def test_gray_and_defaults(self, image, rectangles):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        colors = np.broadcast_to(DEFAULT_COLOR, (len(rectangles), 3))
+        thicknesses = np.full(len(rectangles), DEFAULT_THICKNESS)
+
+        np.testing.assert_array_equal(draw_rectangles(gray, rectangles),
+                                      self.draw_loop(gray, rectangles, colors, thicknesses))
+
+    def test_out_buffer(self, image, rectangles):
+        out = np.empty_like(image)
+        source = image.copy()
+
+        assert draw_rectangles(image, rectangles, out=out) is out
+        np.testing.assert_array_equal(image, source)
+
+        # Рисование на месте
+        assert draw_rectangles(source, rectangles, out=source) is source
+        np.testing.assert_array_equal(source, out)
+
+        with pytest.raises(ValueError):
+            draw_rectangles(image, [[0, 0, 0, 5]])
+
+    def test_bounding_region_covers_changes(self, image, rectangles):
+        thicknesses = np.tile([1, 3, 5], len(rectangles))[:len(rectangles)]
+        background = np.zeros(image.shape[:2], dtype=np.uint8)
+        changed = draw_rectangles(background, rectangles, colors=(255, 255, 255),
+                                  thicknesses=thicknesses) > 0
+
+        x, y, width, height = bounding_region(rectangles, thicknesses)
+        inside = np.zeros_like(changed)
+        inside[max(0, y):max(0, y + height), max(0, x):max(0, x + width)] = True
+
+        assert changed.any()
+        assert not (changed & ~inside).any()
+        assert bounding_region(np.empty((0, 4))) is None
+
+    def test_layer_does_not_modify_image(self, image, rectangles):
+        layer = AnnotationLayer()
+        layer.add_rectangles(rectangles[:10], colors=(0, 0, 255))
+        layer.add_rectangles(rectangles[10:], thicknesses=-1)
+        source = image.copy()
+
+        rendered = layer.render(image)
+
+        np.testing.assert_array_equal(image, source)
+        assert len(layer) == len(rectangles)
+        np.testing.assert_array_equal(
+            rendered, draw_rectangles(image, layer.rectangles, layer.colors, layer.thicknesses))
+        assert layer.region() == bounding_region(layer.rectangles, layer.thicknesses)
+
+        layer.visible = False
+        layer.set_rectangles(rectangles[:1])
+        assert len(layer) == 1 and not layer.visible
+
+        layer.clear()
+        assert len(layer) == 0 and layer.region() is None
+
+
+class TestCanvasComposer:
+    """Композиция кадров на холст"""
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(21).integers(0, 256, (100, 200, 3), dtype=np.uint8)
+
+    @pytest.mark.parametrize("size, fit, expected", [
+        ((200, 100), 'contain', {'source': (0, 0, 200, 100), 'target': (0, 25, 100, 50),
+                                 'bars': 'letterbox'}),
+        ((100, 200), 'contain', {'source': (0, 0, 100, 200), 'target': (25, 0, 50, 100),
+                                 'bars': 'pillarbox'}),
+        ((200, 100), 'cover', {'source': (50, 0, 100, 100), 'target': (0, 0, 100, 100),
+                               'bars': None}),
+        ((200, 100), 'stretch', {'source': (0, 0, 200, 100), 'target': (0, 0, 100, 100),
+                                 'bars': None}),
+        ((50, 50), 'contain', {'source': (0, 0, 50, 50), 'target': (0, 0, 100, 100),
+                               'bars': None}),
+    ])
+    def test_layout(self, size, fit, expected):
+        assert CanvasComposer.compute_layout(*size, 100, 100, fit) == expected
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            CanvasComposer(0, 10)
+        with pytest.raises(ValueError):
+            CanvasComposer(10, 10, fit='zoom')
+
+    def test_contain_fills_bars(self, image):
+        composer = CanvasComposer(100, 100, border_color=7)
+        canvas = composer.compose(image)
+
+        assert canvas.shape == (100, 100, 3)
+        assert (canvas[:25] == 7).all() and (canvas[75:] == 7).all()
+        np.testing.assert_array_equal(canvas[25:75], ResizeEngine().resize(image, 100, 50))
+
+    def test_cover_crops_center(self, image):
+        canvas = CanvasComposer(100, 100, fit='cover').compose(image)
+
+        np.testing.assert_array_equal(canvas, image[:, 50:150])
+
+    def test_internal_buffer_reuse(self, image):
+        composer = CanvasComposer(100, 100, border_color=7)
+        first = composer.compose(image)
+        second = composer.compose(image[::-1].copy())
+
+        assert second is first
+
+        # Смена геометрии перезаливает полосы
+        tall = np.full((200, 100, 3), 200, dtype=np.uint8)
+        third = composer.compose(tall)
+        assert third is first
+        assert (third[:, :25] == 7).all() and (third[:, 25:75] == 200).all()
+        assert (third[:, 75:] == 7).all()
+
+    def test_non_contiguous_out_view(self, image):
+        mosaic = np.full((150, 300, 3), 99, dtype=np.uint8)
+        out = mosaic[10:110, 20:220]
+        assert not out.flags.c_contiguous
+
+        result = CanvasComposer(200, 100, fit='contain').compose(image[:, :150], out=out)
+
+        assert result is out
+        np.testing.assert_array_equal(out, fit_to_canvas(image[:, :150], 200, 100))
+        # Пиксели вне области холста не затронуты
+        assert (mosaic[:10] == 99).all() and (mosaic[110:] == 99).all()
+        assert (mosaic[:, :20] == 99).all() and (mosaic[:, 220:] == 99).all()
+
+        with pytest.raises(ValueError):
+            CanvasComposer(200, 100).compose(image, out=mosaic[:100, :100])
+
+    def test_processor_reuses_composer(self, processor, image):
+        first = processor.fit_to_canvas(image, 120, 80)
+        composer = processor.get_canvas_composer(120, 80)
+        second = processor.fit_to_canvas(image, 120, 80)
+
+        assert second is not first
+        np.testing.assert_array_equal(second, first)
+        assert processor.get_canvas_composer(120, 80) is composer
+        np.testing.assert_array_equal(first, fit_to_canvas(image, 120, 80))
+
+        out = np.empty_like(first)
+        assert processor.fit_to_canvas(image, 120, 80, out=out) is out
+
+        for width in range(10, 10 + 2 * processor.CANVAS_CACHE_SIZE):
+            processor.fit_to_canvas(image, width, 80)
+        assert len(processor._canvas_composers) == processor.CANVAS_CACHE_SIZE
+
+
+class TestBufferPool:
+    """Пул буферов и проверка буферов результата"""
+
+    @pytest.mark.parametrize("out", [
+        np.empty((10, 20, 3), dtype=np.uint8),
+        np.empty((20, 10, 3), dtype=np.uint8),
+        np.empty((10, 20), dtype=np.uint8),
+        np.empty((10, 20, 3), dtype=np.float32),
+    ])
+    def test_output_buffer_rejects_mismatch(self, out):
+        with pytest.raises(ValueError):
+            output_buffer(out, (10, 20, 4), np.uint8)
+
+    def test_output_buffer(self):
+        out = np.empty((10, 20, 3), dtype=np.uint8)
+        assert output_buffer(out, [10, 20, 3], 'uint8') is out
+
+        created = output_buffer(None, (10, 20), np.float32)
+        assert created.shape == (10, 20)
+        assert created.dtype == np.float32
+
+    def test_acquire_reuses_released_buffer(self):
+        pool = BufferPool()
+        first = pool.acquire((4, 4), np.uint8)
+        pool.release(first)
+        second = pool.acquire((4, 4), np.uint8)
+
+        assert second is first
+        stats = pool.get_stats()
+        assert (stats['allocations'], stats['reuses'], stats['in_use']) == (1, 1, 1)
+
+        pool.release(second)
+        with pytest.raises(ValueError):
+            pool.release(second)
+        with pytest.raises(ValueError):
+            pool.release(np.empty((4, 4), dtype=np.uint8))
+
+    def test_free_buffers_are_limited(self):
+        pool = BufferPool(max_free_per_key=2, max_free_bytes=100)
+        buffers = [pool.acquire((4, 4)) for _ in range(3)]
+        for buffer in buffers:
+            pool.release(buffer)
+        assert pool.get_stats()['keys'][pool.make_key((4, 4), np.uint8)]['free'] == 2
+
+        # Буфер больше лимита свободной памяти не удерживается
+        pool.release(pool.acquire((20, 20)))
+        assert pool.get_stats()['free_bytes'] == 32
+
+    def test_fit_to_canvas_rejects_mismatched_out(self, processor):
+        image = np.zeros((100, 200, 3), dtype=np.uint8)
+
+        with pytest.raises(ValueError):
+            processor.fit_to_canvas(image, 120, 80, out=np.empty((80, 120, 3), np.float32))
+        with pytest.raises(ValueError):
+            processor.fit_to_canvas(image, 120, 80, out=np.empty((120, 80, 3), np.uint8))
+        with pytest.raises(ValueError):
+            fit_to_canvas(image, 120, 80, out=np.empty((80, 120), np.uint8))
+
+    def test_streamed_canvas_allocations_are_flat(self, processor):
+        pool = get_buffer_pool()
+        frames = np.random.default_rng(3).integers(0, 256, (12, 60, 90, 3), dtype=np.uint8)
+
+        def show(frame):
+            with pool.borrowed((80, 120, 3)) as out:
+                result = processor.fit_to_canvas(frame, 120, 80, out=out)
+                assert result is out
+                return result.copy()
+
+        show(frames[0])
+        stats = pool.get_stats()
+
+        results = [show(frame) for frame in frames]
+
+        after = pool.get_stats()
+        assert after['allocations'] == stats['allocations']
+        assert after['reuses'] == stats['reuses'] + len(frames)
+        assert after['in_use'] == stats['in_use']
+        np.testing.assert_array_equal(results[-1], fit_to_canvas(frames[-1], 120, 80))
+
+
+class TestImageStore:
+    """Хранилище неизменяемых изображений"""
+
+    @pytest.fixture
+    def store(self):
+        return ImageStore()
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(6).integers(0, 256, (40, 50, 3), dtype=np.uint8)
+
+    def test_owned_array_is_frozen_in_place(self, store, image):
+        handle = store.put(image)
+
+        assert handle.array is image
+        assert not image.flags.writeable
+        with pytest.raises(ValueError):
+            image[0, 0] = 0
+
+    def test_view_of_writable_array_is_copied(self, store, image):
+        expected = image[5:25].copy()
+        handle = store.put(image[5:25])
+
+        # Родительский буфер остается изменяемым, хранимые пиксели - нет
+        assert image.flags.writeable
+        assert not np.shares_memory(handle.array, image)
+        assert not handle.array.flags.writeable
+        image[5:25] = 0
+        np.testing.assert_array_equal(handle.array, expected)
+
+    def test_roi_of_writable_parent_is_copied(self, store, image):
+        expected = image[2:22, 1:11].copy()
+        handle = store.put(ImageROI(image, 1, 2, 10, 20))
+
+        image.fill(0)
+        assert handle.shape == (20, 10, 3)
+        np.testing.assert_array_equal(handle.array, expected)
+
+    def test_roi_of_stored_image_shares_buffer(self, store, image):
+        parent = store.put(image)
+        handle = store.put(ImageROI(parent, 1, 2, 10, 20))
+
+        assert np.shares_memory(handle.array, parent.array)
+        assert not handle.array.flags.writeable
+        assert handle.generation != parent.generation
+        assert store.get_stats()['images'] == 2
+
+    def test_retain_release_refcount(self, store, image):
+        handle = store.put(image)
+        assert store.put(image) is handle
+        assert handle.retain() is handle
+        assert handle.refcount == 3
+
+        handle.release()
+        handle.release()
+        assert store.get(handle.generation) is handle
+        assert store.get_stats()['bytes'] == image.nbytes
+
+        handle.release()
+        assert handle.refcount == 0
+        assert store.get_stats() == {'images': 0, 'bytes': 0, 'peak_bytes': image.nbytes}
+
+        with pytest.raises(ValueError):
+            handle.release()
+        with pytest.raises(ValueError):
+            handle.retain()
+
+    def test_generation_invalidation(self, store, image):
+        first = store.put(image)
+        generation = first.generation
+        assert image_generation(first) == generation
+        assert image_generation(image) is None
+        assert image_generation(ImageROI(first, 0, 0, 5, 5)) is None
+
+        first.release()
+        assert store.get(generation) is None
+
+        # Повторное помещение того же массива - новое поколение
+        second = store.put(image)
+        assert second is not first
+        assert second.generation > generation
+        assert store.get(second.generation) is second
+
+    @pytest.mark.parametrize("wrap", ["handle", "roi"])
+    def test_array_protocol_copy(self, store, image, wrap):
+        handle = store.put(image)
+        source = handle if wrap == "handle" else ImageROI(handle, 0, 0, 50, 40)
+
+        view = np.asarray(source)
+        assert np.shares_memory(view, image)
+        assert np.shares_memory(np.array(source, copy=False), image)
+
+        copy = np.array(source, copy=True)
+        assert not np.shares_memory(copy, image)
+        assert copy.flags.writeable
+        np.testing.assert_array_equal(copy, image)
+
+        converted = np.asarray(source, dtype=np.float32)
+        assert converted.dtype == np.float32
+        np.testing.assert_array_equal(converted, image)
+
+        with pytest.raises(ValueError):
+            np.array(source, dtype=np.float32, copy=False)
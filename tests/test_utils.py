@@ -0,0 +1,315 @@
+"""
+Тесты вспомогательных модулей: логирование, кэши изображений
+"""
+
+import os
+import json
+import logging
+import threading
+
+import numpy as np
+import pytest
+
+from utils import error_handler
+from utils.error_handler import RateLimitFilter, setup_logging, shutdown_logging
+from utils.image_cache import DecodedImageCache, ImagePrefetcher
+from utils.profiler import OperationStats, Profiler, get_profiler, profiled
+from utils.thumbnail_cache import ThumbnailCache
+
+
+def make_record(msg, *args, name="test", level=logging.ERROR):
+    """Запись лога с заданным шаблоном и аргументами"""
+
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class TestRateLimitFilter:
+    """Схлопывание повторяющихся сообщений"""
+
+    def test_repeated_exception_arguments_are_collapsed(self):
+        """Разные объекты исключений с одинаковым текстом считаются повтором"""
+
+        log_filter = RateLimitFilter(interval=60.0)
+
+        passed = [log_filter.filter(make_record("Ошибка кадра: %s", ValueError("нет кадра")))
+                  for _ in range(10)]
+
+        assert passed == [True] + [False] * 9
+
+    def test_different_arguments_are_not_collapsed(self):
+        """Сообщения с разным текстом аргументов пропускаются"""
+
+        log_filter = RateLimitFilter(interval=60.0)
+
+        assert log_filter.filter(make_record("Кадр %s", 1))
+        assert log_filter.filter(make_record("Кадр %s", 2))
+
+    def test_flush_reports_suppressed_count(self):
+        """flush() возвращает итог последней серии повторов один раз"""
+
+        log_filter = RateLimitFilter(interval=60.0)
+        for _ in range(5):
+            log_filter.filter(make_record("Ошибка: %s", "таймаут"))
+
+        records = log_filter.flush()
+
+        assert len(records) == 1
+        assert "повторов подавлено: 4" in records[0].getMessage()
+        assert log_filter.flush() == []
+
+
+def test_shutdown_logging_flushes_and_detaches(tmp_path, monkeypatch):
+    """Остановка логирования записывает итоги и отключает обработчик очереди"""
+
+    monkeypatch.chdir(tmp_path)
+    root_logger = logging.getLogger()
+    previous_level = root_logger.level
+
+    setup_logging(rate_limit_interval=60.0)
+    try:
+        queue_handler = error_handler._queue_handler
+        assert queue_handler in root_logger.handlers
+
+        logger = logging.getLogger("tests.burst")
+        for _ in range(20):
+            logger.error("Ошибка камеры: %s", RuntimeError("кадр не получен"))
+    finally:
+        shutdown_logging()
+        root_logger.setLevel(previous_level)
+
+    assert queue_handler not in root_logger.handlers
+    assert error_handler._queue_handler is None
+
+    log_text = "".join(path.read_text(encoding="utf-8") for path in (tmp_path / "logs").iterdir())
+    assert log_text.count("Ошибка камеры: кадр не получен") == 2
+    assert "повторов подавлено: 19" in log_text
+
+
+def write_file(path, data=b"image"):
+    """Файл-источник записи кэша"""
+
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestDecodedImageCache:
+    """LRU кэш декодированных изображений"""
+
+    def test_hit_miss_and_readonly(self, tmp_path):
+        cache = DecodedImageCache()
+        path = write_file(tmp_path / "a.png")
+        image = np.zeros((4, 5, 3), dtype=np.uint8)
+
+        assert cache.get(path) is None
+        cache.put(path, image)
+
+        assert cache.get(path) is image
+        assert not image.flags.writeable
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_changed_file_misses(self, tmp_path):
+        cache = DecodedImageCache()
+        path = write_file(tmp_path / "a.png")
+        cache.put(path, np.zeros((4, 4), dtype=np.uint8))
+
+        write_file(tmp_path / "a.png", b"changed image")
+
+        assert cache.get(path) is None
+        assert not cache.contains(path)
+
+    def test_lru_eviction_by_bytes(self, tmp_path):
+        cache = DecodedImageCache(max_bytes=250)
+        paths = [write_file(tmp_path / f"{index}.png") for index in range(3)]
+
+        cache.put(paths[0], np.zeros(100, dtype=np.uint8))
+        cache.put(paths[1], np.zeros(100, dtype=np.uint8))
+        cache.get(paths[0])
+        cache.put(paths[2], np.zeros(100, dtype=np.uint8))
+
+        assert cache.contains(paths[0]) and cache.contains(paths[2])
+        assert not cache.contains(paths[1])
+        assert cache.total_bytes == 200
+
+        # Изображение больше лимита не кэшируется
+        cache.put(paths[1], np.zeros(300, dtype=np.uint8))
+        assert not cache.contains(paths[1])
+
+    def test_prefetcher_skips_cached(self, tmp_path):
+        cache = DecodedImageCache()
+        paths = [write_file(tmp_path / f"{index}.png") for index in range(3)]
+        cache.put(paths[0], np.zeros(4, dtype=np.uint8))
+
+        loaded = []
+        done = threading.Event()
+
+        def load(path):
+            loaded.append(path)
+            cache.put(path, np.zeros(4, dtype=np.uint8))
+            if len(loaded) == 2:
+                done.set()
+
+        prefetcher = ImagePrefetcher(load, cache)
+        prefetcher.start()
+        try:
+            prefetcher.prefetch(paths)
+            assert done.wait(5.0)
+        finally:
+            prefetcher.stop()
+
+        assert loaded == paths[1:]
+
+
+class TestThumbnailCache:
+    """Дисковый кэш превью"""
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(3).integers(0, 256, (300, 800, 3), dtype=np.uint8)
+
+    def test_round_trip(self, tmp_path, image):
+        cache = ThumbnailCache(tmp_path / "cache", preview_size=128)
+        path = write_file(tmp_path / "photo.jpg")
+
+        assert cache.get(path) is None
+        preview = cache.put(path, image)
+
+        assert preview.shape == (48, 128, 3)
+        assert cache.contains(path)
+
+        cached, metadata = cache.get(path)
+        assert cached.shape == preview.shape
+        assert (metadata['width'], metadata['height'], metadata['channels']) == (800, 300, 3)
+        assert metadata['format'] == 'JPG'
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Новый экземпляр находит записи на диске
+        reopened = ThumbnailCache(tmp_path / "cache", preview_size=128)
+        assert reopened.get(path) is not None
+
+    def test_changed_file_misses(self, tmp_path, image):
+        cache = ThumbnailCache(tmp_path / "cache")
+        path = write_file(tmp_path / "photo.jpg")
+        cache.put(path, image)
+
+        write_file(tmp_path / "photo.jpg", b"changed image")
+
+        assert not cache.contains(path)
+        assert cache.get(path) is None
+
+    def test_eviction_keeps_recent(self, tmp_path, image):
+        cache = ThumbnailCache(tmp_path / "cache", preview_size=64)
+        paths = [write_file(tmp_path / f"{index}.jpg", bytes([index])) for index in range(3)]
+
+        # Время доступа задается явно, индекс перечитывается с диска
+        for index, path in enumerate(paths[:2]):
+            cache.put(path, image)
+            preview_path = cache._paths(cache.make_key(path))[0]
+            os.utime(preview_path, (1000 + index, 1000 + index))
+        cache._entries = None
+
+        # Чтение обновляет время доступа первой записи
+        cache.get(paths[0])
+
+        # Лимит вмещает две записи: третья вытесняет давно не использованную
+        cache.max_bytes = cache.total_bytes + 10
+        cache.put(paths[2], image)
+
+        assert cache.contains(paths[0]) and cache.contains(paths[2])
+        assert not cache.contains(paths[1])
+        assert cache.total_bytes <= cache.max_bytes
+        assert not list((tmp_path / "cache").glob("*.tmp"))
+
+    def test_corrupted_preview_is_miss(self, tmp_path, image):
+        cache = ThumbnailCache(tmp_path / "cache")
+        path = write_file(tmp_path / "photo.jpg")
+        cache.put(path, image)
+
+        cache._paths(cache.make_key(path))[0].write_bytes(b"not a jpeg")
+
+        assert cache.get(path) is None
+        assert cache.misses == 1
+
+
+class TestProfiler:
+    """Замеры операций и экспорт профиля"""
+
+    def test_percentiles_on_known_durations(self):
+        profiler = Profiler()
+        for duration_us in range(1, 101):
+            profiler.record("op", "processing", 0, duration_us * 1000)
+
+        summary = profiler.get_summary()["op"]
+
+        assert summary['count'] == 100
+        assert summary['mean_us'] == pytest.approx(50.5)
+        assert (summary['p50_us'], summary['p95_us'], summary['max_us']) == (51, 96, 100)
+
+    def test_histogram_buckets(self):
+        profiler = Profiler()
+        for duration_us in range(1, 101):
+            profiler.record("op", "processing", 0, duration_us * 1000)
+
+        histogram = dict(profiler.get_histogram("op"))
+
+        # Корзина с верхней границей 2^k содержит длительности (2^(k-1), 2^k]
+        assert [histogram[edge] for edge in (1, 2, 4, 8, 16, 32, 64, 128)] == \
+            [1, 1, 2, 4, 8, 16, 32, 36]
+        assert histogram[None] == 0
+        assert profiler.get_histogram("missing") == []
+
+    def test_window_evicts_from_histogram(self):
+        stats = OperationStats(window_size=4)
+        for duration_us in (1, 1000, 1000, 1000, 1000):
+            stats.add(duration_us, nbytes=duration_us)
+
+        assert sum(stats.histogram) == 4
+        assert stats.histogram[0] == 0
+        assert stats.summary()['count'] == 5
+        assert stats.summary()['max_bytes'] == 1000
+
+    def test_profiled_records_result_size(self):
+        @profiled(name="tests.profiled", category="processing")
+        def make_image():
+            return np.zeros((10, 20), dtype=np.uint8)
+
+        profiler = get_profiler()
+        before = profiler.get_summary().get("tests.profiled", {'count': 0})['count']
+        make_image()
+
+        summary = profiler.get_summary()["tests.profiled"]
+        assert summary['count'] == before + 1
+        assert summary['last_bytes'] == 200
+
+    def test_measure_and_frame_breakdown(self):
+        profiler = Profiler()
+        with profiler.measure("camera.read", "camera") as info:
+            info['bytes'] = 123
+        profiler.mark_frame()
+
+        assert list(profiler.get_last_frame_breakdown()) == ["camera.read"]
+        assert profiler.get_summary()["camera.read"]['last_bytes'] == 123
+        assert profiler.format_last_frame().startswith("Кадр ")
+
+        profiler.enabled = False
+        with profiler.measure("disabled"):
+            pass
+        assert "disabled" not in profiler.get_summary()
+
+    def test_export_chrome_trace(self, tmp_path):
+        profiler = Profiler()
+        profiler.record("render", "render", profiler._origin_ns + 5_000_000, 1_500_000, 64)
+        profiler.record("read", "camera", profiler._origin_ns + 7_250_500, 250_000)
+
+        path = tmp_path / "trace.json"
+        profiler.export_chrome_trace(str(path))
+        trace = json.loads(path.read_text(encoding="utf-8"))
+
+        events = trace['traceEvents']
+        assert len(events) == 2
+        assert all(event['ph'] == "X" for event in events)
+        assert all({'name', 'cat', 'ts', 'dur', 'pid', 'tid'} <= set(event) for event in events)
+
+        # Время в микросекундах от начала профиля
+        assert (events[0]['ts'], events[0]['dur']) == (5000.0, 1500.0)
+        assert (events[1]['ts'], events[1]['dur']) == (7250.5, 250.0)
+        assert events[0]['args'] == {'bytes': 64}